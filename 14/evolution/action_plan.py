@@ -0,0 +1,165 @@
+from globals import MAX_POPULATION, MAX_BODY_SIZE
+from species import Species
+"""
+Validates an Action against a player in one pass and stages it to be applied.
+"""
+
+# Reasons an Action is rejected.
+DUPLICATE_CARD = "duplicate-card"
+CARD_OUT_OF_RANGE = "card-out-of-range"
+SPECIES_OUT_OF_RANGE = "species-out-of-range"
+POPULATION_TOO_LARGE = "population-too-large"
+BODY_TOO_LARGE = "body-too-large"
+DUPLICATE_BOARD_TRAIT = "duplicate-board-trait"
+TRAIT_OUT_OF_RANGE = "trait-out-of-range"
+DUPLICATE_REPLACEMENT_TRAIT = "duplicate-replacement-trait"
+
+
+class ActionPlan(object):
+    """
+    An Action checked against one player's state, with everything needed to
+    apply it worked out. Checking looks at each card index and species index of
+    the action once, and nothing is changed until commit, which cannot fail, so
+    an action is either applied completely or not at all.
+
+    An action is valid exactly when PlayerState.is_valid_action used to accept
+    it, except that negative indices are rejected.
+
+    Attributes:
+        player: The PlayerState the action is for.
+        action: The Action.
+        reason: None if the action is valid, otherwise the String code of the
+            first problem found, eg. DUPLICATE_CARD.
+        new_boards: List of the List of trait names of each species to add.
+        replacements: List of (species index, trait index, trait name) in order.
+        pop_grows: Dictionary of species index to the number of PopGrows.
+        body_grows: Dictionary of species index to the number of BodyGrows.
+        used_cards: Set of the indices of every card the action uses, including
+            its food card.
+    """
+    __slots__ = ("player", "action", "reason", "new_boards", "replacements",
+                 "pop_grows", "body_grows", "used_cards")
+
+    def __init__(self, player, action):
+        """
+        Checks and stages the action.
+        :param player: The PlayerState the action is for.
+        :param action: The Action.
+        """
+        self.player = player
+        self.action = action
+        self.new_boards = []
+        self.replacements = []
+        self.pop_grows = {}
+        self.body_grows = {}
+        self.used_cards = set()
+        self.reason = self.check()
+
+    def valid(self):
+        """
+        :return: True if the action can be committed.
+        """
+        return self.reason is None
+
+    def use_card(self, index):
+        """
+        Stages the use of the card at the given index of the hand.
+        :return: The TraitCard, or None with the reason it cannot be used.
+        """
+        if not 0 <= index < len(self.player.hand):
+            return None, CARD_OUT_OF_RANGE
+        if index in self.used_cards:
+            return None, DUPLICATE_CARD
+        self.used_cards.add(index)
+        return self.player.hand[index], None
+
+    def check(self):
+        """
+        Stages the action, stopping at the first problem.
+        :return: None if the action is valid, else a reason code.
+        """
+        action = self.action
+        board = self.player.species
+        _, reason = self.use_card(action.food_card)
+        if reason:
+            return reason
+
+        for addition in action.species_additions:
+            _, reason = self.use_card(addition.payment_index)
+            if reason:
+                return reason
+            traits = []
+            for index in addition.traits:
+                card, reason = self.use_card(index)
+                if reason:
+                    return reason
+                if card.trait in traits:
+                    return DUPLICATE_BOARD_TRAIT
+                traits.append(card.trait)
+            self.new_boards.append(traits)
+        num_species = len(board) + len(self.new_boards)
+
+        for grows, counts in [(action.pop_grows, self.pop_grows),
+                              (action.body_grows, self.body_grows)]:
+            for grow in grows:
+                _, reason = self.use_card(grow.payment_index)
+                if reason:
+                    return reason
+                if not 0 <= grow.species_index < num_species:
+                    return SPECIES_OUT_OF_RANGE
+                counts[grow.species_index] = counts.get(grow.species_index, 0) + 1
+        for index, count in self.pop_grows.items():
+            # A new species is held to the number of its grows alone.
+            if index < len(board):
+                count += board[index].population
+            if count > MAX_POPULATION:
+                return POPULATION_TOO_LARGE
+        for index, count in self.body_grows.items():
+            count = count + board[index].body if index < len(board) else count - 1
+            if count > MAX_BODY_SIZE:
+                return BODY_TOO_LARGE
+
+        for replacement in action.trait_replacements:
+            card, reason = self.use_card(replacement.new_trait_index)
+            if reason:
+                return reason
+            index = replacement.species_index
+            if not 0 <= index < num_species:
+                return SPECIES_OUT_OF_RANGE
+            traits = board[index].traits if index < len(board) \
+                else self.new_boards[index - len(board)]
+            removed = replacement.removed_trait_index
+            if not 0 <= removed < len(traits):
+                return TRAIT_OUT_OF_RANGE
+            if card.trait in traits[:removed] or card.trait in traits[removed + 1:]:
+                return DUPLICATE_REPLACEMENT_TRAIT
+            self.replacements.append((index, removed, card.trait))
+        return None
+
+    def commit(self):
+        """
+        Applies the staged action to the player, with the same result as
+        PlayerState.apply_action: species are added, traits replaced, then
+        populations and bodies grown up to their maximum, and the used cards
+        are removed from the hand. Like apply_action, the food card is left to
+        the dealer, which uses it when the food cards are revealed.
+        """
+        assert self.reason is None, "cannot commit an invalid action: %s" % self.reason
+        player = self.player
+        board = player.species
+        if self.new_boards:
+            board.extend([Species(traits=traits) for traits in self.new_boards])
+        for index, removed, trait in self.replacements:
+            board[index].replace_trait(removed, trait)
+        for index, count in self.pop_grows.items():
+            species = board[index]
+            if species.population < MAX_POPULATION:
+                species.population = min(species.population + count, MAX_POPULATION)
+        for index, count in self.body_grows.items():
+            species = board[index]
+            if species.body < MAX_BODY_SIZE:
+                species.body = min(species.body + count, MAX_BODY_SIZE)
+        player.log_change()
+        food_card = self.action.food_card
+        player.used_cards.update(index for index in self.used_cards if index != food_card)
+        player.remove_used_cards()
@@ -0,0 +1,171 @@
+import copy
+import random
+import unittest
+from player_state import PlayerState
+from species import Species
+from traitcard import TraitCard
+from actions import *
+from globals import MAX_POPULATION, MAX_BODY_SIZE
+from action_plan import *
+from decision_cache import encode_board, encode_player
+
+
+def legacy_is_valid(player, action):
+    """
+    The checks PlayerState.is_valid_action made before ActionPlan, where an
+    index outside the hand raised an IndexError.
+    """
+    board, hand = player.species, player.hand
+    num_species = len(board) + len(action.species_additions)
+    try:
+        if not action.has_unique_indices() or \
+                any(index >= len(hand) for index in action.get_indices()):
+            return False
+        for grows, current, limit in [(action.pop_grows, "population", MAX_POPULATION),
+                                      (action.body_grows, "body", MAX_BODY_SIZE)]:
+            sizes = {}
+            for grow in grows:
+                index = grow.species_index
+                if index >= num_species:
+                    return False
+                if index not in sizes:
+                    # A new species starts at population 1 and body 0.
+                    sizes[index] = getattr(board[index], current) if index < len(board) \
+                        else int(current == "population") - 1
+                sizes[index] += 1
+            if any(size > limit for size in sizes.values()):
+                return False
+        new_traits = [[hand[index].trait for index in addition.traits]
+                      for addition in action.species_additions]
+        if any(len(set(traits)) != len(traits) for traits in new_traits):
+            return False
+        for replacement in action.trait_replacements:
+            index = replacement.species_index
+            if index >= num_species:
+                return False
+            traits = list(board[index].traits) if index < len(board) \
+                else list(new_traits[index - len(board)])
+            if replacement.removed_trait_index >= len(traits):
+                return False
+            traits.pop(replacement.removed_trait_index)
+            if hand[replacement.new_trait_index].trait in traits:
+                return False
+        return True
+    except IndexError:
+        return False
+
+
+def random_action(rand, player):
+    """
+    Creates an Action for the player which mostly uses distinct cards of its
+    hand, but sometimes repeats one or goes one past its end, on random species.
+    """
+    cards = range(len(player.hand))
+    rand.shuffle(cards)
+
+    def card():
+        if cards and rand.random() < 0.95:
+            return cards.pop()
+        return rand.randint(0, len(player.hand))
+
+    num_species = len(player.species) + rand.randint(0, 2)
+
+    def species():
+        if num_species and rand.random() < 0.95:
+            return rand.randrange(num_species)
+        return rand.randint(0, num_species)
+
+    additions = [BoardAddition(card(), [card() for _ in range(rand.randint(0, 2))])
+                 for _ in range(num_species - len(player.species))]
+    return Action(card(),
+                  [PopGrow(species(), card()) for _ in range(rand.randint(0, 3))],
+                  [BodyGrow(species(), card()) for _ in range(rand.randint(0, 3))],
+                  additions,
+                  [ReplaceTrait(species(), rand.randint(0, 2), card())
+                   for _ in range(rand.randint(0, 2))])
+
+
+def random_player(rand):
+    """
+    Creates a PlayerState with a random board and hand.
+    """
+    species = []
+    for _ in range(rand.randint(0, 3)):
+        population = rand.randint(1, MAX_POPULATION)
+        species.append(Species(population, 0, rand.randint(0, MAX_BODY_SIZE),
+                               rand.sample(TraitCard.traits, rand.randint(0, 3))))
+    hand = [TraitCard(rand.choice(TraitCard.traits), 0) for _ in range(rand.randint(1, 12))]
+    return PlayerState(None, 1, species=species, hand=hand)
+
+
+class TestActionPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.player = PlayerState(None, 1, species=[Species(7, 0, 2, ["climbing"]),
+                                                    Species(1, 0, 7, ["horns", "ambush"])],
+                                  hand=[TraitCard("carnivore", 3), TraitCard("climbing", 1),
+                                        TraitCard("horns", 0), TraitCard("carnivore", 2)])
+
+    def assertReason(self, action, reason):
+        self.assertEqual(ActionPlan(self.player, action).reason, reason)
+
+    def test_valid(self):
+        action = Action(0, [PopGrow(2, 1)], [BodyGrow(0, 2)], [BoardAddition(3, [])],
+                        [ReplaceTrait(1, 0, 4)])
+        self.player.hand.append(TraitCard("fat-tissue", 0))
+        plan = ActionPlan(self.player, action)
+        self.assertTrue(plan.valid())
+        self.assertEqual(plan.used_cards, set(range(5)))
+        self.player.use_card(0)
+        plan.commit()
+        self.assertEqual(encode_board(self.player.species),
+                         encode_board([Species(7, 0, 3, ["climbing"]),
+                                       Species(1, 0, 7, ["fat-tissue", "ambush"]),
+                                       Species(2, 0, 0, [])]))
+        self.assertEqual(self.player.hand, [])
+
+    def test_cards(self):
+        self.assertReason(Action(0, [PopGrow(1, 0)], [], [], []), DUPLICATE_CARD)
+        self.assertReason(Action(4, [], [], [], []), CARD_OUT_OF_RANGE)
+        self.assertReason(Action(-1, [], [], [], []), CARD_OUT_OF_RANGE)
+        self.assertReason(Action(0, [], [], [BoardAddition(1, [2, 2])], []), DUPLICATE_CARD)
+
+    def test_species(self):
+        self.assertReason(Action(0, [PopGrow(2, 1)], [], [], []), SPECIES_OUT_OF_RANGE)
+        self.assertReason(Action(0, [], [], [], [ReplaceTrait(-1, 0, 1)]), SPECIES_OUT_OF_RANGE)
+        self.assertReason(Action(0, [PopGrow(0, 1)], [], [], []), POPULATION_TOO_LARGE)
+        self.assertReason(Action(0, [], [BodyGrow(1, 1)], [], []), BODY_TOO_LARGE)
+        self.assertReason(Action(2, [], [], [BoardAddition(1, [0, 3])], []), DUPLICATE_BOARD_TRAIT)
+
+    def test_replacements(self):
+        self.assertReason(Action(0, [], [], [], [ReplaceTrait(0, 1, 1)]), TRAIT_OUT_OF_RANGE)
+        self.assertReason(Action(0, [], [], [], [ReplaceTrait(1, 1, 2)]),
+                          DUPLICATE_REPLACEMENT_TRAIT)
+        self.assertReason(Action(0, [], [], [], [ReplaceTrait(1, 0, 2)]), None)
+        self.assertReason(Action(0, [], [], [BoardAddition(1, [2])], [ReplaceTrait(2, 0, 3)]),
+                          None)
+
+    def test_atomic(self):
+        before = copy.deepcopy(self.player)
+        self.assertFalse(self.player.is_valid_action(
+            Action(0, [], [BodyGrow(0, 1)], [BoardAddition(2, [])], [ReplaceTrait(5, 0, 3)])))
+        self.assertEqual(self.player, before)
+        self.assertEqual(self.player.used_cards, set())
+
+    def test_random_actions(self):
+        rand = random.Random(1701)
+        for _ in range(3000):
+            player = random_player(rand)
+            action = random_action(rand, player)
+            plan = ActionPlan(player, action)
+            self.assertEqual(plan.valid(), legacy_is_valid(player, action), str(action))
+            if plan.valid():
+                expected = copy.deepcopy(player)
+                expected.apply_action(action)
+                plan.commit()
+                self.assertEqual(encode_player(player), encode_player(expected))
+                self.assertEqual(player.species.zobrist(), expected.species.zobrist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,12 @@
-from helpers import is_unique_list
-
 
 class Action(object):
     """
     Describes a Player's action during step 3 of Evolution.
     """
 
+    __slots__ = ("food_card", "pop_grows", "body_grows", "species_additions",
+                 "trait_replacements")
+
     def __init__(self, food_card, pop_grows, body_grows,
                  species_additions, trait_replacements):
         self.food_card = food_card
@@ -36,7 +37,8 @@ class Action(object):
         Checks that the trait card indices used in this action are all unique.
         :return: True if all indices are unique, else False.
         """
-        return is_unique_list(self.get_indices())
+        indices = self.get_indices()
+        return len(set(indices)) == len(indices)
 
     def get_indices(self):
         """
@@ -59,6 +61,8 @@ class PopGrow(object):
     specified index using the card at the specified index.
     """
 
+    __slots__ = ("species_index", "payment_index")
+
     def __init__(self, species_index, payment_index):
         """
         Constructs a player PopGrow where the card in the player's hand at index
@@ -85,6 +89,8 @@ class BodyGrow(object):
     specified index using the card at the specified index.
     """
 
+    __slots__ = ("species_index", "payment_index")
+
     def __init__(self, species_index, payment_index):
         """
         Constructs a player BodyGrow where the card in the player's hand at index
@@ -111,6 +117,8 @@ class BoardAddition(object):
     right of their list.
     """
 
+    __slots__ = ("payment_index", "traits")
+
     def __init__(self, payment_index, traits=None):
         """
         Constructs a player BoardAddition where the card in the player's hand
@@ -138,6 +146,8 @@ class ReplaceTrait(object):
     Describes a player action to replace one trait on a species with another.
     """
 
+    __slots__ = ("species_index", "removed_trait_index", "new_trait_index")
+
     def __init__(self, species_index, removed_trait_index, new_trait_index):
         """
         Constructs a ReplaceTrait
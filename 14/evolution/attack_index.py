@@ -0,0 +1,109 @@
+from helpers import board_targets
+"""
+An index of the species each carnivore can attack.
+"""
+
+
+class AttackIndex(object):
+    """
+    Maps attacking carnivores to the species they can attack on each board.
+    Only the traits, population and body of an attacker decide which species
+    it can attack, so carnivores alike in those share their entries. Boards of
+    the index tell it when they change, so an entry for one board is only
+    recomputed once that board has changed since it was computed, and a
+    feeding only costs the boards it touched. The targets of a carnivore among
+    a whole tuple of players, such as Dealer.opponents, are kept too and
+    returned without looking at the players while no board changed.
+
+    Attributes:
+        table: Dictionary of attacker (trait mask, population, body) to a
+            dictionary of id(Board) -> (Board, [Species, ...]).
+        watchers: Dictionary of id(Board) to the Set of attacker keys with an
+            entry for that board.
+        views: Dictionary of attacking Species to the Tuple (attacker key,
+            tuple of players, generation, [Species, ...]) of its last query of
+            a tuple of players.
+        dirty: Dictionary of id(Board) to the Boards changed since the last query.
+        generation: Integer incremented whenever changed boards are dropped.
+        recomputed: The number of board entries that had to be recomputed.
+    """
+    def __init__(self):
+        self.table = {}
+        self.watchers = {}
+        self.views = {}
+        self.dirty = {}
+        self.generation = 0
+        self.recomputed = 0
+
+    def __deepcopy__(self, memo):
+        return AttackIndex()
+
+    def __reduce__(self):
+        return (AttackIndex, ())
+
+    def clear(self):
+        """
+        Forgets every entry in the index.
+        """
+        self.table = {}
+        self.watchers = {}
+        self.views = {}
+        self.dirty = {}
+
+    def touch(self, board):
+        """
+        Marks a board as changed, so the entries computed from it are dropped
+        before the next query.
+        :param board: The Board which changed.
+        """
+        self.dirty[id(board)] = board
+
+    def flush(self):
+        """
+        Drops the entries of the boards changed since the last query.
+        """
+        table = self.table
+        for board_id in self.dirty:
+            for key in self.watchers.pop(board_id, ()):
+                table[key].pop(board_id, None)
+        self.dirty = {}
+        self.generation += 1
+
+    def targets(self, carnivore, list_of_player):
+        """
+        Creates a list of all possible targets for the given carnivore from the
+        list of players, in the same order as helpers.carnivore_targets.
+        :param carnivore: The attacking carnivore.
+        :param list_of_player: All players to be considered for possible targets.
+        :return: List of Species the carnivore can attack.
+        """
+        if self.dirty:
+            self.flush()
+        key = (carnivore.trait_mask, carnivore.population, carnivore.body)
+        view = self.views.get(carnivore)
+        if view is not None and view[1] is list_of_player and \
+                view[2] == self.generation and view[0] == key:
+            return list(view[3])
+        boards = self.table.get(key)
+        if boards is None:
+            boards = self.table[key] = {}
+        targets = []
+        cacheable = isinstance(list_of_player, tuple)
+        for player in list_of_player:
+            board = player.species
+            if board.attack_index is not self or board is carnivore.board:
+                # Changes to this board are not reported to this index, or
+                # its targets leave out the carnivore itself.
+                targets.extend(board_targets(carnivore, board))
+                cacheable = False
+                continue
+            entry = boards.get(id(board))
+            if entry is None or entry[0] is not board:
+                entry = boards[id(board)] = (board, board_targets(carnivore, board))
+                self.watchers.setdefault(id(board), set()).add(key)
+                self.recomputed += 1
+            targets.extend(entry[1])
+        if cacheable:
+            self.views[carnivore] = (key, list_of_player, self.generation, targets)
+            return list(targets)
+        return targets
@@ -0,0 +1,124 @@
+import copy
+import random
+import unittest
+from dealer import Dealer
+from player import Player
+from species import Species
+from helpers import carnivore_targets, board_targets
+from test_utils import random_dealer
+
+
+class TestAttackIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dealer = Dealer([Player(), Player(), Player()])
+        self.carnivore = Species(3, 0, 4, ["carnivore"])
+        self.defender = Species(2, 0, 1)
+        self.climber = Species(2, 0, 1, ["climbing"])
+        self.dealer.players[0].species = [self.carnivore]
+        self.dealer.players[1].species = [self.defender, self.climber]
+        self.warner = Species(1, 0, 1, ["warning-call"])
+        self.protected = Species(1, 0, 5)
+        self.dealer.players[2].species = [self.warner, self.protected]
+        self.dealer.index_boards()
+        self.opponents = self.dealer.opponents()
+
+    def check_targets(self, dealer):
+        """
+        Checks that every carnivore in the dealer's game gets the same targets from
+        the attack index as from scanning every board.
+        """
+        for index, player in enumerate(dealer.players):
+            opponents = dealer.players[:index] + dealer.players[index + 1:]
+            for species in player.species:
+                expected = []
+                for opponent in opponents:
+                    expected.extend(board_targets(species, opponent.species))
+                self.assertEqual(map(id, carnivore_targets(species, opponents)),
+                                 map(id, expected))
+
+    def test_targets(self):
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.warner])
+
+    def test_reuse(self):
+        index = self.dealer.attack_index
+        carnivore_targets(self.carnivore, self.opponents)
+        self.assertEqual(index.recomputed, 2)
+        carnivore_targets(self.carnivore, self.opponents)
+        self.assertEqual(index.recomputed, 2)
+        self.climber.food = 1
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.warner])
+        self.assertEqual(index.recomputed, 3)
+
+    def test_changed_boards(self):
+        index = self.dealer.attack_index
+        carnivore_targets(self.carnivore, self.opponents)
+        self.warner.food = 1
+        self.assertEqual(index.dirty.keys(), [id(self.dealer.players[2].species)])
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.warner])
+        self.assertEqual(index.recomputed, 3)
+        self.assertEqual(index.dirty, {})
+
+    def test_species_changes(self):
+        self.climber.traits.remove("climbing")
+        self.defender.traits.append("climbing")
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.climber, self.warner])
+        self.warner.traits = []
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.climber, self.warner, self.protected])
+        self.carnivore.traits.append("climbing")
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.climber, self.warner, self.protected])
+
+    def test_board_changes(self):
+        board = self.dealer.players[1].species
+        board.remove(self.defender)
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.warner])
+        board.insert(0, Species(1, 0, 0, ["burrowing"]))
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [board[0], self.warner])
+        self.dealer.players[1].species = [self.defender]
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.warner])
+
+    def test_extinction(self):
+        self.dealer.kill(self.dealer.players[1], self.defender)
+        self.dealer.kill(self.dealer.players[1], self.defender)
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.warner])
+
+    def test_public_state(self):
+        opponents = [player.public_state() for player in self.opponents]
+        self.assertEqual(carnivore_targets(self.carnivore, opponents),
+                         [self.defender, self.warner])
+        self.assertEqual(self.dealer.attack_index.recomputed, 2)
+
+    def test_deepcopy(self):
+        carnivore_targets(self.carnivore, self.opponents)
+        dealer = copy.deepcopy(self.dealer)
+        self.assertIsNot(dealer.players[1].species.attack_index, self.dealer.attack_index)
+        self.assertIs(dealer.players[1].species[0].board, dealer.players[1].species)
+        dealer.players[1].species[1].traits = []
+        self.assertEqual(carnivore_targets(self.carnivore, self.opponents),
+                         [self.defender, self.warner])
+        self.check_targets(dealer)
+
+    def test_random_feedings(self):
+        rand = random.Random(400)
+        for _ in range(150):
+            dealer = random_dealer(rand)
+            dealer.index_boards()
+            while dealer.watering_hole > 0 and \
+                    len(dealer.players) != len(dealer.skipped_players):
+                self.check_targets(dealer)
+                dealer.feed1()
+            self.check_targets(dealer)
+
+
+if __name__ == '__main__':
+    unittest.main()
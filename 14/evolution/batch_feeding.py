@@ -0,0 +1,376 @@
+import numpy as np
+from globals import HARD_SHELL_DIFF
+from traitcard import TRAIT_BITS
+"""
+A lockstep feeding phase engine for many games at once. Requires numpy.
+"""
+
+class BatchFeeding(object):
+    """
+    The feeding phase of many games of Evolution, where every game's species
+    boards are held in NumPy arrays of shape (games, players, slots). Each call
+    to step executes Dealer.feed1 in every unfinished game at once, with every
+    player choosing its feedings with the Silly Player strategy.
+
+    Species boards are kept packed to the left, so slot i of a board is the
+    i'th species of that player and alive[g, p, i] is False past the end of
+    the board.
+
+    Attributes:
+        population, food, body, fat_storage: Integer arrays of each species' values.
+        traits: Integer array of each species' traits as a mask of TRAIT_BITS.
+        alive: Boolean array marking the slots which hold a species.
+        ids: The Species.id of the species in each slot.
+        present: Boolean array of shape (games, players) marking real players.
+        num_players: The number of players in each game.
+        watering_hole: The watering hole of each game.
+        current_player_index: The current player index of each game.
+        skipped: Boolean array of shape (games, players) of skipped players.
+        deck_size: The number of cards left in each game's deck.
+        deals: List of List of (player_index, num_cards) for each game
+            recording the cards dealt for extinctions in order.
+    """
+    def __init__(self, dealers):
+        """
+        Creates a BatchFeeding holding the state of the given dealers.
+        :param dealers: List of Dealer at the start of their feeding.
+        """
+        num_games = len(dealers)
+        num_players = max([len(dealer.players) for dealer in dealers] + [1])
+        num_slots = max([len(player.species) for dealer in dealers
+                         for player in dealer.players] + [1])
+        shape = (num_games, num_players, num_slots)
+
+        self.population = np.zeros(shape, np.int32)
+        self.food = np.zeros(shape, np.int32)
+        self.body = np.zeros(shape, np.int32)
+        self.fat_storage = np.zeros(shape, np.int32)
+        self.traits = np.zeros(shape, np.int32)
+        self.alive = np.zeros(shape, bool)
+        self.ids = np.zeros(shape, np.int64)
+        self.present = np.zeros(shape[:2], bool)
+        self.num_players = np.zeros(num_games, np.int32)
+        self.watering_hole = np.zeros(num_games, np.int32)
+        self.current_player_index = np.zeros(num_games, np.int32)
+        self.skipped = np.zeros(shape[:2], bool)
+        self.deck_size = np.zeros(num_games, np.int32)
+        self.deals = [[] for _ in dealers]
+
+        for g, dealer in enumerate(dealers):
+            self.num_players[g] = len(dealer.players)
+            self.watering_hole[g] = dealer.watering_hole
+            self.current_player_index[g] = dealer.current_player_index
+            self.deck_size[g] = len(dealer.deck)
+            for p, player in enumerate(dealer.players):
+                self.present[g, p] = True
+                self.skipped[g, p] = p in dealer.skipped_players
+                for s, species in enumerate(player.species):
+                    self.population[g, p, s] = species.population
+                    self.food[g, p, s] = species.food
+                    self.body[g, p, s] = species.body
+                    self.fat_storage[g, p, s] = species.fat_storage
+                    self.traits[g, p, s] = species.trait_mask
+                    self.alive[g, p, s] = True
+                    self.ids[g, p, s] = species.id
+
+    def active(self):
+        """
+        :return: Boolean array of the games which are still feeding.
+        """
+        return (self.watering_hole > 0) & \
+            (self.skipped.sum(axis=1) != self.num_players)
+
+    def run(self):
+        """
+        Steps every game until all of them have finished feeding.
+        :return: The number of steps taken.
+        """
+        steps = 0
+        while self.active().any():
+            self.step()
+            steps += 1
+        return steps
+
+    def step(self):
+        """
+        Executes one Dealer.feed1 in every game that is still feeding.
+        """
+        games = np.nonzero(self.active())[0]
+        if len(games) == 0:
+            return
+        rows = np.arange(len(games))
+        cur = self.current_player_index[games]
+        pop = self.population[games, cur]
+        food = self.food[games, cur]
+        body = self.body[games, cur]
+        fat = self.fat_storage[games, cur]
+        traits = self.traits[games, cur]
+        fat_tissue = has(traits, "fat-tissue")
+        carnivore = has(traits, "carnivore")
+
+        hungry = self.alive[games, cur] & \
+            np.where(fat_tissue, (fat < body) | (food < pop), food < pop)
+        hungry_herbs = hungry & ~carnivore
+        hungry_carns = hungry & carnivore
+        attackable = self.attackable(games)
+        num_targets = attackable.sum(axis=(2, 3))
+
+        non_feedable = hungry_carns & (num_targets == 0) & (~fat_tissue | (fat == body))
+        can_feed = hungry.sum(axis=1) != non_feedable.sum(axis=1)
+        skip = self.skipped[games, cur] | ~can_feed
+        feeding = ~skip
+
+        num_herbs = hungry_herbs.sum(axis=1)
+        num_carns = hungry_carns.sum(axis=1)
+        lex = lex_key(pop, food, body)
+
+        # Dealer.auto_eat
+        auto_herb = feeding & (num_herbs == 1) & (num_carns == 0)
+        auto_carn_eater = first_index(hungry_carns)
+        auto_carn = feeding & (num_carns == 1) & (num_herbs == 0) & \
+            (num_targets[rows, auto_carn_eater] == 1)
+        strategy = feeding & ~auto_herb & ~auto_carn
+
+        # Player.next_feeding
+        fatties = self.alive[games, cur] & fat_tissue & (fat < body)
+        need = np.where(fatties, (pop - food) * 512 + lex, -1)
+        strat_fat = strategy & fatties.any(axis=1)
+        strat_herb = strategy & ~strat_fat & hungry_herbs.any(axis=1)
+        carn_key = np.where(hungry_carns & (num_targets > 0), lex, -1)
+        strat_carn = strategy & ~strat_fat & ~strat_herb & (carn_key.max(axis=1) >= 0)
+        abstain = strategy & ~strat_fat & ~strat_herb & ~strat_carn
+
+        eater = np.zeros(len(games), np.int64)
+        eater = np.where(auto_herb, first_index(hungry_herbs), eater)
+        eater = np.where(auto_carn, auto_carn_eater, eater)
+        eater = np.where(strat_fat, need.argmax(axis=1), eater)
+        eater = np.where(strat_herb, np.where(hungry_herbs, lex, -1).argmax(axis=1), eater)
+        eater = np.where(strat_carn, carn_key.argmax(axis=1), eater)
+
+        eater_needs_fat = fat_tissue[rows, eater] & (fat[rows, eater] < body[rows, eater])
+        fat_feed = (auto_herb & eater_needs_fat) | strat_fat
+        herb_feed = (auto_herb & ~fat_feed) | strat_herb
+        carn_feed = auto_carn | strat_carn
+
+        self.skipped[games, cur] |= skip | abstain
+
+        if fat_feed.any():
+            g = games[fat_feed]
+            e = eater[fat_feed]
+            requested = np.minimum(self.watering_hole[g],
+                                   (body - fat)[rows[fat_feed], e])
+            self.fat_storage[g, cur[fat_feed], e] += requested
+            self.watering_hole[g] -= requested
+
+        if herb_feed.any():
+            self.feed(games[herb_feed], cur[herb_feed], eater[herb_feed])
+
+        if carn_feed.any():
+            g = games[carn_feed]
+            a_player = cur[carn_feed]
+            a_slot = eater[carn_feed]
+            targets = attackable[rows[carn_feed], a_slot].reshape(len(g), -1)
+            def_key = lex_key(self.population[g], self.food[g], self.body[g])
+            target = np.where(targets, def_key.reshape(len(g), -1), -1).argmax(axis=1)
+            num_slots = self.alive.shape[2]
+            d_player = target // num_slots
+            d_slot = target % num_slots
+            horns = has(self.traits[g, d_player, d_slot], "horns")
+            a_ids = self.ids[g, a_player, a_slot]
+            self.kill(g, d_player, d_slot)
+            self.kill(g[horns], a_player[horns], a_slot[horns])
+            # an extinct attacker is removed, shifting another species into its slot
+            survived = self.alive[g, a_player, a_slot] & \
+                (self.ids[g, a_player, a_slot] == a_ids)
+            self.feed(g[survived], a_player[survived], a_slot[survived])
+            self.feed_scavengers(g[survived])
+
+        self.current_player_index[games] = (cur + 1) % self.num_players[games]
+
+    def attackable(self, games):
+        """
+        Computes Species.is_attackable for every species of the current player
+        attacking every species of the other players in the given games.
+        :param games: Array of game indices.
+        :return: Boolean array of shape (games, slots, players, slots) where
+        [i, a, p, d] is True if species a of the current player in game
+        games[i] can attack species d of player p.
+        """
+        num_players = self.alive.shape[1]
+        cur = self.current_player_index[games]
+        alive = self.alive[games]
+        traits = self.traits[games]
+        population = self.population[games]
+        body = self.body[games]
+
+        attacker = lambda arr: arr[np.arange(len(games)), cur][:, :, None, None]
+        defender = lambda arr: arr[:, None, :, :]
+        a_traits = attacker(traits)
+        d_traits = defender(traits)
+
+        a_pop = attacker(population)
+        a_body = attacker(body) + np.where(has(a_traits, "pack-hunting"), a_pop, 0)
+        d_pop = defender(population)
+        d_body = defender(body)
+        d_food = defender(self.food[games])
+
+        right_alive = np.zeros_like(alive)
+        right_alive[:, :, :-1] = alive[:, :, 1:]
+        right_body = np.zeros_like(body)
+        right_body[:, :, :-1] = body[:, :, 1:]
+        warning = has(traits, "warning-call") & alive
+        warned = np.zeros_like(warning)
+        warned[:, :, 1:] |= warning[:, :, :-1]
+        warned[:, :, :-1] |= warning[:, :, 1:]
+        sheltered = has(traits, "symbiosis") & right_alive & (right_body > body)
+
+        blocked = \
+            (has(d_traits, "burrowing") & (d_food == d_pop)) | \
+            (has(d_traits, "climbing") & ~has(a_traits, "climbing")) | \
+            (has(d_traits, "hard-shell") & (a_body - d_body < HARD_SHELL_DIFF)) | \
+            (has(d_traits, "herding") & (a_pop <= d_pop)) | \
+            defender(sheltered) | \
+            (defender(warned) & ~has(a_traits, "ambush"))
+
+        opponent = np.arange(num_players)[None, :] != cur[:, None]
+        return (has(a_traits, "carnivore") & attacker(alive)) & \
+            defender(alive) & opponent[:, None, :, None] & ~blocked
+
+    def feed(self, games, player, slot):
+        """
+        PlayerState.feed of the species at the given slot of the given player
+        in each of the given games, including foraging and cooperation.
+        Cooperation recurses depth first along the board, so the deepest slot
+        with a pending feeding is always fed first.
+        :param games: Array of game indices.
+        :param player: The player index of the species in each game.
+        :param slot: The slot of the species in each game.
+        """
+        if len(games) == 0:
+            return
+        num_slots = self.alive.shape[2]
+        rows = np.arange(len(games))
+        player = np.broadcast_to(player, games.shape)
+        pending = np.zeros((len(games), num_slots), np.int32)
+        pending[rows, slot] = 1
+
+        pop = self.population[games, player]
+        food = self.food[games, player]
+        traits = self.traits[games, player]
+        foraging = has(traits, "foraging")
+        right_alive = np.zeros_like(pop, bool)
+        right_alive[:, :-1] = self.alive[games, player, 1:]
+        cooperation = has(traits, "cooperation") & right_alive
+        wh = self.watering_hole[games]
+
+        while True:
+            waiting = pending > 0
+            feeding = np.nonzero(waiting.any(axis=1))[0]
+            if len(feeding) == 0:
+                break
+            s = num_slots - 1 - waiting[feeding, ::-1].argmax(axis=1)
+            pending[feeding, s] -= 1
+            eaten = np.minimum(1 + foraging[feeding, s],
+                               np.minimum(pop[feeding, s] - food[feeding, s], wh[feeding]))
+            eaten = np.maximum(eaten, 0)
+            food[feeding, s] += eaten
+            wh[feeding] -= eaten
+            chain = cooperation[feeding, s] & (wh[feeding] > 0)
+            pending[feeding[chain], s[chain] + 1] += eaten[chain]
+
+        self.food[games, player] = food
+        self.watering_hole[games] = wh
+
+    def feed_scavengers(self, games):
+        """
+        Dealer.feed_scavengers in each of the given games.
+        :param games: Array of game indices.
+        """
+        num_players, num_slots = self.alive.shape[1:]
+        scavenger = has(self.traits[games], "scavenger") & self.alive[games]
+        for p in range(num_players):
+            for s in range(num_slots):
+                feeding = scavenger[:, p, s]
+                if feeding.any():
+                    self.feed(games[feeding], p, s)
+
+    def kill(self, games, player, slot):
+        """
+        Dealer.kill of the species at the given slot of the given player in
+        each of the given games. Extinct species are removed from their board
+        and their owner is dealt two cards.
+        :param games: Array of game indices.
+        :param player: Array of the player index of the species in each game.
+        :param slot: Array of the slot of the species in each game.
+        """
+        if len(games) == 0:
+            return
+        g, p, s = games, player, slot
+        self.population[g, p, s] -= 1
+        self.food[g, p, s] = np.minimum(self.population[g, p, s], self.food[g, p, s])
+
+        extinct = self.population[g, p, s] == 0
+        g, p, s = g[extinct], p[extinct], s[extinct]
+        if len(g) == 0:
+            return
+        num_slots = self.alive.shape[2]
+        columns = np.arange(num_slots)[None, :]
+        source = np.minimum(columns + (columns >= s[:, None]), num_slots - 1)
+        rows_g = g[:, None]
+        rows_p = p[:, None]
+        for arr in (self.population, self.food, self.body, self.fat_storage,
+                    self.traits, self.alive, self.ids):
+            arr[rows_g, rows_p, columns] = arr[rows_g, rows_p, source]
+        self.alive[g, p, num_slots - 1] = False
+        for game, plr in zip(g, p):
+            num_cards = min(2, self.deck_size[game])
+            self.deck_size[game] -= num_cards
+            self.deals[game].append((plr, num_cards))
+
+    def write_back(self, dealers):
+        """
+        Copies the state of every game back into the Dealers it was created from.
+        :param dealers: The List of Dealer given to the constructor.
+        """
+        for g, dealer in enumerate(dealers):
+            dealer.watering_hole = int(self.watering_hole[g])
+            dealer.current_player_index = int(self.current_player_index[g])
+            dealer.skipped_players = [p for p in range(len(dealer.players))
+                                      if self.skipped[g, p]]
+            for p, player in enumerate(dealer.players):
+                by_id = dict((species.id, species) for species in player.species)
+                board = []
+                for s in np.nonzero(self.alive[g, p])[0]:
+                    species = by_id[self.ids[g, p, s]]
+                    species.population = int(self.population[g, p, s])
+                    species.food = int(self.food[g, p, s])
+                    species.fat_storage = int(self.fat_storage[g, p, s])
+                    board.append(species)
+                player.species = board
+            for plr, num_cards in self.deals[g]:
+                dealer.deal(num_cards, dealer.players[plr])
+
+
+def has(traits, trait):
+    """
+    :param traits: Integer array of trait masks.
+    :param trait: String name of a trait.
+    :return: Boolean array of the masks that include the given trait.
+    """
+    return (traits & TRAIT_BITS[trait]) != 0
+
+
+def lex_key(population, food, body):
+    """
+    Packs a species' population, food and body into one integer ordered the
+    same way as Player.is_larger.
+    """
+    return (population * 8 + food) * 8 + body
+
+
+def first_index(mask):
+    """
+    :param mask: Boolean array of shape (games, slots).
+    :return: The first True slot of each game, or 0 if there is none.
+    """
+    return mask.argmax(axis=1)
@@ -0,0 +1,55 @@
+import copy
+import random
+import unittest
+from dealer import Dealer
+from player import Player
+from species import Species
+from traitcard import TraitCard
+from convert import Convert
+from globals import *
+from test_utils import random_dealer
+from batch_feeding import BatchFeeding
+
+
+class TestBatchFeeding(unittest.TestCase):
+    def check_games(self, dealers):
+        expected = copy.deepcopy(dealers)
+        for dealer in expected:
+            dealer.feed_all()
+        batch = BatchFeeding(dealers)
+        batch.run()
+        batch.write_back(dealers)
+        for dealer, exp in zip(dealers, expected):
+            self.assertEqual(Convert.dealer_to_json(dealer), Convert.dealer_to_json(exp))
+            self.assertEqual(dealer.current_player_index, exp.current_player_index)
+            self.assertEqual(dealer.skipped_players, sorted(exp.skipped_players))
+            for player, exp_player in zip(dealer.players, exp.players):
+                self.assertEqual([s.fat_storage for s in player.species],
+                                 [s.fat_storage for s in exp_player.species])
+
+    def test_herbivores(self):
+        dealer = Dealer([Player(), Player(), Player()])
+        dealer.players[0].species = [Species(4, 0, 1, ["cooperation", "foraging"]),
+                                     Species(3, 0, 1, ["cooperation"]),
+                                     Species(2, 0, 1, ["fat-tissue"])]
+        dealer.players[1].species = [Species(2, 0, 1)]
+        dealer.watering_hole = 9
+        self.check_games([dealer])
+
+    def test_carnivores(self):
+        dealer = Dealer([Player(), Player(), Player()])
+        dealer.players[0].species = [Species(3, 0, 4, ["carnivore"])]
+        dealer.players[1].species = [Species(1, 0, 1, ["horns", "scavenger"])]
+        dealer.players[2].species = [Species(2, 0, 1, ["scavenger", "cooperation"]),
+                                     Species(3, 0, 1, ["climbing"])]
+        dealer.deck = [TraitCard("ambush"), TraitCard("climbing", 1), TraitCard("horns")]
+        dealer.watering_hole = 12
+        self.check_games([dealer])
+
+    def test_random_corpus(self):
+        rand = random.Random(4500)
+        self.check_games([random_dealer(rand) for _ in range(400)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import copy
+import random
+import instrumentation
+import shutil
+import tempfile
+import timeit
+from dealer import Dealer
+from player import Player
+from player_state import PlayerState
+from species import Species
+from globals import MAX_POPULATION
+from decision_cache import DecisionCache, CachedPlayer
+from instrumentation import Instrumentation
+from journal import Journal
+from replay import record_games, replay_file
+from stress import stress_dealer
+from feeding_solver import FeedingSolver
+"""
+Timing benchmarks of parts of the Evolution engine.
+"""
+
+
+def mid_game_dealer(num_players, rounds=2, seed=0):
+    """
+    Creates a game of Silly players which has played some of its rounds.
+    :param num_players: The number of players in the game.
+    :param rounds: The number of rounds to play, fewer if the game ends first.
+    :param seed: The seed of the game and its deck.
+    :return: The Dealer of the game.
+    """
+    random.seed(seed)
+    dealer = Dealer([Player() for _ in range(num_players)], seed)
+    dealer.create_deck()
+    for _ in range(rounds):
+        if dealer.has_next_round():
+            dealer.run_round()
+    return dealer
+
+
+def microseconds(function, number):
+    """
+    :param function: Function of no arguments to time.
+    :param number: The number of times to call the function.
+    :return: The mean time of one call in microseconds.
+    """
+    return timeit.timeit(function, number=number) / number * 1e6
+
+
+def bench_clone(num_players=8, number=2000):
+    """
+    Times Dealer.clone against copy.deepcopy of a mid-game state.
+    :return: A printable String of the results.
+    """
+    dealer = mid_game_dealer(num_players)
+    num_species = sum(len(player.species) for player in dealer.players)
+    clone = microseconds(dealer.clone, number)
+    deep = microseconds(lambda: copy.deepcopy(dealer), max(1, number // 20))
+    return "%d players, %d species: clone %.1fus, deepcopy %.1fus (%.0fx)\n" % \
+        (len(dealer.players), num_species, clone, deep, deep / clone)
+
+
+def bench_decision_cache(num_players=5, num_games=200):
+    """
+    Times games of Silly players with and without a DecisionCache shared by
+    every player of every game.
+    :return: A printable String of the results.
+    """
+    def play(make_player):
+        for seed in range(num_games):
+            random.seed(seed)
+            Dealer([make_player() for _ in range(num_players)], seed).run()
+
+    cache = DecisionCache()
+    plain = timeit.timeit(lambda: play(Player), number=1)
+    cached = timeit.timeit(lambda: play(lambda: CachedPlayer(Player(), cache)), number=1)
+    stats = cache.stats()
+    return "%d games of %d players: plain %.3fs, cached %.3fs, hit rate %.3f " \
+        "(%d decisions cached)\n" % (num_games, num_players, plain, cached,
+                                     stats["hit_rate"], stats["size"])
+
+
+def bench_cooperation(sizes=(10, 100, 1000, 10000), number=5):
+    """
+    Times feeding the leftmost species of boards where every species forages
+    and cooperates, the worst case for cooperation chains: each species is fed
+    by every token its left neighbor eats until it is full.
+    :return: A printable String of the results.
+    """
+    results = ""
+    for size in sizes:
+        total = 0.0
+        for _ in range(number):
+            species = [Species(MAX_POPULATION, 0, 0, ["foraging", "cooperation"])
+                       for _ in range(size)]
+            player = PlayerState(Player(), species=species)
+            total += timeit.timeit(lambda: player.feed(species[0], size * MAX_POPULATION),
+                                   number=1)
+        mean = total / number
+        results += "%d species: %.2fms (%.2fus per species)\n" % \
+            (size, mean * 1e3, mean / size * 1e6)
+    return results
+
+
+def bench_journal(num_players=5, num_games=300):
+    """
+    Times seeded games of Silly players with and without a Journal, which is
+    not verbose, of every game written to a temporary file.
+    :return: A printable String of the results.
+    """
+    def play(journal):
+        for seed in range(num_games):
+            random.seed(seed)
+            dealer = Dealer([Player() for _ in range(num_players)], seed)
+            if journal is not None:
+                dealer.keep_journal(journal)
+            dealer.run()
+
+    repeat = 3
+    out = tempfile.TemporaryFile()
+    journal = Journal(out)
+    plain = min(timeit.repeat(lambda: play(None), number=1, repeat=repeat))
+    journaled = min(timeit.repeat(lambda: play(journal), number=1, repeat=repeat))
+    journal.flush()
+    games = num_games * repeat
+    size = out.tell()
+    out.close()
+    return "%d games of %d players: plain %.3fs, journaled %.3fs (%+.1f%%), " \
+        "%.0f events in %.0f bytes per game\n" % (num_games, num_players, plain, journaled,
+                                                  (journaled / plain - 1) * 100,
+                                                  float(journal.count) / games,
+                                                  float(size) / games)
+
+
+def bench_replay(num_players=5, num_games=300):
+    """
+    Records seeded games of Silly players, then times replaying them in one
+    process. A replay fails the benchmark if it does not end with the recorded
+    scores, so this also checks the engine still plays the games the same way.
+    :return: A printable String of the results.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        path, = record_games(directory, num_games, num_players, num_files=1)
+        runs = [replay_file(path) for _ in range(3)]
+    finally:
+        shutil.rmtree(directory)
+    mismatches = runs[0][2]
+    seconds = min(run[3] for run in runs)
+    return "%d games of %d players replayed in %.3fs (%.1f games/second), " \
+        "%d mismatches\n" % (num_games, num_players, seconds, num_games / seconds,
+                              len(mismatches))
+
+
+def bench_scaling(sizes=((8, 4), (32, 8), (32, 16), (64, 16), (128, 8), (256, 4))):
+    """
+    Times one round of stress games of growing numbers of players and species,
+    to show where the engine's costs grow faster than the table. A round whose
+    time per species grows with the table, or a feed1 whose time grows faster
+    than the number of species, is superlinear.
+    :param sizes: Tuples (players, species per player) of the games to time.
+    :return: A printable String of the results.
+    """
+    results = ""
+    for num_players, num_species in sizes:
+        dealer = stress_dealer(num_players, num_species)
+        stats = dealer.instrument()
+        previous = instrumentation.activate(stats)
+        try:
+            seconds = timeit.timeit(dealer.run_round, number=1)
+        finally:
+            instrumentation.deactivate(previous)
+        feedings, feed_seconds = stats.phases.get("feed1", (0, 0.0))
+        choose_seconds = stats.phases["get_player_actions"][1]
+        attacks = stats.counters.get("is_attackable", 0)
+        results += "%d players x %d species: round %.1fms (%.1fus per species), " \
+            "choose %.1fms, %d feed1 at %.1fus, %d carnivore_targets, " \
+            "%.0f is_attackable per feed1\n" % \
+            (num_players, num_species, seconds * 1e3, seconds / (num_players * num_species) * 1e6,
+             choose_seconds * 1e3, feedings, feed_seconds / max(feedings, 1) * 1e6,
+             stats.counters.get("carnivore_targets", 0), float(attacks) / max(feedings, 1))
+    return results
+
+
+def bench_solver(positions=((3, 2, 6), (2, 3, 8), (4, 2, 8), (3, 3, 6)), seeds=4):
+    """
+    Solves the feeding phase of small stress games exactly, to measure the
+    search and how often states are found again through Dealer.zobrist.
+    :param positions: Tuples (players, species per player, watering hole) of
+    the games to solve.
+    :param seeds: The number of games of each position.
+    :return: A printable String of the results.
+    """
+    results = ""
+    for num_players, num_species, watering_hole in positions:
+        nodes = hits = exact = 0
+        seconds = 0.0
+        for seed in range(seeds):
+            dealer = stress_dealer(num_players, num_species, seed=seed,
+                                   watering_hole=watering_hole)
+            solver = FeedingSolver(node_budget=10 ** 6)
+            start = timeit.default_timer()
+            solution = solver.solve(dealer)
+            seconds += timeit.default_timer() - start
+            nodes += solution.nodes
+            hits += solution.hits
+            exact += solution.exact
+        results += "%d players x %d species, watering hole %d: %d/%d exact, %d nodes " \
+            "in %.2fs (%.0f nodes/second), %.0f%% table hits\n" % \
+            (num_players, num_species, watering_hole, exact, seeds, nodes, seconds,
+             nodes / seconds if seconds else 0.0, 100.0 * hits / max(nodes + hits, 1))
+    return results
+
+
+def bench_phases(num_players=5, num_games=200):
+    """
+    Times the phases of seeded games of Silly players with Dealer.instrument.
+    :return: The JSON String of the combined Instrumentation of all games.
+    """
+    stats = Instrumentation()
+    for seed in range(num_games):
+        random.seed(seed)
+        dealer = Dealer([Player() for _ in range(num_players)], seed)
+        dealer.instrument(stats)
+        dealer.run()
+    return stats.dump()
+
+
+BENCHMARKS = {
+    "clone": bench_clone,
+    "cooperation": bench_cooperation,
+    "decision_cache": bench_decision_cache,
+    "journal": bench_journal,
+    "phases": bench_phases,
+    "replay": bench_replay,
+    "scaling": bench_scaling,
+    "solver": bench_solver
+}
@@ -1,40 +1,182 @@
 from helpers import *
-from player_state import PlayerState
-from species import Species
+from player_state import PlayerState, Board
+from species import Species, IdAllocator, bind_ids
 from feeding import *
-from traitcard import TraitCard
+from traitcard import TraitCard, CARNIVORE, FAT_TISSUE, FERTILE, LONG_NECK
+from attack_index import AttackIndex
+from deck import Deck, DeckFactory, STANDARD_DECK
+from undo import UndoLog
+from action_plan import ActionPlan
+from zobrist import zobrist_key, slot_mix
+import instrumentation
+from journal import encode_cards, encode_species, encode_action, encode_feeding
 """
 A Dealer Object.
 """
 
 
+class PlayerList(list):
+    """
+    The List of PlayerStates of a game, which counts every change to the list
+    and every replacement of a player's species so that views of the players
+    can tell when they are out of date. Each player added points its owner at
+    the list, so assigning its species bumps the version.
+
+    Attributes:
+        version: Integer incremented whenever the list or the species of one of
+            its players is replaced.
+    """
+    def __init__(self, players=None):
+        list.__init__(self, players or [])
+        self.version = 0
+        self.adopt(self)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.adopt(self)
+
+    def adopt(self, players):
+        """
+        Points the owner of the given players at this list.
+        :param players: Iterable of PlayerStates added to this list.
+        """
+        for player in players:
+            if isinstance(player, PlayerState):
+                object.__setattr__(player, "owner", self)
+
+    def changed(self):
+        self.version += 1
+
+    def append(self, player):
+        list.append(self, player)
+        self.adopt([player])
+        self.changed()
+
+    def extend(self, players):
+        players = list(players)
+        list.extend(self, players)
+        self.adopt(players)
+        self.changed()
+
+    def insert(self, index, player):
+        list.insert(self, index, player)
+        self.adopt([player])
+        self.changed()
+
+    def remove(self, player):
+        list.remove(self, player)
+        self.changed()
+
+    def pop(self, *args):
+        player = list.pop(self, *args)
+        self.changed()
+        return player
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.changed()
+
+    def reverse(self):
+        list.reverse(self)
+        self.changed()
+
+    def __setitem__(self, index, player):
+        list.__setitem__(self, index, player)
+        self.adopt(self)
+        self.changed()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.changed()
+
+    def __setslice__(self, i, j, players):
+        players = list(players)
+        list.__setslice__(self, i, j, players)
+        self.adopt(players)
+        self.changed()
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self.changed()
+
+    def __iadd__(self, players):
+        players = list(players)
+        list.__iadd__(self, players)
+        self.adopt(players)
+        self.changed()
+        return self
+
+
 class Dealer(object):
     """
     A representation of a game of Evolution containing both the state of the game,
     and the API to progress though it.
 
     Attributes:
-        players: List of each players' PlayerState
-        deck: List of TraitCards representing the game's deck. Where the beginning
-            of the list is the top of the deck, and the end of the list is the bottom.
+        players: PlayerList of each players' PlayerState. Assigning a List of
+            PlayerStates replaces it with a new PlayerList.
+        deck: Deck of TraitCards representing the game's deck. Where the beginning
+            of the deck is the top, and the end of the deck is the bottom.
+            Assigning a List of TraitCards replaces it with a new Deck.
         watering_hole: Integer representing the board's number of available food tokens.
         current_player_index: Index of player_sets for the player whose turn it is.
         skipped_players: List of players who are no longer feeding in the current round.
+        attack_index: AttackIndex of the targets each carnivore in the game can attack.
+        opponents_view: Tuple (current_player_index, players, players version,
+            opponents, public opponents) of the last opponents computed, or None.
+        undo_log: UndoLog of the changes made since each open checkpoint.
+        deck_factory: DeckFactory which creates the deck when the game starts.
+        instrumentation: Instrumentation recording the time spent in each phase
+            of the game, or None while the game is not instrumented.
+        journal: Journal recording the game, or None.
+        verbose_journal: The journal if it is verbose, or None.
+        species_ids: IdAllocator of the ids of the species made while the game
+            runs, so games can run in several threads of one process.
     """
 
-    def __init__(self, player_interfaces):
+    # When True, every call to zobrist checks the kept hashes against a recompute.
+    check_zobrist = False
+
+    def __init__(self, player_interfaces, seed=None):
         """
         create a Dealer object
         :param player_interfaces: list of player interface
+        :param seed: The seed to shuffle the deck with, or None to play with the
+        standard deck in sorted order.
         """
         self.players = []
         self.deck = []
         self.watering_hole = 0
         self.current_player_index = 0
         self.skipped_players = []
+        self.attack_index = AttackIndex()
+        self.opponents_view = None
+        self.undo_log = UndoLog()
+        self.deck_factory = DeckFactory(seed)
+        self.instrumentation = None
+        self.journal = None
+        self.verbose_journal = None
+        self.species_ids = IdAllocator()
 
         for index, player in enumerate(player_interfaces):
             self.players.append(PlayerState(player, index + 1))
+        self.index_boards()
+
+    @property
+    def players(self):
+        return self._players
+
+    @players.setter
+    def players(self, players):
+        self._players = players if isinstance(players, PlayerList) else PlayerList(players)
+
+    @property
+    def deck(self):
+        return self._deck
+
+    @deck.setter
+    def deck(self, cards):
+        self._deck = cards if isinstance(cards, Deck) else Deck(cards)
 
     def __eq__(self, other):
         """Compares two dealer objects"""
@@ -47,33 +189,233 @@ class Dealer(object):
 
     def run(self):
         """
-        Runs a complete instance of the Evolution game.
+        Runs a complete instance of the Evolution game. The game only changes
+        state of its own, so games can be run in several threads at once. While
+        it runs, new species take their ids from species_ids, and if the game is
+        instrumented, the hot path calls of this thread are counted in its
+        instrumentation. If the game keeps a journal, the journal is flushed
+        when the game ends, even if it ends with an error.
+        """
+        self.species_ids.reserve(species.id for player in self.players
+                                 for species in player.species)
+        previous_ids = bind_ids(self.species_ids)
+        try:
+            if self.instrumentation is None:
+                self.run_game()
+                return
+            previous = instrumentation.activate(self.instrumentation)
+            try:
+                self.timed("run", self.run_game)
+            finally:
+                instrumentation.deactivate(previous)
+        finally:
+            bind_ids(previous_ids)
+            if self.journal is not None:
+                self.journal.flush()
+
+    def run_game(self):
+        """
+        Plays every round of the game.
         """
         self.create_deck()
-        while len(self.deck) > self.min_deck_size() and self.players:
-            self.skipped_players = []
-            self.make_initial_species()
-            self.deal_round()
-            self.players_start()
-            actions = self.get_player_actions()
-            self.validate_actions(actions)
-            self.apply_actions(actions)
-            self.reduce_species_pop()
-            self.move_food()
+        if self.journal is not None:
+            factory = self.deck_factory
+            self.journal.record(("game", tuple([player.name for player in self.players]),
+                                 factory.seed,
+                                 None if factory.template is STANDARD_DECK
+                                 else encode_cards(self.deck)))
+        while self.has_next_round():
+            self.run_round()
         self.move_food()
+        self.deck.compact()
+        if self.journal is not None:
+            self.journal.record(("end", tuple(tuple(score) for score in self.get_scores())))
+
+    def instrument(self, stats=None):
+        """
+        Starts recording the time spent in each phase of the game, the time
+        spent in each call to a player and the number of calls of hot path
+        functions, such as carnivore_targets and is_attackable.
+        :param stats: An Instrumentation to add to, eg. one shared by several
+        games, or None for a new one.
+        :return: The Instrumentation, which can be read or dumped as JSON after run.
+        """
+        if stats is None:
+            stats = self.instrumentation or instrumentation.Instrumentation()
+        self.instrumentation = stats
+        return stats
+
+    def keep_journal(self, journal):
+        """
+        Starts recording the game in the journal, or stops recording it. The
+        journal is flushed but left open when run ends, and its owner must
+        close it.
+        :param journal: A Journal, or None.
+        :return: The journal.
+        """
+        self.journal = journal
+        self.verbose_journal = journal if journal is not None and journal.verbose else None
+        return journal
+
+    def timed(self, name, function, *args):
+        """
+        Runs a phase of the game, timing it if the game is instrumented.
+        :param name: The String name of the phase.
+        :param function: The function running the phase, called with args.
+        :return: The result of the function.
+        """
+        if self.instrumentation is None:
+            return function(*args)
+        return self.instrumentation.time_phase(name, function, *args)
+
+    def ask(self, player, method, *args):
+        """
+        Calls a method of a player which asks its interface, timing it if the
+        game is instrumented.
+        :param player: The PlayerState.
+        :param method: The bound method of the player, called with args.
+        :return: The result of the method.
+        """
+        if self.instrumentation is None:
+            return method(*args)
+        return self.instrumentation.time_player(player.name, method, *args)
+
+    def has_next_round(self):
+        """
+        :return: True if there are players left and enough cards to deal a round.
+        """
+        return len(self.deck) > self.min_deck_size() and len(self.players) > 0
+
+    def run_round(self):
+        """
+        Runs one round of the Evolution game, from dealing cards to moving the
+        food tokens of every species to the food bags.
+        """
+        self.skipped_players = []
+        if not self.undo_log.active():
+            self.deck.compact()
+        if self.journal is not None:
+            self.journal.flush_if_full()
+            self.journal.record(("round", len(self.deck), self.watering_hole))
+        self.timed("make_initial_species", self.make_initial_species)
+        self.timed("deal_round", self.deal_round)
+        self.timed("players_start", self.players_start)
+        actions = self.timed("get_player_actions", self.get_player_actions)
+        plans = self.timed("validate_actions", self.validate_actions, actions)
+        self.timed("apply_actions", self.apply_actions, actions, plans)
+        self.timed("reduce_species_pop", self.reduce_species_pop)
+        self.timed("move_food", self.move_food)
+
+    def clone(self):
+        """
+        Copies the state of this game: players, species, hands, the deck,
+        watering hole, current player and skipped players. Player interfaces
+        and trait cards are shared with the copy rather than copied, so running
+        the copy still talks to the same interfaces.
+        :return: A new Dealer whose state is independent of this one.
+        """
+        clone = Dealer.__new__(Dealer)
+        clone.attack_index = AttackIndex()
+        clone._players = PlayerList([player.clone() for player in self.players])
+        clone._deck = self.deck.clone()
+        clone.watering_hole = self.watering_hole
+        clone.current_player_index = self.current_player_index
+        clone.skipped_players = list(self.skipped_players)
+        clone.opponents_view = None
+        clone.undo_log = UndoLog()
+        clone.deck_factory = self.deck_factory
+        clone.instrumentation = None
+        clone.journal = None
+        clone.verbose_journal = None
+        clone.species_ids = self.species_ids.clone()
+        clone.index_boards()
+        return clone
+
+    def zobrist(self):
+        """
+        Hashes the state of the game: every species' population, food, body, fat
+        storage and traits, the hands and food bags, the watering hole, the
+        number of cards left in the deck and the current player. Boards and
+        hands keep their hashes up to date by XORing in each change, so this
+        only combines one hash per player.
+        :return: A 64 bit Integer, equal for equal game states.
+        """
+        if Dealer.check_zobrist:
+            self.verify_zobrist()
+        value = zobrist_key("watering_hole", self.watering_hole) ^ \
+            zobrist_key("deck", len(self.deck)) ^ \
+            zobrist_key("current_player", self.current_player_index)
+        for index, player in enumerate(self.players):
+            value ^= slot_mix(player.zobrist(), index)
+        return value
+
+    def verify_zobrist(self):
+        """
+        Checks the hashes cached by every board and hand against a recompute.
+        :raise AssertionError: If a hash does not match its recompute.
+        """
+        for player in self.players:
+            player.verify_zobrist()
+
+    def checkpoint(self):
+        """
+        Opens a checkpoint which the game can be rolled back to, eg. to try out
+        apply_actions, feed1 or kill and undo them. Checkpoints can be nested.
+        Changes made after the checkpoint are recorded as they happen, so only
+        the species and players which change are saved.
+        """
+        self.undo_log.checkpoint()
+        self.undo_log.record(self)
+        self.index_boards()
+
+    def rollback(self):
+        """
+        Undoes every change made since the last checkpoint and closes it.
+        """
+        self.undo_log.rollback()
+        self.attack_index.clear()
+        self.index_boards()
+
+    def commit(self):
+        """
+        Closes the last checkpoint, keeping the changes made since.
+        """
+        self.undo_log.commit()
+        self.index_boards()
+
+    def snapshot(self):
+        """
+        :return: The state of the dealer for UndoLog.
+        """
+        return (self._players, list(self._players), self.watering_hole,
+                self.current_player_index, self.skipped_players,
+                list(self.skipped_players), self._deck, self._deck.top,
+                len(self._deck.cards))
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot.
+        :return: None, the dealer has no hungry sets.
+        """
+        players, list_of_players, self.watering_hole, self.current_player_index, \
+            skipped, list_of_skipped, deck, top, num_cards = snapshot
+        players[:] = list_of_players
+        skipped[:] = list_of_skipped
+        del deck.cards[num_cards:]
+        deck.top = top
+        self._players = players
+        self.skipped_players = skipped
+        self._deck = deck
+        return None
 
     def create_deck(self):
         """
-        Creates a deck of TraitCards.
+        Creates a deck of TraitCards from the standard deck template, shuffled
+        if the game has a seed.
         Creates 7 cards of each Trait with a value of [-3,3] except for carnivore
         where there are 17 cards created with a value of [-8,8].
         """
-        for trait in TraitCard.traits:
-            num_cards = 7
-            if trait == "carnivore":
-                num_cards = 17
-            self.deck.extend(TraitCard.gen_cards(num_cards, trait))
-        self.deck.sort(TraitCard.compare)
+        self.deck = self.deck_factory.new_deck()
 
     def make_initial_species(self):
         """
@@ -111,7 +453,11 @@ class Dealer(object):
         Calls start on each player with the current amount of food in the WH.
         """
         for player in self.players:
-            player.start(self.watering_hole)
+            if self.journal is not None:
+                self.journal.record(("start", player.name, self.watering_hole, player.food_bag,
+                                     encode_cards(player.hand),
+                                     tuple(map(encode_species, player.species))))
+            self.ask(player, player.start, self.watering_hole)
 
     def get_player_actions(self):
         """
@@ -124,7 +470,10 @@ class Dealer(object):
         after = map(lambda plr: plr.species, self.players)
         for player in self.players:
             after = after[1:]
-            choice = player.choose(before, after)
+            choice = self.ask(player, player.choose, before, after)
+            if self.journal is not None:
+                self.journal.record(("choose", player.name,
+                                     encode_action(choice) if choice else None))
             if choice:
                 actions.append(choice)
             else:
@@ -138,26 +487,34 @@ class Dealer(object):
         """
         Ensures that the list of actions contains valid actions for each player
         in the game. Removes any players whose actions are not valid.
-        Effect: removes players from the self.players whose actions are invalid.
+        Effect: removes players from the self.players whose actions are invalid,
+        journaling the reason each action was rejected.
         :param actions: The list of Actions containing the requested Action of
         each player.
+        :return: List of the ActionPlans of the remaining players, in order, to
+        be committed by apply_actions without checking them again.
         """
+        plans = []
         to_remove = []
-        for i in range(len(self.players)):
-            if not self.players[i].is_valid_action(actions[i]):
-                to_remove.append(i)
-        for i in to_remove:
-            self.remove_player(self.players[i])
-            remaining_actions = []
-            for index, action in enumerate(actions):
-                if index not in to_remove:
-                    remaining_actions.append(action)
+        for player, action in zip(self.players, actions):
+            plan = ActionPlan(player, action)
+            if plan.valid():
+                plans.append(plan)
+            else:
+                if self.journal is not None:
+                    self.journal.record(("reject", player.name, plan.reason))
+                to_remove.append(player)
+        for player in to_remove:
+            self.remove_player(player)
+        return plans
 
     def remove_player(self, player):
         """
         Removes the given player from the game permenantly.
         :param player: the player to remove from the game.
         """
+        if self.journal is not None:
+            self.journal.record(("remove", player.name))
         self.players.remove(player)
         if self.current_player_index == len(self.players):
             self.current_player_index = 0
@@ -165,37 +522,87 @@ class Dealer(object):
     def reduce_species_pop(self):
         """
         Reduces each players species population to its food amount at the end of
-        a round.
+        a round. Each board is reduced in one pass, its extinct species are
+        removed together and their 2 replacement cards each are dealt in one deal.
+
+        This gives the same boards and card order as killing one population token
+        at a time while looping over the board, including that the species just
+        after one that goes extinct is not reduced, as the board shifted under
+        that loop.
         """
+        journaled = self.journal is not None
         for player in self.players:
-            for species in player.species:
-                to_kill = species.population - species.food
-                for _ in range(to_kill):
-                    self.kill(player, species)
+            extinct = set()
+            skip = False
+            reduced = False
+            for species in list(player.species):
+                if skip:
+                    skip = False
+                elif species.population > species.food:
+                    species.population = species.food
+                    reduced = True
+                    if species.population == 0:
+                        extinct.add(id(species))
+                        skip = True
+            if reduced and journaled:
+                self.journal.record(("reduce", player.name,
+                                     tuple(species.population for species in player.species)))
+            if extinct:
+                player.species[:] = [species for species in player.species
+                                     if id(species) not in extinct]
+                self.deal(2 * len(extinct), player)
 
     def move_food(self):
         """
         Moves all food tokens from each players species to their food_bags.
         """
+        journaled = self.journal is not None
         for player in self.players:
+            food_bag = player.food_bag
             player.move_food_to_bag()
+            if journaled and player.food_bag != food_bag:
+                self.journal.record(("move_food", player.name, player.food_bag))
 
-    def apply_actions(self, actions):
+    def apply_actions(self, actions, plans=None):
         """
         Applies the given list of Actions and feeds the players' species until
-        they cannot feed anymore.
+        they cannot feed anymore. Players whose actions are invalid are removed
+        rather than applied.
         :param actions: List-of Action where action i corresponds with the action
         of the i'th player.
+        :param plans: List of the ActionPlans validate_actions returned for the
+        actions, or None to validate them here.
         """
-        self.reveal_cards(actions)
+        if plans is None:
+            plans = self.validate_actions(actions)
+        self.reveal_cards([plan.action for plan in plans])
         self.trigger_auto_traits()
-
-        for player, action in zip(self.players, actions):
-            player.apply_action(action)
+        for plan in plans:
+            plan.commit()
 
         self.move_fat_food()
+        self.attack_index.clear()
+        self.timed("feed_all", self.feed_all)
+        for player in self.players:
+            player.species.forget()
+
+    def index_boards(self):
+        """
+        Makes the species boards of every player use this game's attack index,
+        and its undo log while a checkpoint is open.
+        """
+        undo_log = self.undo_log if self.undo_log.active() else None
+        for player in self.players:
+            player.species.attack_index = self.attack_index
+            player.species.undo_log = undo_log
+
+    def feed_all(self):
+        """
+        Feeds the players' species until the watering hole is empty or every
+        player has been skipped.
+        """
         while self.watering_hole > 0 and len(self.players) != len(self.skipped_players):
-            self.feed1()
+            self.timed("feed1", self.feed1)
 
     def reveal_cards(self, actions):
         """
@@ -203,10 +610,14 @@ class Dealer(object):
         the waterin' hole.
         :param actions: List of Actions to get the food card selections from.
         """
+        journaled = self.journal is not None
         for action, player in zip(actions, self.players):
             food_card = player.hand[action.food_card]
             self.watering_hole += food_card.food_points
-            food_card.used = True
+            player.use_card(action.food_card)
+            if journaled:
+                self.journal.record(("reveal", player.name, action.food_card,
+                                     food_card.food_points))
 
         self.watering_hole = max(self.watering_hole, 0)
 
@@ -215,16 +626,37 @@ class Dealer(object):
         Automatically updates the population or body size of a species with the
         Fertile or Long Neck traits
         """
+        journaled = self.journal is not None
         for player in self.players:
+            if journaled:
+                self.record_trigger("fertile", player, FERTILE)
             player.trigger_fertile()
         for player in self.players:
             self.watering_hole = player.trigger_long_neck(self.watering_hole)
+            if journaled:
+                self.record_trigger("long_neck", player, LONG_NECK, self.watering_hole)
+
+    def record_trigger(self, kind, player, bit, *items):
+        """
+        Records an event of a trait triggering for the species with the trait.
+        :param kind: The String kind of the event.
+        :param player: The PlayerState whose species have the trait.
+        :param bit: The trait's bit in a trait mask.
+        :param items: The items of the event after the species indices.
+        """
+        indices = [index for index, species in enumerate(player.species)
+                   if species.trait_mask & bit]
+        if indices:
+            self.journal.record((kind, player.name, tuple(indices)) + items)
 
     def move_fat_food(self):
         """
         Moves fat-food to normal food
         """
+        journaled = self.journal is not None
         for player in self.players:
+            if journaled:
+                self.record_trigger("fat_food", player, FAT_TISSUE)
             player.trigger_fat_food()
 
     def feed1(self):
@@ -236,6 +668,7 @@ class Dealer(object):
         current_player = self.players[self.current_player_index]
         if self.watering_hole <= 0:
             return
+        self.index_boards()
 
         if self.current_player_index in self.skipped_players or \
                 not current_player.can_feed(self.opponents()):
@@ -246,6 +679,8 @@ class Dealer(object):
         feeding = self.next_feed()
 
         if feeding and self.validate_feeding(feeding):
+            if self.journal is not None:
+                self.journal.record(("feeding", current_player.name, encode_feeding(feeding)))
             feeding.apply(self)
             self.rotate_players()
         else:
@@ -272,8 +707,14 @@ class Dealer(object):
         :param player: The player whose species is being killed.
         :param species: The species who is being killed.
         """
+        journaled = self.journal is not None
+        if journaled:
+            index = player.species.index(species)
+            self.journal.record(("kill", player.name, index))
         extinct = player.kill(species)
         if extinct:
+            if journaled:
+                self.journal.record(("extinct", player.name, index))
             self.deal(2, player)
 
     def skip_cur_player(self):
@@ -281,6 +722,8 @@ class Dealer(object):
         Removes the current player from the player feeding order.
         """
         if self.current_player_index not in self.skipped_players:
+            if self.verbose_journal is not None:
+                self.journal.record(("skip", self.players[self.current_player_index].name))
             self.skipped_players.append(self.current_player_index)
 
     def next_feed(self):
@@ -292,8 +735,12 @@ class Dealer(object):
         auto_eat = self.auto_eat()
         if auto_eat is None:
             current_player = self.players[self.current_player_index]
-            opponents = map(lambda plr: plr.public_state(), self.opponents())
-            next_feeding = current_player.next_feeding(self.watering_hole, opponents)
+            opponents = self.public_opponents()
+            next_feeding = self.ask(current_player, current_player.next_feeding,
+                                    self.watering_hole, opponents)
+            if self.journal is not None:
+                self.journal.record(("next_feeding", current_player.name,
+                                     encode_feeding(next_feeding) if next_feeding else None))
             if next_feeding:
                 return next_feeding
             else:
@@ -309,18 +756,14 @@ class Dealer(object):
         :return: A Feeding, or None if a feeding choice cannot be automatic.
         """
         cur_player_species = self.players[self.current_player_index].species
-
-        hungry_herbivores = [species for species in cur_player_species
-                             if "carnivore" not in species.traits and species.can_eat()]
-        hungry_carnivores = [species for species in cur_player_species
-                             if "carnivore" in species.traits and species.can_eat()]
+        hungry_herbivores, hungry_carnivores, _ = cur_player_species.hungry()
 
         if len(hungry_herbivores) == 1 and len(hungry_carnivores) == 0:
-            eater = hungry_herbivores[0]
+            eater = next(iter(hungry_herbivores))
             return self.herbivore_autoeat(eater, cur_player_species)
 
         if len(hungry_carnivores) == 1 and len(hungry_herbivores) == 0:
-            eater = hungry_carnivores[0]
+            eater = next(iter(hungry_carnivores))
             return self.carnivore_autoeat(eater, cur_player_species)
         return None
 
@@ -332,7 +775,7 @@ class Dealer(object):
         eater must be an element of this list.
         """
         herbivore_index = cur_player_species.index(eater)
-        if "fat-tissue" in eater.traits and eater.fat_storage < eater.body:
+        if eater.trait_mask & FAT_TISSUE and eater.fat_storage < eater.body:
             max_food = eater.body - eater.fat_storage
             food_requested = min(self.watering_hole, max_food)
             return FatTissueFeeding(herbivore_index, food_requested)
@@ -350,10 +793,10 @@ class Dealer(object):
         targets = carnivore_targets(eater, self.opponents())
 
         if len(targets) == 1:
-            target_player = next(player for player in self.players
-                                 if targets[0] in player.species)
-            defender_index = target_player.species.index(targets[0])
-            target_index = self.opponents().index(target_player)
+            opponents = self.opponents()
+            target_index = next(index for index, player in enumerate(opponents)
+                                if targets[0].board is player.species)
+            defender_index = opponents[target_index].species.index(targets[0])
             return CarnivoreFeeding(carnivore_index, target_index, defender_index)
 
     def feed_scavengers(self):
@@ -362,6 +805,8 @@ class Dealer(object):
         """
         for player in self.players:
             self.watering_hole = player.trigger_scavenging(self.watering_hole)
+        if self.journal is not None:
+            self.journal.record(("scavenge", self.watering_hole))
 
     def feed(self, player, species):
         """
@@ -370,6 +815,9 @@ class Dealer(object):
         :param species: The species the player is feeding.
         """
         self.watering_hole = player.feed(species, self.watering_hole)
+        if self.verbose_journal is not None:
+            self.journal.record(("feed", player.name, player.species.index(species),
+                                 self.watering_hole))
 
     def deal(self, num_cards, player):
         """
@@ -377,10 +825,10 @@ class Dealer(object):
         :param num_cards: The number of cards to deal to the player.
         :param player: The player receiving the cards.
         """
-        to_deal = min(num_cards, len(self.deck))
-        for i in range(to_deal):
-            card = self.deck.pop(0)
-            player.hand.append(card)
+        cards = self.deck.deal(num_cards)
+        if self.journal is not None:
+            self.journal.record(("deal", player.name, len(cards)))
+        player.take_cards(cards)
 
     def check_for_hungries(self, list_of_species):
         """
@@ -388,6 +836,9 @@ class Dealer(object):
         :param list_of_species: The players list of species.
         :return: List of hungry species.
         """
+        if isinstance(list_of_species, Board):
+            hungry_herbivores, hungry_carnivores, _ = list_of_species.hungry()
+            return list_of_species.in_order(hungry_herbivores | hungry_carnivores)
         hungries = []
         for species in list_of_species:
             if species.can_eat():
@@ -396,12 +847,39 @@ class Dealer(object):
 
     def opponents(self):
         """
-        get the player states of all non-current player
-        :return: a list of player states
+        get the player states of all non-current player. The result is computed
+        once per turn, until the current player index, the list of players or
+        the species of a player is replaced.
+        :return: a read-only tuple of player states
+        """
+        return self.view_opponents()[3]
+
+    def public_opponents(self):
+        """
+        get the public states of all non-current player, computed once per turn
+        like opponents.
+        :return: a read-only tuple of the player states' public_state
+        """
+        view = self.view_opponents()
+        if view[4] is None:
+            view = self.opponents_view = \
+                view[:4] + (tuple(plr.public_state() for plr in view[3]),)
+        return view[4]
+
+    def view_opponents(self):
+        """
+        Recomputes opponents_view if the current player index, the list of
+        players or the species of a player was replaced since it was computed.
+        :return: The up to date opponents_view.
         """
-        opponents = [plr for plr in self.players]
-        opponents.pop(self.current_player_index)
-        return opponents
+        view = self.opponents_view
+        index = self.current_player_index
+        players = self.players
+        if view is None or view[0] != index or view[1] is not players or \
+                view[2] != players.version:
+            opponents = tuple(players[:index]) + tuple(players[index + 1:])
+            view = self.opponents_view = (index, players, players.version, opponents, None)
+        return view
 
     def get_scores(self):
         """
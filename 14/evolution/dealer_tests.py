@@ -1,4 +1,10 @@
 import copy
+import glob
+import json
+import os
+import random
+import sys
+import threading
 import unittest
 import test_utils
 from dealer import *
@@ -7,6 +13,80 @@ from traitcard import TraitCard
 from player import Player
 from convert_tests import TestConvert
 from actions import *
+from benchmarks import mid_game_dealer
+from test_utils import random_dealer
+from convert import Convert
+from journal import Journal
+from action_plan import DUPLICATE_CARD, CARD_OUT_OF_RANGE
+from io import BytesIO
+
+
+def reduce_by_token(dealer):
+    """
+    Reduces populations the way Dealer.reduce_species_pop used to, killing one
+    population token at a time, to check the bulk reduction against.
+    """
+    for player in dealer.players:
+        for species in player.species:
+            for _ in range(species.population - species.food):
+                dealer.kill(player, species)
+
+
+def game_state(dealer):
+    """
+    :return: The boards, hands and deck of the dealer as comparable Lists.
+    """
+    return ([[(spec.population, spec.food, spec.body, list(spec.traits), spec.fat_storage)
+              for spec in player.species] for player in dealer.players],
+            [list(player.hand) for player in dealer.players],
+            list(dealer.deck))
+
+
+def play_seeded(seed, instrumented):
+    """
+    Plays a seeded game of 4 Silly players, where the first player starts with
+    a carnivore and there is food for it to attack.
+    :return: The scores, final boards and species ids of the game, and the
+    counters of its Instrumentation or None.
+    """
+    dealer = Dealer([Player() for _ in range(4)], seed)
+    carnivore = Species(3, 0, 2, ["carnivore"])
+    carnivore.id = dealer.species_ids.next_id()
+    dealer.players[0].species = [carnivore]
+    dealer.watering_hole = 30
+    stats = dealer.instrument() if instrumented else None
+    dealer.run()
+    return (dealer.get_scores(), game_state(dealer),
+            [[species.id for species in player.species] for player in dealer.players],
+            stats and stats.counters)
+
+
+class TestThreadedGames(unittest.TestCase):
+
+    def test_threads_match_serial(self):
+        games = [(seed, seed % 2 == 0) for seed in range(36)]
+        serial = [play_seeded(*game) for game in games]
+        threaded = [None] * len(games)
+        start = threading.Event()
+
+        def run(index):
+            start.wait()
+            threaded[index] = play_seeded(*games[index])
+
+        interval = sys.getcheckinterval()
+        sys.setcheckinterval(10)
+        try:
+            threads = [threading.Thread(target=run, args=(index,))
+                       for index in range(len(games))]
+            for thread in threads:
+                thread.start()
+            start.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setcheckinterval(interval)
+        self.assertEqual(threaded, serial)
+        self.assertTrue(any(result[3] for result in serial))
 
 
 class TestDealer(unittest.TestCase):
@@ -63,6 +143,100 @@ class TestDealer(unittest.TestCase):
         opponents_name_2 = filter(lambda p: p.name == 2, opponents)
         self.assertEqual(0, len(opponents_name_2))
 
+    def test_opponents_view(self):
+        players = self.dealer.players
+        opponents = self.dealer.opponents()
+        self.assertIs(self.dealer.opponents(), opponents)
+        self.assertEqual(list(opponents), [players[0], players[1], players[3]])
+        public = self.dealer.public_opponents()
+        self.assertIs(self.dealer.public_opponents(), public)
+        self.assertEqual([plr.name for plr in public], [0, 1, 3])
+        self.assertIs(public[0].species, players[0].species)
+        self.assertEqual(public[0].hand, [])
+
+        players[1].species = [self.species_3]
+        public = self.dealer.public_opponents()
+        self.assertIs(public[1].species, players[1].species)
+        self.dealer.checkpoint()
+        players[1].species = []
+        self.assertEqual(self.dealer.public_opponents()[1].species, [])
+        self.dealer.rollback()
+        self.assertIs(self.dealer.public_opponents()[1].species, players[1].species)
+
+        p0, p1, p2, p3 = players
+        self.dealer.rotate_players()
+        self.assertEqual(list(self.dealer.opponents()), [p0, p1, p2])
+        self.dealer.remove_player(p1)
+        self.assertEqual(list(self.dealer.opponents()), [p2, p3])
+        self.dealer.players = [p3, p0]
+        self.assertEqual(list(self.dealer.opponents()), [p0])
+
+    def test_opponents_view_copies(self):
+        players = self.dealer.players
+        self.assertIs(players[1].owner, players)
+        version = players.version
+        players[1].species = []
+        self.assertEqual(players.version, version + 1)
+        dealer = copy.deepcopy(self.dealer)
+        opponents = dealer.opponents()
+        self.assertIs(dealer.players[1].owner, dealer.players)
+        self.assertIsNone(copy.deepcopy(players[1]).owner)
+        dealer.players[1].species = [Species()]
+        self.assertIsNot(dealer.opponents(), opponents)
+        self.assertIs(dealer.opponents()[1].species, dealer.players[1].species)
+
+    def test_public_state_reused(self):
+        player = self.dealer.players[0]
+        public = player.public_state()
+        self.assertIs(player.public_state(), public)
+        player.species = [self.species_3]
+        self.assertIsNot(player.public_state(), public)
+        self.assertEqual(player.public_state().species, [self.species_3])
+
+    def test_reject_actions(self):
+        journal = self.dealer.keep_journal(Journal(BytesIO(), verbose=True))
+        p0, p1, p2, p3 = self.dealer.players
+        for player in self.dealer.players:
+            player.hand = [TraitCard("horns", 1)]
+        actions = [Action(0, [], [], [], []), Action(0, [PopGrow(0, 0)], [], [], []),
+                   Action(1, [], [], [], []), Action(0, [], [], [], [])]
+        self.dealer.apply_actions(actions)
+        self.assertEqual(list(self.dealer.players), [p0, p3])
+        self.assertEqual(p1.hand, [TraitCard("horns", 1)])
+        self.assertEqual(p2.species[0].food, 3)
+        self.assertEqual(journal.events[:4], [("reject", 1, DUPLICATE_CARD),
+                                              ("reject", 2, CARD_OUT_OF_RANGE),
+                                              ("remove", 1), ("remove", 2)])
+        self.assertEqual(journal.events[4:6], [("reveal", 0, 0, 1), ("reveal", 3, 0, 1)])
+
+    def test_clone(self):
+        self.dealer.deck = [TraitCard("horns", 1), TraitCard("ambush", 2)]
+        self.dealer.players[1].hand = [TraitCard("climbing", 3)]
+        self.dealer.skipped_players = [0]
+        before = copy.deepcopy(self.dealer)
+        clone = self.dealer.clone()
+        self.check_dealer(self.dealer, clone, {})
+        self.assertEqual(clone.skipped_players, [0])
+        self.assertIs(clone.players[1].interface, self.dealer.players[1].interface)
+        self.assertIs(clone.players[1].hand[0], self.dealer.players[1].hand[0])
+
+        clone.players[2].species[0].traits.append("carnivore")
+        clone.feed1()
+        clone.kill(clone.players[0], clone.players[0].species[0])
+        clone.deal(2, clone.players[1])
+        clone.players[3].species.append(Species())
+        clone.skip_cur_player()
+        self.check_dealer(before, self.dealer, {})
+        self.assertEqual(self.dealer.skipped_players, [0])
+
+    def test_clone_mid_game(self):
+        dealer = mid_game_dealer(5)
+        before = copy.deepcopy(dealer)
+        clone = dealer.clone()
+        while clone.has_next_round():
+            clone.run_round()
+        self.check_dealer(before, dealer, {})
+
     def test_auto_eat_fat_tissue(self):
         self.dealer.current_player_index = 2
         self.species_3.traits = ["fat-tissue"]
@@ -415,21 +589,15 @@ class TestDealer(unittest.TestCase):
         actions = [Action(0, [], [], [BoardAddition(0, [1, 2])], []), Action(0, [], [], [], []),
                    Action(0, [], [], [], []), Action(0, [], [], [], [])]
 
-        changes = {
-            "watering_hole": 13,
-            "current_player_index": 1,
-            "players": {0: {"hand": [],
-                            "species": {1: {"body": 0,
-                                            "food": 1,
-                                            "fat_storage": 0,
-                                            "population": 1,
-                                            "traits": ["climbing", "climbing"]}}},
-                        1: {"hand": []},
-                        2: {"hand": [], "species": {0: {"food": 4}}},
-                        3: {"hand": [], "species": {0: {"food": 4}}}}
-        }
-
-        self.apply_actions(changes, actions)
+        # The payment card is also the food card and both traits are climbing,
+        # so the action is rejected and its player removed before feeding.
+        p0 = self.dealer.players[0]
+        self.dealer.apply_actions(actions)
+        self.assertNotIn(p0, self.dealer.players)
+        self.assertEqual(len(p0.hand), 3)
+        self.assertEqual(len(p0.species), 1)
+        self.assertEqual(self.dealer.watering_hole, 14)
+        self.assertEqual([player.species[0].food for player in self.dealer.players], [4, 4, 4])
 
     def test_create_deck(self):
         self.dealer.create_deck()
@@ -441,6 +609,25 @@ class TestDealer(unittest.TestCase):
                 self.assertEqual(len(cards), 7)
         self.assertEqual(len(self.dealer.deck), 122)
 
+    def test_seeded_games(self):
+        def scores(seed):
+            random.seed(0)
+            dealer = Dealer([Player() for _ in range(4)], seed)
+            dealer.run()
+            return dealer.get_scores()
+        self.assertEqual(scores(5), scores(5))
+        self.assertNotEqual(scores(5), scores(None))
+        dealer = Dealer([Player()], 5)
+        dealer.create_deck()
+        self.assertEqual(dealer.clone().deck_factory.seed, 5)
+
+    def test_deck_compacted(self):
+        random.seed(0)
+        dealer = Dealer([Player() for _ in range(4)], 3)
+        dealer.run()
+        self.assertEqual(dealer.deck.top, 0)
+        self.assertEqual(len(dealer.deck.cards), len(dealer.deck))
+
     def test_compare_cards(self):
         card0 = TraitCard("climbing", 0)
         card1 = TraitCard("burrowing", 3)
@@ -495,6 +682,33 @@ class TestDealer(unittest.TestCase):
         }
         self.check_dealer(before, self.dealer, changes)
 
+    def check_reduce_species_pop(self, dealer):
+        dealer.deck = [TraitCard(trait, 0) for trait in TraitCard.traits]
+        expected = copy.deepcopy(dealer)
+        reduce_by_token(expected)
+        dealer.reduce_species_pop()
+        self.assertEqual(game_state(dealer), game_state(expected))
+        for player in dealer.players:
+            player.species.verify_hunger()
+
+    def test_reduce_species_pop_xstep(self):
+        pattern = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..", "tests", "xstep", "*-in.json")
+        paths = glob.glob(pattern)
+        self.assertTrue(paths)
+        for path in paths:
+            with open(path) as f:
+                try:
+                    dealer = Convert.json_to_dealer(json.load(f))
+                except AssertionError:
+                    continue
+            self.check_reduce_species_pop(dealer)
+
+    def test_reduce_species_pop_random(self):
+        rand = random.Random(1600)
+        for _ in range(300):
+            self.check_reduce_species_pop(random_dealer(rand))
+
     def test_move_food(self):
         before = copy.deepcopy(self.dealer)
         self.dealer.move_food()
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+import threading
+from globals import DECISION_CACHE_SIZE
+"""
+A cache of the decisions of a player strategy, keyed by the situation the
+strategy was asked to decide on.
+"""
+
+
+def encode_board(list_of_species):
+    """
+    :param list_of_species: List of Species from left to right.
+    :return: A hashable Tuple of the population, food, body, fat storage and
+    traits of each species, in order.
+    """
+    return tuple((spec.population, spec.food, spec.body, spec.fat_storage,
+                  tuple(spec.traits))
+                 for spec in list_of_species)
+
+
+def encode_hand(hand):
+    """
+    :param hand: List of TraitCards.
+    :return: A hashable Tuple of the trait and food points of each card, in order.
+    """
+    return tuple((card.trait, card.food_points) for card in hand)
+
+
+def encode_player(player):
+    """
+    :param player: A PlayerState.
+    :return: A hashable Tuple of the player's board, hand and food bag.
+    """
+    return (encode_board(player.species), encode_hand(player.hand), player.food_bag)
+
+
+class DecisionCache(object):
+    """
+    A table of decisions with least recently used eviction. Decisions are
+    Actions and Feedings, which refer to species and cards by index, so a
+    decision made for one situation is valid in every situation with the same
+    encoding. The dealer never changes a decision, so the same object can be
+    returned every time. A cache can be shared by games running in several
+    threads, which update it under lock.
+
+    Attributes:
+        capacity: The number of decisions kept before the least recently used
+            one is evicted.
+        table: OrderedDictionary of key to decision, least recently used first.
+        lookups: The number of decisions looked up in the table.
+        misses: The number of lookups that had to ask the strategy.
+        evictions: The number of decisions evicted to make room.
+        lock: Lock held while reading or changing the table and counters, but
+            not while the strategy decides.
+    """
+    def __init__(self, capacity=DECISION_CACHE_SIZE):
+        self.capacity = capacity
+        self.table = OrderedDict()
+        self.lookups = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def clear(self):
+        """
+        Removes all decisions from the table and resets the counters.
+        """
+        with self.lock:
+            self.table = OrderedDict()
+            self.lookups = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        :return: A dictionary of the table's size, hits, misses, evictions and
+        hit rate.
+        """
+        with self.lock:
+            lookups, misses, evictions = self.lookups, self.misses, self.evictions
+            size = len(self.table)
+        hits = lookups - misses
+        return {"size": size,
+                "hits": hits,
+                "misses": misses,
+                "evictions": evictions,
+                "hit_rate": float(hits) / lookups if lookups else 0.0}
+
+    def decide(self, key, strategy):
+        """
+        Looks up the decision for the key, asking the strategy on a miss.
+        :param key: Hashable encoding of everything the strategy decides on.
+        :param strategy: Function of no arguments which makes the decision.
+        :return: The decision.
+        """
+        with self.lock:
+            self.lookups += 1
+            table = self.table
+            decision = table.pop(key, None)
+            if decision is not None:
+                table[key] = decision
+                return decision
+            self.misses += 1
+        decision = strategy()
+        if decision is None:
+            return None
+        with self.lock:
+            table = self.table
+            # Another thread may have decided the same key meanwhile.
+            if table.pop(key, None) is None and len(table) >= self.capacity:
+                table.popitem(last=False)
+                self.evictions += 1
+            table[key] = decision
+        return decision
+
+
+class CachedPlayer(object):
+    """
+    A player interface which puts a DecisionCache in front of another player
+    interface. The wrapped strategy must only decide on what it is given: the
+    player's board, hand and food bag, the watering hole and the opponents'
+    boards. A cache can be shared by every CachedPlayer wrapping the same
+    kind of strategy, so positions that repeat across games are only decided once.
+
+    Attributes:
+        interface: The wrapped player interface.
+        cache: The DecisionCache of the wrapped strategy's decisions.
+        player_state: The PlayerState given by the last call to start.
+        watering_hole: The watering hole given by the last call to start.
+    """
+    def __init__(self, interface, cache=None):
+        self.interface = interface
+        self.cache = cache if cache is not None else DecisionCache()
+        self.player_state = None
+        self.watering_hole = None
+
+    def start(self, player_state, wh):
+        """
+        Gives the player and the wrapped interface their state at the
+        beginning of a round.
+        :param player_state: The PlayerState representing this player.
+        :param wh: The number of food tokens in the watering hole.
+        """
+        self.player_state = player_state
+        self.watering_hole = wh
+        self.interface.start(player_state, wh)
+
+    def choose(self, choice):
+        """
+        Returns the wrapped interface's Action for the round, from the cache if
+        it has chosen in the same situation before.
+        :param choice: A Choice of the boards of the players before and after
+        this player.
+        :return: An Action.
+        """
+        key = ("choose", encode_player(self.player_state), self.watering_hole,
+               tuple(encode_board(board) for board in choice.before),
+               tuple(encode_board(board) for board in choice.after))
+        return self.cache.decide(key, lambda: self.interface.choose(choice))
+
+    def next_feeding(self, player, food_available, opponents):
+        """
+        Returns the wrapped interface's next feeding, from the cache if it has
+        fed in the same situation before.
+        :param player: the PlayerState of the player who is feeding
+        :param food_available: the amount of food on the watering hole board
+        :param opponents: the PlayerStates of other players in the game
+        :return: A Feeding.
+        """
+        key = ("next_feeding", encode_player(player), food_available,
+               tuple(encode_board(opponent.species) for opponent in opponents))
+        return self.cache.decide(
+            key, lambda: self.interface.next_feeding(player, food_available, opponents))
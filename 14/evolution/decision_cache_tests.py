@@ -0,0 +1,126 @@
+import random
+import threading
+import unittest
+from dealer import Dealer
+from player import Player
+from player_state import PlayerState
+from species import Species
+from traitcard import TraitCard
+from feeding import *
+from decision_cache import DecisionCache, CachedPlayer, encode_board
+
+
+class CountingPlayer(Player):
+    """
+    A Silly player which counts the decisions it is asked to make.
+    """
+    def __init__(self):
+        Player.__init__(self)
+        self.decisions = 0
+
+    def choose(self, choice):
+        self.decisions += 1
+        return Player.choose(self, choice)
+
+    def next_feeding(self, player, food_available, opponents):
+        self.decisions += 1
+        return Player.next_feeding(self, player, food_available, opponents)
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.player = PlayerState(None, 1, species=[Species(2, 0, 1), Species(3, 1, 2)],
+                                  hand=[TraitCard("carnivore", 3)])
+        self.opponents = [PlayerState(None, 2, species=[Species(1, 0, 0, ["climbing"])])]
+        self.strategy = CountingPlayer()
+        self.cached = CachedPlayer(self.strategy, DecisionCache(2))
+
+    def next_feeding(self, food_available=5):
+        return self.cached.next_feeding(self.player, food_available, self.opponents)
+
+    def test_hit(self):
+        feeding = self.next_feeding()
+        self.assertEqual(feeding, HerbivoreFeeding(1))
+        self.assertIs(self.next_feeding(), feeding)
+        self.assertEqual(self.strategy.decisions, 1)
+        self.assertEqual(self.cached.cache.stats(),
+                         {"size": 1, "hits": 1, "misses": 1, "evictions": 0,
+                          "hit_rate": 0.5})
+
+    def test_key(self):
+        self.next_feeding()
+        self.next_feeding(4)
+        self.player.species[0].food = 1
+        self.next_feeding()
+        self.assertEqual(self.strategy.decisions, 3)
+        self.player.species[0].food = 0
+        self.opponents[0].species[0].traits = ["burrowing"]
+        self.next_feeding()
+        self.assertEqual(self.strategy.decisions, 4)
+
+    def test_equal_situations(self):
+        self.next_feeding()
+        self.player = PlayerState(None, 3, species=[Species(2, 0, 1), Species(3, 1, 2)],
+                                  hand=[TraitCard("carnivore", 3)])
+        self.opponents = [PlayerState(None, 4, species=[Species(1, 0, 0, ["climbing"])])]
+        self.next_feeding()
+        self.assertEqual(self.strategy.decisions, 1)
+
+    def test_lru_eviction(self):
+        cache = self.cached.cache
+        self.next_feeding(1)
+        self.next_feeding(2)
+        self.next_feeding(1)
+        self.next_feeding(3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache.table), 2)
+        self.next_feeding(1)
+        self.assertEqual(self.strategy.decisions, 3)
+        self.next_feeding(2)
+        self.assertEqual(self.strategy.decisions, 4)
+
+    def test_clear(self):
+        self.next_feeding()
+        self.cached.cache.clear()
+        self.assertEqual(self.cached.cache.stats()["size"], 0)
+        self.next_feeding()
+        self.assertEqual(self.strategy.decisions, 2)
+
+    def test_threads(self):
+        cache = DecisionCache(3)
+
+        def run():
+            for index in range(2000):
+                cache.decide(index % 5, lambda: index % 5)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 16000)
+        self.assertEqual(stats["size"], 3)
+        self.assertLessEqual(stats["evictions"], stats["misses"])
+        self.assertTrue(all(key == decision for key, decision in cache.table.items()))
+
+    def test_encode_board(self):
+        self.assertEqual(encode_board([Species(2, 1, 3, ["fat-tissue", "climbing"], 2)]),
+                         ((2, 1, 3, 2, ("fat-tissue", "climbing")),))
+
+    def test_same_games(self):
+        cache = DecisionCache()
+        for seed in range(5):
+            random.seed(seed)
+            plain = Dealer([Player() for _ in range(4)])
+            plain.run()
+            random.seed(seed)
+            cached = Dealer([CachedPlayer(Player(), cache) for _ in range(4)])
+            cached.run()
+            self.assertEqual(cached.get_scores(), plain.get_scores())
+        self.assertGreater(cache.stats()["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
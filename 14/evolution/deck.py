@@ -0,0 +1,214 @@
+import hashlib
+import random
+import struct
+from traitcard import TraitCard
+"""
+The deck of TraitCards of an Evolution game.
+"""
+
+
+class Deck(object):
+    """
+    A deck of TraitCards which deals from the top in constant time. Dealt cards
+    are skipped over by moving a cursor instead of being removed from the list,
+    until compact drops them all at once. Compares equal to a List of the same
+    cards, and can be indexed and iterated from the top of the deck like one.
+
+    Attributes:
+        cards: List of the cards put in the deck, including those dealt since
+            the deck was last compacted.
+        top: The index in cards of the card on top of the deck.
+    """
+    __slots__ = ("cards", "top")
+
+    def __init__(self, cards=None):
+        self.cards = list(cards) if cards else []
+        self.top = 0
+
+    def __len__(self):
+        return len(self.cards) - self.top
+
+    def __iter__(self):
+        return iter(self.cards[self.top:])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.cards[self.top:][index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("deck index out of range")
+        return self.cards[self.top + index]
+
+    def __eq__(self, other):
+        if isinstance(other, Deck):
+            other = list(other)
+        return isinstance(other, list) and list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return "Deck(%s)" % ", ".join(str(card) for card in self)
+
+    __repr__ = __str__
+
+    def clone(self):
+        """
+        :return: A new Deck of the cards left in this deck, sharing the cards.
+        """
+        return Deck(self.cards[self.top:])
+
+    def remaining(self):
+        """
+        :return: The number of cards left in the deck.
+        """
+        return len(self.cards) - self.top
+
+    def peek(self, num_cards=1):
+        """
+        Looks at the top cards of the deck without dealing them.
+        :param num_cards: The number of cards to look at.
+        :return: List of at most num_cards TraitCards from the top of the deck.
+        """
+        return self.cards[self.top:self.top + num_cards]
+
+    def deal(self, num_cards):
+        """
+        Removes cards from the top of the deck.
+        :param num_cards: The number of cards to deal.
+        :return: List of at most num_cards TraitCards, fewer if the deck runs out.
+        """
+        cards = self.cards[self.top:self.top + num_cards]
+        self.top += len(cards)
+        return cards
+
+    def compact(self):
+        """
+        Drops the cards already dealt from cards. A game must not compact its
+        deck while it has an open checkpoint, as rolling back deals them again.
+        """
+        if self.top:
+            del self.cards[:self.top]
+            self.top = 0
+
+    def append(self, card):
+        """
+        Puts a card on the bottom of the deck.
+        :param card: The TraitCard to add.
+        """
+        self.cards.append(card)
+
+    def extend(self, cards):
+        """
+        Puts cards on the bottom of the deck in order.
+        :param cards: List of TraitCards to add.
+        """
+        self.cards.extend(cards)
+
+
+class DeckTemplate(object):
+    """
+    An immutable ordering of the cards of a deck. Creating a Deck from a
+    template only copies a list, the cards and their ordering are created once
+    and shared by every deck, as TraitCards are never changed.
+
+    Attributes:
+        cards: Tuple of TraitCards from the top to the bottom of the deck.
+    """
+    __slots__ = ("cards",)
+
+    def __init__(self, list_of_card):
+        """
+        :param list_of_card: List of TraitCards in the order of the deck.
+        """
+        self.cards = tuple(list_of_card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def new_deck(self):
+        """
+        :return: A new Deck of the cards of this template.
+        """
+        return Deck(self.cards)
+
+    def shuffled_deck(self, rand):
+        """
+        :param rand: The random.Random to shuffle with.
+        :return: A new Deck of the cards of this template in a random order.
+        """
+        cards = list(self.cards)
+        rand.shuffle(cards)
+        return Deck(cards)
+
+    @classmethod
+    def standard(cls):
+        """
+        Creates the template of the standard deck, 7 cards of each Trait with
+        a value of [-3,3] except for carnivore where there are 17 cards with a
+        value of [-8,8], sorted by TraitCard.sort_key.
+        """
+        cards = []
+        for trait in TraitCard.traits:
+            num_cards = 7
+            if trait == "carnivore":
+                num_cards = 17
+            cards.extend(TraitCard.gen_cards(num_cards, trait))
+        cards.sort(key=TraitCard.sort_key)
+        return cls(cards)
+
+
+STANDARD_DECK = DeckTemplate.standard()
+
+
+def stream_seed(seed, index):
+    """
+    Derives the seed of one of many random streams from a base seed. Streams
+    with nearby indices or base seeds are unrelated, unlike seeding with
+    seed + index, and the result is the same in every process. Integers are
+    hashed as ints, so 5 and 5L give the same stream.
+    :param seed: The Integer base seed.
+    :param index: The Integer or String index of the stream.
+    :return: A 64 bit Integer seed.
+    """
+    if not isinstance(index, basestring):
+        index = int(index)
+    digest = hashlib.md5(repr((int(seed), index))).digest()
+    return struct.unpack("<Q", digest[:8])[0]
+
+
+class DeckFactory(object):
+    """
+    Creates the decks of a series of games from one seed. Each game shuffles its
+    deck with its own random stream, so a game's deck does not depend on which
+    process plays it or how many games were played before it, and does not
+    touch the global random module. Without a seed every deck is the template's
+    unshuffled order.
+
+    Attributes:
+        seed: The base seed of the decks, or None for unshuffled decks.
+        template: The DeckTemplate the decks are made from. The standard
+            template is built once per process, when this module is imported.
+    """
+    __slots__ = ("seed", "template")
+
+    def __init__(self, seed=None, template=STANDARD_DECK):
+        self.seed = seed
+        self.template = template
+
+    def game_random(self, game_index=0):
+        """
+        :param game_index: The index of the game in the series.
+        :return: A new random.Random of the game's stream.
+        """
+        return random.Random(stream_seed(self.seed, game_index))
+
+    def new_deck(self, game_index=0):
+        """
+        :param game_index: The index of the game in the series.
+        :return: A new Deck for the game.
+        """
+        if self.seed is None:
+            return self.template.new_deck()
+        return self.template.shuffled_deck(self.game_random(game_index))
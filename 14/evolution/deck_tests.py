@@ -0,0 +1,83 @@
+import unittest
+from deck import Deck, DeckTemplate, DeckFactory, STANDARD_DECK
+from traitcard import TraitCard
+
+
+class TestDeck(unittest.TestCase):
+
+    def setUp(self):
+        self.cards = [TraitCard("horns", 1), TraitCard("ambush", -2),
+                      TraitCard("climbing", 0)]
+        self.deck = Deck(self.cards)
+
+    def test_deal(self):
+        self.assertEqual(self.deck.deal(2), self.cards[:2])
+        self.assertEqual(len(self.deck), 1)
+        self.assertEqual(self.deck.deal(2), self.cards[2:])
+        self.assertEqual(self.deck.deal(2), [])
+        self.assertEqual(self.deck.remaining(), 0)
+
+    def test_compact(self):
+        self.deck.deal(2)
+        self.deck.compact()
+        self.assertEqual(self.deck.cards, self.cards[2:])
+        self.assertEqual(self.deck, self.cards[2:])
+        self.assertEqual(self.deck.deal(2), self.cards[2:])
+
+    def test_peek(self):
+        self.assertEqual(self.deck.peek(), [self.cards[0]])
+        self.deck.deal(1)
+        self.assertEqual(self.deck.peek(5), self.cards[1:])
+        self.assertEqual(self.deck.remaining(), 2)
+
+    def test_list_access(self):
+        self.deck.deal(1)
+        self.assertEqual(self.deck, self.cards[1:])
+        self.assertEqual(self.cards[1:], self.deck)
+        self.assertNotEqual(self.deck, self.cards)
+        self.assertEqual(self.deck[0], self.cards[1])
+        self.assertEqual(self.deck[-1], self.cards[2])
+        self.assertEqual(self.deck[1:], self.cards[2:])
+        self.assertEqual(list(self.deck), self.cards[1:])
+        self.assertRaises(IndexError, lambda: self.deck[2])
+        self.deck.append(TraitCard("horns", 3))
+        self.assertEqual(self.deck[2], TraitCard("horns", 3))
+
+    def test_template(self):
+        template = DeckTemplate(self.cards)
+        first = template.new_deck()
+        second = template.new_deck()
+        self.assertEqual(first, self.cards)
+        first.deal(2)
+        self.assertEqual(second, self.cards)
+        self.assertEqual(len(template), 3)
+
+    def test_clone(self):
+        self.deck.deal(1)
+        clone = self.deck.clone()
+        self.assertEqual(clone, self.cards[1:])
+        clone.deal(1)
+        clone.append(TraitCard("horns", 3))
+        self.assertEqual(self.deck, self.cards[1:])
+
+    def test_standard(self):
+        deck = STANDARD_DECK.new_deck()
+        self.assertEqual(len(deck), 122)
+        self.assertEqual(list(deck), sorted(deck, TraitCard.compare))
+
+    def test_factory(self):
+        self.assertEqual(DeckFactory().new_deck(3), STANDARD_DECK.new_deck())
+        factory = DeckFactory(12)
+        deck = factory.new_deck(0)
+        self.assertEqual(sorted(deck, TraitCard.compare), STANDARD_DECK.new_deck())
+        self.assertNotEqual(deck, STANDARD_DECK.new_deck())
+        self.assertEqual(DeckFactory(12).new_deck(0), deck)
+        self.assertNotEqual(factory.new_deck(1), deck)
+        self.assertNotEqual(DeckFactory(13).new_deck(0), deck)
+        self.assertEqual(DeckFactory(5L).new_deck(), DeckFactory(5).new_deck())
+        self.assertEqual(DeckFactory(12L).new_deck(1L), factory.new_deck(1))
+        self.assertEqual(list(STANDARD_DECK.cards), sorted(STANDARD_DECK.cards, TraitCard.compare))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+from traitcard import CARNIVORE, FAT_TISSUE, HORNS
+
+
 class AbstainFeeding(object):
     """
     An AbstainFeeding is a Feeding where the player chooses to not feed any
     species for the remainder of the round.
     """
+    __slots__ = ()
+
     def apply(self, dealer):
         """
         Applies the consequences of this feeding to the given dealer.
@@ -27,6 +32,8 @@ class HerbivoreFeeding(object):
     A HerbivoreFeeding is a Feeding where a player is choosing to feed a
     non-carnivore species.
     """
+    __slots__ = ("species_index",)
+
     def __init__(self, species_index):
         """
         Creates a new HerbivoreFeeding given the index of the species to feed.
@@ -56,7 +63,7 @@ class HerbivoreFeeding(object):
         player = dealer.players[dealer.current_player_index]
         if len(player.species) > self.species_index:
             spec = player.species[self.species_index]
-            carnivore = "carnivore" in spec.traits
+            carnivore = spec.trait_mask & CARNIVORE
             return spec.population > spec.food and not carnivore
         else:
             return False
@@ -67,6 +74,8 @@ class FatTissueFeeding(object):
     A FatTissueFeeding is a Feeding where a player is choosing to feed a species
     with the "fat-tissue" trait.
     """
+    __slots__ = ("species_index", "food_requested")
+
     def __init__(self, species_index, food_requested):
         """
         Creates a new FatTissueFeeding given the index of the species to fill up
@@ -102,7 +111,7 @@ class FatTissueFeeding(object):
         if len(player.species) > self.species_index:
             spec = player.species[self.species_index]
             return spec.body >= (spec.fat_storage + self.food_requested) and \
-                "fat-tissue" in spec.traits
+                spec.trait_mask & FAT_TISSUE != 0
         else:
             return False
 
@@ -112,6 +121,8 @@ class CarnivoreFeeding(object):
     A CarnivoreFeeding is a Feeding where a player chooses to feed a species with
     the "carnivore" trait and attack another players' species.
     """
+    __slots__ = ("attacker_index", "target_index", "defender_index")
+
     def __init__(self, attacker_index, target_index, defender_index):
         """
         Creates a new CarnivoreFeeding given the index of the attacking species,
@@ -150,7 +161,7 @@ class CarnivoreFeeding(object):
             target_player = dealer.opponents()[self.target_index]
         defender = target_player.species[self.defender_index]
         dealer.kill(target_player, defender)
-        if "horns" in defender.traits:
+        if defender.trait_mask & HORNS:
             dealer.kill(current_player, attacker)
         if attacker.population != 0:
             dealer.feed(current_player, attacker)
@@ -0,0 +1,298 @@
+from feeding import AbstainFeeding, HerbivoreFeeding, FatTissueFeeding, CarnivoreFeeding
+from helpers import carnivore_targets
+from globals import SOLVER_NODE_BUDGET, SOLVER_TABLE_SIZE
+"""
+An exact solver of the feeding phase of a round of Evolution.
+
+Once the actions of a round are applied, feeding is a finite deterministic game
+whose state is the watering hole, the food, fat storage and population of each
+species and who has been skipped. The solver searches it from any Dealer in
+its feeding phase, trying each feeding on the Dealer itself and rolling it back
+with Dealer.checkpoint. Every player picks the feeding that maximizes its own
+value of the objective (a max^n search), and states reached in more than one
+way are only searched once, looked up by Dealer.zobrist.
+"""
+
+
+def food_objective(dealer):
+    """
+    :return: Tuple of the food tokens on the species of each player, fat
+    storage included, in the order of dealer.players.
+    """
+    return tuple(sum(species.food + species.fat_storage for species in player.species)
+                 for player in dealer.players)
+
+
+def score_objective(dealer):
+    """
+    :return: Tuple of the score of each player once the round ends, ie. its
+    species are reduced to their food and the food is moved to its food bag,
+    in the order of dealer.players.
+    """
+    dealer.checkpoint()
+    try:
+        dealer.reduce_species_pop()
+        dealer.move_food()
+        return tuple(score for _, score in dealer.get_scores())
+    finally:
+        dealer.rollback()
+
+
+def margin_objective(dealer):
+    """
+    :return: Tuple of the score_objective of each player minus the best score
+    of the other players, in the order of dealer.players.
+    """
+    scores = score_objective(dealer)
+    if len(scores) < 2:
+        return scores
+    return tuple(score - max(scores[:index] + scores[index + 1:])
+                 for index, score in enumerate(scores))
+
+
+# Maps an objective name to a function of a Dealer returning a Tuple of the
+# value of each player, in the order of dealer.players.
+OBJECTIVES = {
+    "food": food_objective,
+    "score": score_objective,
+    "margin": margin_objective
+}
+
+
+class NodeBudgetExceeded(Exception):
+    pass
+
+
+class FeedingSolution(object):
+    """
+    The result of solving a feeding phase.
+
+    Attributes:
+        names: Tuple of the names of the players, in the order of the values.
+        values: Tuple of the value of the objective each player ends with when
+            every player feeds as the sequence does.
+        sequence: List of (player name, Feeding) of every feeding from the
+            solved state until the end of the feeding phase, where the Feeding
+            is None for a player skipped because it cannot feed.
+        exact: True if the whole feeding phase was searched. Otherwise values
+            are estimates from the objective at the deepest searched states,
+            and the sequence ends there.
+        depth: The number of player choices searched ahead, or 0 if the node
+            budget ran out in the first iteration.
+        nodes: The number of states searched, over all iterations.
+        hits: The number of states found in the table instead of searched.
+    """
+    def __init__(self, names, values, sequence, exact, depth, nodes, hits):
+        self.names = names
+        self.values = values
+        self.sequence = sequence
+        self.exact = exact
+        self.depth = depth
+        self.nodes = nodes
+        self.hits = hits
+
+    def value(self, name):
+        """
+        :param name: The name of a player.
+        :return: The value of the objective the player ends with.
+        """
+        return self.values[self.names.index(name)]
+
+    def feedings(self, name):
+        """
+        :param name: The name of a player.
+        :return: List of the Feedings of the player in the sequence, in order.
+        """
+        return [feeding for player_name, feeding in self.sequence
+                if player_name == name and feeding is not None]
+
+
+class FeedingSolver(object):
+    """
+    Solves feeding phases by iterative deepening: it searches every sequence of
+    up to 1, 2, 3, ... player choices, stopping once a search reaches the end
+    of the feeding phase or the node budget runs out, in which case the last
+    finished search is the result. Feedings decided by the dealer, ie. skips
+    and automatic feedings, do not count as choices.
+
+    Attributes:
+        objective: Function of a Dealer returning a Tuple of the value of each
+            player, eg. one of OBJECTIVES.
+        node_budget: The number of states one solve may search.
+        max_size: The number of states kept in the table between solves. A
+            solve which starts with the table this full empties it first, and
+            the table is never emptied during a solve, so the principal
+            sequence of a solve can always be followed to its end.
+        table: Dictionary of (Dealer.zobrist(), skipped players) to (values,
+            index of the best move, exact, depth searched). Kept between
+            solves, so solving the states of one game in turn reuses it.
+        nodes: The number of states searched by the current solve.
+        hits: The number of table hits of the current solve.
+    """
+    def __init__(self, objective=score_objective, node_budget=SOLVER_NODE_BUDGET,
+                 max_size=SOLVER_TABLE_SIZE):
+        self.objective = objective
+        self.node_budget = node_budget
+        self.max_size = max_size
+        self.table = {}
+        self.nodes = 0
+        self.hits = 0
+
+    def solve(self, dealer, max_depth=None):
+        """
+        Finds the feeding of every player from the current state of the game
+        until the end of its feeding phase. The dealer is left unchanged, and
+        its journal does not record the feedings tried.
+        :param dealer: A Dealer in its feeding phase.
+        :param max_depth: The most player choices to search ahead, or None for
+        as many as the node budget allows.
+        :return: A FeedingSolution.
+        """
+        journal = dealer.journal
+        dealer.keep_journal(None)
+        if len(self.table) >= self.max_size:
+            self.table = {}
+        self.nodes = 0
+        self.hits = 0
+        solution = FeedingSolution(tuple(player.name for player in dealer.players),
+                                   self.objective(dealer), [], False, 0, 0, 0)
+        depth = 0
+        try:
+            while max_depth is None or depth < max_depth:
+                depth += 1
+                try:
+                    values, exact = self.search(dealer, depth)
+                except NodeBudgetExceeded:
+                    break
+                solution = FeedingSolution(solution.names, values,
+                                           self.principal_sequence(dealer),
+                                           exact, depth, self.nodes, self.hits)
+                if exact:
+                    break
+        finally:
+            dealer.keep_journal(journal)
+        solution.nodes = self.nodes
+        solution.hits = self.hits
+        return solution
+
+    def moves(self, dealer):
+        """
+        Finds what can happen next in the feeding phase of the game.
+        :param dealer: A Dealer in its feeding phase.
+        :return: A tuple (choice, moves). moves is an empty List if the feeding
+        phase is over. If choice is False, moves is a List of the one Feeding
+        the dealer makes for the current player, or None for a skip. Otherwise
+        moves is a List of the valid Feedings of the current player: every
+        fat-tissue request from the largest the species and the watering hole
+        allow down to 1, then herbivores, then attacks, then abstaining.
+        """
+        if dealer.watering_hole <= 0 or len(dealer.players) == len(dealer.skipped_players):
+            return False, []
+        player = dealer.players[dealer.current_player_index]
+        opponents = dealer.opponents()
+        if dealer.current_player_index in dealer.skipped_players or \
+                not player.can_feed(opponents):
+            return False, [None]
+        auto_eat = dealer.auto_eat()
+        if auto_eat is not None:
+            return False, [auto_eat]
+
+        board = player.species
+        herbivores, carnivores, fatties = board.hungry()
+        moves = []
+        for species in board.in_order(fatties):
+            index = board.index(species)
+            largest = min(species.body - species.fat_storage, dealer.watering_hole)
+            for request in range(largest, 0, -1):
+                moves.append(FatTissueFeeding(index, request))
+        for species in board.in_order(herbivores):
+            if species.food < species.population:
+                moves.append(HerbivoreFeeding(board.index(species)))
+        for carnivore in board.in_order(carnivores):
+            for target_index, opponent in enumerate(opponents):
+                for defender in carnivore_targets(carnivore, [opponent]):
+                    moves.append(CarnivoreFeeding(board.index(carnivore), target_index,
+                                                  opponent.species.index(defender)))
+        moves.append(AbstainFeeding())
+        return True, moves
+
+    def play(self, dealer, choice, move):
+        """
+        Makes one step of the feeding phase, as Dealer.feed1 would.
+        :param dealer: A Dealer in its feeding phase.
+        :param choice: True if the move is a choice of the current player.
+        :param move: One of the moves returned by the moves method.
+        """
+        if not choice:
+            dealer.feed1()
+            return
+        dealer.index_boards()
+        move.apply(dealer)
+        dealer.rotate_players()
+
+    def search(self, dealer, depth):
+        """
+        Searches the feeding phase from the current state of the game.
+        :param dealer: A Dealer in its feeding phase, left unchanged.
+        :param depth: The number of player choices to search ahead.
+        :return: A tuple (values, exact) of the values each player ends with
+        and whether they are exact or estimated at the search depth.
+        :raise NodeBudgetExceeded: If the solve searched node_budget states.
+        """
+        key = (dealer.zobrist(), frozenset(dealer.skipped_players))
+        entry = self.table.get(key)
+        if entry is not None and (entry[2] or entry[3] >= depth):
+            self.hits += 1
+            return entry[0], entry[2]
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise NodeBudgetExceeded()
+
+        choice, moves = self.moves(dealer)
+        best = None
+        if not moves:
+            values, exact = self.objective(dealer), True
+        elif choice and depth == 0:
+            values, exact = self.objective(dealer), False
+        else:
+            mover = dealer.current_player_index
+            next_depth = depth - 1 if choice else depth
+            exact = True
+            for index, move in enumerate(moves):
+                dealer.checkpoint()
+                try:
+                    self.play(dealer, choice, move)
+                    child, child_exact = self.search(dealer, next_depth)
+                finally:
+                    dealer.rollback()
+                exact = exact and child_exact
+                if best is None or child[mover] > values[mover]:
+                    values, best = child, index
+
+        self.table[key] = (values, best, exact, depth)
+        return values, exact
+
+    def principal_sequence(self, dealer):
+        """
+        Follows the best move of each state in the table from the current state
+        of the game, leaving the dealer unchanged.
+        :param dealer: A Dealer in its feeding phase.
+        :return: List of (player name, Feeding or None) of the moves.
+        """
+        sequence = []
+        checkpoints = 0
+        try:
+            while True:
+                entry = self.table.get((dealer.zobrist(), frozenset(dealer.skipped_players)))
+                if entry is None or entry[1] is None:
+                    break
+                choice, moves = self.moves(dealer)
+                move = moves[entry[1]]
+                sequence.append((dealer.players[dealer.current_player_index].name, move))
+                dealer.checkpoint()
+                checkpoints += 1
+                self.play(dealer, choice, move)
+        finally:
+            for _ in range(checkpoints):
+                dealer.rollback()
+        return sequence
@@ -0,0 +1,169 @@
+import random
+import unittest
+from io import BytesIO
+from feeding_solver import *
+from stress import stress_dealer
+from journal import Journal, encode_feeding
+from decision_cache import encode_player
+from benchmarks import bench_solver
+
+
+def brute_force(solver, dealer):
+    """
+    :return: The values of a max^n search of the whole feeding phase without
+    the table, through the moves and play of the solver.
+    """
+    choice, moves = solver.moves(dealer)
+    if not moves:
+        return solver.objective(dealer)
+    mover = dealer.current_player_index
+    best = None
+    for move in moves:
+        dealer.checkpoint()
+        solver.play(dealer, choice, move)
+        values = brute_force(solver, dealer)
+        dealer.rollback()
+        if best is None or values[mover] > best[mover]:
+            best = values
+    return best
+
+
+def valid_feedings(dealer):
+    """
+    :return: Set of the encoded Feedings of every choice of the current
+    player, found by trying every Feeding against its validate rather than as
+    the solver does. Carnivores only attack while hungry, and fat tissue
+    requests are at most the watering hole.
+    """
+    player = dealer.players[dealer.current_player_index]
+    opponents = dealer.opponents()
+    feedings = [AbstainFeeding()]
+    for index, species in enumerate(player.species):
+        feedings.append(HerbivoreFeeding(index))
+        feedings.extend(FatTissueFeeding(index, request)
+                        for request in range(1, dealer.watering_hole + 1))
+        if species.food < species.population:
+            for target_index, opponent in enumerate(opponents):
+                feedings.extend(CarnivoreFeeding(index, target_index, defender_index)
+                                for defender_index in range(len(opponent.species)))
+    return set(encode_feeding(feeding) for feeding in feedings if feeding.validate(dealer))
+
+
+def snapshot(dealer):
+    return [encode_player(player) for player in dealer.players], dealer.watering_hole, \
+        dealer.current_player_index, set(dealer.skipped_players)
+
+
+class TestFeedingSolver(unittest.TestCase):
+
+    def test_brute_force(self):
+        for seed in range(4):
+            for objective in OBJECTIVES.values():
+                dealer = stress_dealer(2, 2, seed=seed, watering_hole=6)
+                solver = FeedingSolver(objective)
+                solution = solver.solve(dealer)
+                self.assertTrue(solution.exact)
+                self.assertGreater(solution.hits, 0)
+                self.assertEqual(solution.values, brute_force(solver, dealer))
+
+    def test_moves(self):
+        solver = FeedingSolver()
+        partial_requests = 0
+        for seed in range(6):
+            random.seed(seed)
+            dealer = stress_dealer(3, 3, seed=seed, watering_hole=8)
+            choice, moves = solver.moves(dealer)
+            while moves:
+                if choice:
+                    dealer.index_boards()
+                    encoded = [encode_feeding(move) for move in moves]
+                    self.assertEqual(len(set(encoded)), len(encoded))
+                    self.assertEqual(set(encoded), valid_feedings(dealer))
+                    partial_requests += len([move for move in moves
+                                             if isinstance(move, FatTissueFeeding) and
+                                             move.food_requested > 1])
+                solver.play(dealer, choice, random.choice(moves))
+                choice, moves = solver.moves(dealer)
+        self.assertGreater(partial_requests, 0)
+
+    def test_small_table(self):
+        dealer = stress_dealer(3, 2, seed=0, watering_hole=6)
+        solution = FeedingSolver().solve(dealer)
+        solver = FeedingSolver(max_size=10)
+        small = solver.solve(dealer)
+        self.assertTrue(small.exact)
+        self.assertGreater(len(solver.table), 10)
+        self.assertEqual(small.values, solution.values)
+        self.assertEqual(small.sequence, solution.sequence)
+        again = solver.solve(dealer)
+        self.assertEqual(again.hits, small.hits)
+        self.assertEqual(again.sequence, solution.sequence)
+
+    def test_sequence(self):
+        for seed in range(4):
+            dealer = stress_dealer(3, 2, seed=seed, watering_hole=6)
+            before = snapshot(dealer)
+            solution = FeedingSolver().solve(dealer)
+            self.assertEqual(snapshot(dealer), before)
+            self.assertTrue(solution.exact)
+            self.assertEqual(solution.names, (1, 2, 3))
+            for name, feeding in solution.sequence:
+                player = dealer.players[dealer.current_player_index]
+                self.assertEqual(player.name, name)
+                if feeding is None:
+                    self.assertFalse(player.can_feed(dealer.opponents()) and
+                                     dealer.current_player_index not in dealer.skipped_players)
+                    dealer.feed1()
+                    continue
+                dealer.index_boards()
+                self.assertTrue(feeding.validate(dealer))
+                feeding.apply(dealer)
+                dealer.rotate_players()
+            self.assertEqual(FeedingSolver().moves(dealer), (False, []))
+            self.assertEqual(score_objective(dealer), solution.values)
+            self.assertEqual(solution.value(3), solution.values[2])
+
+    def test_node_budget(self):
+        dealer = stress_dealer(3, 3, seed=1, watering_hole=10)
+        before = snapshot(dealer)
+        solver = FeedingSolver(node_budget=300)
+        solution = solver.solve(dealer)
+        self.assertEqual(snapshot(dealer), before)
+        self.assertFalse(solution.exact)
+        self.assertGreater(solution.depth, 0)
+        self.assertEqual(solution.nodes, 301)
+        self.assertTrue(solution.sequence)
+        self.assertEqual(FeedingSolver(node_budget=0).solve(dealer).values,
+                         score_objective(dealer))
+        shallow = FeedingSolver(max_size=50).solve(dealer, max_depth=1)
+        self.assertEqual(shallow.depth, 1)
+        self.assertEqual(len([feeding for _, feeding in shallow.sequence if feeding]), 1)
+
+    def test_journal(self):
+        dealer = stress_dealer(2, 2, seed=2, watering_hole=6)
+        journal = dealer.keep_journal(Journal(BytesIO()))
+        FeedingSolver().solve(dealer)
+        self.assertIs(dealer.journal, journal)
+        self.assertEqual(journal.events, [])
+
+    def test_objectives(self):
+        dealer = stress_dealer(3, 2, seed=0, watering_hole=6)
+        before = snapshot(dealer)
+        scores = score_objective(dealer)
+        self.assertEqual(snapshot(dealer), before)
+        # No species has eaten yet, so the round's end would reduce them all.
+        for score, (_, current) in zip(scores, dealer.get_scores()):
+            self.assertLess(score, current)
+        self.assertEqual(margin_objective(dealer),
+                         tuple(score - max(scores[:index] + scores[index + 1:])
+                               for index, score in enumerate(scores)))
+        self.assertEqual(food_objective(dealer), (0, 0, 0))
+
+    def test_bench_solver(self):
+        lines = bench_solver(((2, 2, 6),), 2).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith("2 players x 2 species, watering hole 6: 2/2 exact"))
+
+
+if __name__ == '__main__':
+    unittest.main()
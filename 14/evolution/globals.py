@@ -2,9 +2,19 @@ HARD_SHELL_DIFF = 4
 MIN_HUNGRY_SPECIES = 2
 MAX_POPULATION = 7
 MAX_BODY_SIZE = 7
+ATTACK_CACHE_SIZE = 65536
+DECISION_CACHE_SIZE = 65536
+JOURNAL_BATCH_SIZE = 4096
+# The states one feeding_solver.FeedingSolver.solve searches by default, and
+# the states its table keeps between solves.
+SOLVER_NODE_BUDGET = 20000
+SOLVER_TABLE_SIZE = 262144
 PLAYER_CONNECTION_TIME = 10
 MIN_PLAYERS = 3
 MAX_PLAYERS = 8
+# The largest games stress.stress_dealer creates.
+STRESS_MAX_PLAYERS = 1000
+STRESS_MAX_SPECIES = 100
 LISTENING_PORT = 10001
 TIMEOUT = 10
 MAX_MSG_SIZE = 512
@@ -1,35 +1,63 @@
 from functools import wraps
 import errno
 import os
-import signal
+import socket
+import threading
+import time
+import instrumentation
 from globals import TIMEOUT
 
+# The (deadline, error message) of each call of a function with a timeout
+# running in a thread, innermost last, in the List DEADLINES.stack of that thread.
+DEADLINES = threading.local()
+
 def carnivore_targets(carnivore, list_of_player):
     """
     Creates a list of all possible targets for given carnivore from the list of
-    players.
+    players. Uses the attack index of the game the carnivore is in if it has one.
     :param: carnivore The attacking carnivore.
     :param: list_of_player All players to be considered for possible targets.
     """
+    if instrumentation.ACTIVE is not None:
+        instrumentation.count("carnivore_targets")
+    board = carnivore.board
+    if board is not None and board.attack_index is not None:
+        return board.attack_index.targets(carnivore, list_of_player)
     targets = []
     for player in list_of_player:
-        for i in range(0, len(player.species)):
-            defender = player.species[i]
-            left_neighbor = (False if i == 0 else player.species[i - 1])
-            right_neighbor = (False if i == len(player.species) - 1
-                              else player.species[i + 1])
-            if defender.is_attackable(carnivore, left_neighbor, right_neighbor) \
-               and defender != carnivore:
-                targets.append(defender)
+        targets.extend(board_targets(carnivore, player.species))
+    return targets
+
+
+def board_targets(carnivore, list_of_species):
+    """
+    Creates a list of all possible targets for given carnivore from one
+    player's list of species.
+    :param: carnivore The attacking carnivore.
+    :param: list_of_species The species boards of one player, from left to right.
+    """
+    targets = []
+    for i in range(0, len(list_of_species)):
+        defender = list_of_species[i]
+        left_neighbor = (False if i == 0 else list_of_species[i - 1])
+        right_neighbor = (False if i == len(list_of_species) - 1
+                          else list_of_species[i + 1])
+        if defender.is_attackable(carnivore, left_neighbor, right_neighbor) \
+           and defender != carnivore:
+            targets.append(defender)
     return targets
 
 
 def timeout(seconds=TIMEOUT, error_message=os.strerror(errno.ETIME)):
     """
     Defines a function decorator to define functions with a timeout.
-    Starts a signal with its time set to the timeout amount which raises a
-    TimeoutError if the time limit is reached, otherwise the functions value
-    is returned and no error is raised.
+    Each call sets a deadline for its own thread, and the blocking socket calls
+    the function makes through socket_call raise a TimeoutError once the
+    deadline has passed. A call which returns after its deadline raises a
+    TimeoutError too, otherwise the functions value is returned and no error
+    is raised. Unlike an alarm signal this works in any thread, with any
+    number of timed calls running at once, and a timed call within another one
+    stops at whichever deadline comes first.
     Usage:
     @timeout(20)
     def func(self):
@@ -40,16 +68,16 @@ def timeout(seconds=TIMEOUT, error_message=os.strerror(errno.ETIME)):
     :param error_message: The message to run in the event of a timeout.
     """
     def decorator(func):
-        def _handle_timeout(signum, frame):
-            raise TimeoutError(error_message)
-
         def wrapper(*args, **kwargs):
-            signal.signal(signal.SIGALRM, _handle_timeout)
-            signal.alarm(seconds)
+            stack = thread_deadlines()
+            deadline = (time.time() + seconds, error_message)
+            stack.append(min(stack[-1], deadline) if stack else deadline)
             try:
                 result = func(*args, **kwargs)
             finally:
-                signal.alarm(0)
+                deadline = stack.pop()
+            if time.time() > deadline[0]:
+                raise TimeoutError(deadline[1])
             return result
 
         return wraps(func)(wrapper)
@@ -57,23 +85,57 @@ def timeout(seconds=TIMEOUT, error_message=os.strerror(errno.ETIME)):
     return decorator
 
 
-class TimeoutError(Exception):
-    pass
+def thread_deadlines():
+    """
+    :return: The List of the deadlines of the timed calls running in this thread.
+    """
+    stack = getattr(DEADLINES, "stack", None)
+    if stack is None:
+        stack = DEADLINES.stack = []
+    return stack
+
+
+def remaining_time():
+    """
+    :return: The number of seconds left until the innermost deadline of this
+    thread, or None if no timed call is running in it.
+    :raise TimeoutError: If the deadline has passed.
+    """
+    stack = thread_deadlines()
+    if not stack:
+        return None
+    deadline, error_message = stack[-1]
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise TimeoutError(error_message)
+    return remaining
 
 
-def is_unique_list(li):
+def socket_call(sock, method, *args):
     """
-    Checks that no two elements in the list are the same.
-    :param li: The List of anything to check.
-    :return: True if the list has only unique elements, False if there are any duplicates.
+    Calls a blocking method of a socket, giving up at the innermost deadline
+    of this thread. The socket's own timeout is restored afterwards.
+    :param sock: The socket.
+    :param method: The String name of the method, eg. "recv" or "accept".
+    :param args: The arguments of the method.
+    :return: The result of the method.
+    :raise TimeoutError: If the deadline passes before the method returns.
     """
-    remaining = [elem for elem in li]
-    while remaining:
-        if remaining[0] in remaining[1:]:
-            return False
-        else:
-            remaining = remaining[1:]
-    return True
+    remaining = remaining_time()
+    if remaining is None:
+        return getattr(sock, method)(*args)
+    previous = sock.gettimeout()
+    sock.settimeout(remaining)
+    try:
+        return getattr(sock, method)(*args)
+    except socket.timeout:
+        raise TimeoutError(thread_deadlines()[-1][1])
+    finally:
+        sock.settimeout(previous)
+
+
+class TimeoutError(Exception):
+    pass
 
 
 def print_results(scores, messages=None):
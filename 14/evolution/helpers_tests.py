@@ -1,3 +1,6 @@
+import socket
+import threading
+import time
 import unittest
 from helpers import *
 from species import Species
@@ -19,12 +22,68 @@ class TestHelpers(unittest.TestCase):
         self.species_1.traits = ["climbing"]
         # self.assertEqual(carnivore_targets(self.species_0, list_of_opponents), [])
 
-    def test_is_unique_list(self):
-        self.assertTrue(is_unique_list([1, 2, 3]))
-        self.assertTrue(is_unique_list([1]))
-        self.assertTrue(is_unique_list([]))
-        self.assertFalse(is_unique_list([1, 1]))
-        self.assertFalse(is_unique_list([1, 0, 1]))
+    def test_timeout(self):
+        sock, other = socket.socketpair()
+
+        @timeout(0.05, "slow")
+        def wait():
+            return socket_call(sock, "recv", 10)
+
+        @timeout(10)
+        def outer():
+            self.assertGreater(remaining_time(), 9)
+            return wait()
+
+        try:
+            self.assertIsNone(remaining_time())
+            self.assertRaisesRegexp(TimeoutError, "slow", outer)
+            self.assertIsNone(sock.gettimeout())
+            self.assertEqual(thread_deadlines(), [])
+            other.sendall("ok")
+            self.assertEqual(wait(), "ok")
+        finally:
+            sock.close()
+            other.close()
+
+    def test_timeout_overrun(self):
+        @timeout(0.05, "late")
+        def late():
+            time.sleep(0.1)
+            return "done"
+
+        @timeout(10)
+        def quick():
+            return "done"
+
+        self.assertRaisesRegexp(TimeoutError, "late", late)
+        self.assertEqual(thread_deadlines(), [])
+        self.assertEqual(quick(), "done")
+
+    def test_timeout_threads(self):
+        errors = []
+
+        @timeout(0.1)
+        def wait(sock):
+            socket_call(sock, "recv", 10)
+
+        def run():
+            sock, other = socket.socketpair()
+            try:
+                start = time.time()
+                wait(sock)
+            except TimeoutError:
+                errors.append(time.time() - start)
+            finally:
+                sock.close()
+                other.close()
+
+        threads = [threading.Thread(target=run) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 20)
+        self.assertTrue(all(0.05 < seconds < 2 for seconds in errors))
 
 if __name__ == '__main__':
     unittest.main()
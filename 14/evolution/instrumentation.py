@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+"""
+Opt-in timing and call counts of the phases of Evolution games.
+"""
+
+# The number of instrumented games running in this process, or None. The
+# counted functions only test this for None, so counting costs nearly nothing
+# while no instrumented game is running.
+ACTIVE = None
+ACTIVE_LOCK = threading.Lock()
+# The Instrumentation of the game running in a thread, as CURRENT.stats of
+# that thread, so games in other threads are not counted in it.
+CURRENT = threading.local()
+
+
+def count(name):
+    """
+    Counts one call of a hot path function in the Instrumentation of the game
+    running in this thread, if it is instrumented. Call sites test ACTIVE
+    themselves before calling this.
+    :param name: The String name of the function.
+    """
+    stats = getattr(CURRENT, "stats", None)
+    if stats is not None:
+        counters = stats.counters
+        counters[name] = counters.get(name, 0) + 1
+
+
+def activate(stats):
+    """
+    Counts the hot path calls of this thread in stats until deactivate.
+    :param stats: An Instrumentation.
+    :return: The Instrumentation active in this thread before, or None, to be
+    passed to deactivate.
+    """
+    global ACTIVE
+    with ACTIVE_LOCK:
+        ACTIVE = (ACTIVE or 0) + 1
+    previous = getattr(CURRENT, "stats", None)
+    CURRENT.stats = stats
+    return previous
+
+
+def deactivate(previous):
+    """
+    Stops counting the hot path calls of this thread in the Instrumentation
+    given to the matching activate.
+    :param previous: The Instrumentation returned by activate.
+    """
+    global ACTIVE
+    CURRENT.stats = previous
+    with ACTIVE_LOCK:
+        ACTIVE = ACTIVE - 1 or None
+
+
+class Instrumentation(object):
+    """
+    Wall time and number of calls of each phase of a game and of each call to a
+    player interface, and the number of calls of hot path functions. Phases can
+    be nested, eg. feed1 within apply_actions, in which case the time of the
+    inner phase is also part of the time of the outer one. An Instrumentation
+    is not locked, so it can only be shared by games run in the same thread.
+
+    Attributes:
+        phases: Dictionary of phase name to [calls, seconds].
+        player_calls: Dictionary of (player name, method name) to [calls, seconds].
+        counters: Dictionary of hot path function name to the number of calls.
+    """
+    def __init__(self):
+        self.phases = {}
+        self.player_calls = {}
+        self.counters = {}
+
+    def time(self, table, key, function, *args):
+        """
+        Calls the function and adds the call and its wall time to the table.
+        :param table: self.phases or self.player_calls.
+        :param key: The key of the call in the table.
+        :param function: The function to call with args.
+        :return: The result of the function.
+        """
+        start = time.time()
+        try:
+            return function(*args)
+        finally:
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += time.time() - start
+
+    def time_phase(self, name, function, *args):
+        """
+        Times one run of a phase of the game.
+        :param name: The String name of the phase.
+        :param function: The function running the phase, called with args.
+        :return: The result of the function.
+        """
+        return self.time(self.phases, name, function, *args)
+
+    def time_player(self, player_name, method, *args):
+        """
+        Times one call to a player.
+        :param player_name: The name of the PlayerState.
+        :param method: The bound method of the PlayerState which calls its
+        interface, called with args.
+        :return: The result of the method.
+        """
+        return self.time(self.player_calls, (player_name, method.__name__), method, *args)
+
+    def report(self):
+        """
+        :return: A Dictionary of Dictionaries of the recorded data, which can
+        be written as JSON:
+        {"phases": {phase: {"calls": Integer, "seconds": Float}},
+         "players": {player name: {method: {"calls": Integer, "seconds": Float}}},
+         "counters": {function: Integer}}
+        """
+        players = {}
+        for (player_name, method), (calls, seconds) in self.player_calls.items():
+            players.setdefault(str(player_name), {})[method] = \
+                {"calls": calls, "seconds": seconds}
+        return {"phases": dict((name, {"calls": calls, "seconds": seconds})
+                               for name, (calls, seconds) in self.phases.items()),
+                "players": players,
+                "counters": dict(self.counters)}
+
+    def dump(self, out=None):
+        """
+        Writes the report as JSON.
+        :param out: A file to write to, or None.
+        :return: The JSON String of the report.
+        """
+        text = json.dumps(self.report(), indent=2, sort_keys=True)
+        if out is not None:
+            out.write(text)
+        return text
@@ -0,0 +1,79 @@
+import json
+import StringIO
+import unittest
+import instrumentation
+from dealer import Dealer
+from player import Player
+from species import Species
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def new_dealer(self):
+        """
+        Creates a game of Silly players where the first player has a carnivore
+        and there is food for it to attack.
+        """
+        dealer = Dealer([Player() for _ in range(4)], 3)
+        dealer.players[0].species = [Species(3, 0, 2, ["carnivore"])]
+        dealer.watering_hole = 30
+        return dealer
+
+    def setUp(self):
+        self.dealer = self.new_dealer()
+        self.stats = self.dealer.instrument()
+        self.dealer.run()
+        self.report = self.stats.report()
+
+    def test_phases(self):
+        phases = self.report["phases"]
+        self.assertEqual(phases["run"]["calls"], 1)
+        rounds = phases["deal_round"]["calls"]
+        self.assertGreater(rounds, 0)
+        for name in ["make_initial_species", "players_start", "get_player_actions",
+                     "validate_actions", "apply_actions", "feed_all",
+                     "reduce_species_pop", "move_food"]:
+            self.assertEqual(phases[name]["calls"], rounds)
+        self.assertGreaterEqual(phases["feed1"]["calls"], rounds)
+        self.assertLessEqual(phases["feed_all"]["seconds"], phases["apply_actions"]["seconds"])
+        self.assertLessEqual(phases["apply_actions"]["seconds"], phases["run"]["seconds"])
+
+    def test_players(self):
+        players = self.report["players"]
+        self.assertEqual(sorted(players), ["1", "2", "3", "4"])
+        for calls in players.values():
+            self.assertLessEqual(calls["choose"]["calls"], calls["start"]["calls"])
+        self.assertGreater(sum(calls["next_feeding"]["calls"] for calls in players.values()
+                               if "next_feeding" in calls), 0)
+
+    def test_counters(self):
+        self.assertGreater(self.report["counters"]["carnivore_targets"], 0)
+        self.assertGreater(self.report["counters"]["is_attackable"], 0)
+        self.assertIsNone(instrumentation.ACTIVE)
+        counters = dict(self.stats.counters)
+        self.new_dealer().run()
+        self.assertEqual(self.stats.counters, counters)
+
+    def test_dump(self):
+        out = StringIO.StringIO()
+        text = self.stats.dump(out)
+        self.assertEqual(out.getvalue(), text)
+        self.assertEqual(json.loads(text), json.loads(json.dumps(self.report)))
+
+    def test_shared(self):
+        dealer = self.new_dealer()
+        self.assertIs(dealer.instrument(self.stats), self.stats)
+        dealer.run()
+        self.assertEqual(self.stats.phases["run"][0], 2)
+        self.assertEqual(self.stats.phases["deal_round"][0],
+                         2 * self.report["phases"]["deal_round"]["calls"])
+
+    def test_disabled(self):
+        dealer = self.new_dealer()
+        dealer.run()
+        self.assertIsNone(dealer.instrumentation)
+        self.assertEqual(dealer.get_scores(), self.dealer.get_scores())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+import marshal
+from operator import attrgetter
+import struct
+import sys
+import zlib
+from globals import JOURNAL_BATCH_SIZE
+from traitcard import TraitCard, TRAIT_IDS
+from actions import Action, PopGrow, BodyGrow, BoardAddition, ReplaceTrait
+from feeding import AbstainFeeding, HerbivoreFeeding, FatTissueFeeding, CarnivoreFeeding
+"""
+A journal of the choices made in a game and of every change a Dealer makes to
+it, written to a compact binary file.
+
+A journal file starts with MAGIC and FORMAT_HEADER, the major version of
+Python and the marshal version that wrote it, followed by blocks. Each block is
+a header of a 4 byte little endian length and a 1 byte flag, followed by that
+many bytes of a marshalled List of events, compressed with zlib if the flag is
+1. The marshal format is only stable within a marshal version, so a journal is
+only read back by a Python of the same major and marshal versions. An event
+is a Tuple whose first item is its String kind, followed by Integers, Strings,
+None and Tuples or Lists of them. Players are named by PlayerState.name, and
+species by their index on their player's board at the time of the event. The
+kinds of event and their items are:
+
+    ("game", player names, deck seed, deck cards or None)
+    ("round", cards in the deck, watering hole)
+    ("deal", player, number of cards)
+    ("start", player, watering hole, food bag, hand cards, species)
+    ("choose", player, action or None)
+    ("reject", player, reason)
+    ("remove", player)
+    ("reveal", player, food card index, food points)
+    ("fertile", player, species indices)
+    ("long_neck", player, species indices, watering hole after)
+    ("fat_food", player, species indices)
+    ("next_feeding", player, feeding or None)
+    ("feeding", player, feeding)
+    ("skip", player) *
+    ("feed", player, species index, watering hole after) *
+    ("kill", player, species index)
+    ("extinct", player, species index)
+    ("scavenge", watering hole after)
+    ("reduce", player, populations after)
+    ("move_food", player, food bag after)
+    ("end", scores)
+
+where a card is encoded by encode_card, a species by encode_species, an action
+by encode_action and a feeding by encode_feeding, and the reason an action is
+rejected is an action_plan reason code, eg. "duplicate-card". The deck cards
+are None if the deck is the standard deck shuffled by the deck seed, as
+deck.DeckFactory makes it. The cards of a deal are the next ones of the deck.
+The events marked * are the detail of each feeding, one per food token and
+skipped turn, so they are only recorded by a verbose Journal.
+"""
+
+MAGIC = "EVJOURNAL2\n"
+# The major version of Python and the marshal version of a journal file.
+FORMAT_HEADER = struct.Struct("<BB")
+FORMAT = (sys.version_info[0], marshal.version)
+BLOCK_HEADER = struct.Struct("<IB")
+# Cards are encoded as their trait id times CARD_BASE plus their food points
+# plus CARD_OFFSET.
+CARD_BASE = 32
+CARD_OFFSET = 16
+# Maps each trait name to the code of a card of the trait with no food points.
+TRAIT_CODES = dict((trait, trait_id * CARD_BASE + CARD_OFFSET)
+                   for trait, trait_id in TRAIT_IDS.items())
+# The kinds of event only a verbose Journal records.
+VERBOSE_KINDS = frozenset(["skip", "feed"])
+
+
+def encode_card(card):
+    """
+    :param card: A TraitCard.
+    :return: An Integer of the card's trait and food points.
+    """
+    return TRAIT_IDS[card.trait] * CARD_BASE + card.food_points + CARD_OFFSET
+
+
+def decode_card(code):
+    """
+    :param code: An Integer returned by encode_card.
+    :return: An equal TraitCard.
+    """
+    trait_id, points = divmod(code, CARD_BASE)
+    return TraitCard(TraitCard.traits[trait_id], points - CARD_OFFSET)
+
+
+def encode_cards(cards):
+    """
+    :param cards: List of TraitCards.
+    :return: Tuple of the encoded cards, in order.
+    """
+    codes = TRAIT_CODES
+    return tuple([codes[card.trait] + card.food_points for card in cards])
+
+
+def encode_species(species):
+    """
+    :param species: A Species.
+    :return: Tuple (population, food, body, fat storage, trait names).
+    """
+    return (species.population, species.food, species.body, species.fat_storage,
+            tuple(species.traits))
+
+
+def encode_action(action):
+    """
+    :param action: An Action.
+    :return: Tuple (food card, pop grows, body grows, board additions, trait
+    replacements) of Lists of Tuples of indices.
+    """
+    return (action.food_card,
+            [(grow.species_index, grow.payment_index) for grow in action.pop_grows],
+            [(grow.species_index, grow.payment_index) for grow in action.body_grows],
+            [(addition.payment_index, tuple(addition.traits))
+             for addition in action.species_additions],
+            [(replace.species_index, replace.removed_trait_index, replace.new_trait_index)
+             for replace in action.trait_replacements])
+
+
+def decode_action(encoded):
+    """
+    :param encoded: A Tuple returned by encode_action.
+    :return: An equal Action.
+    """
+    food_card, pop_grows, body_grows, additions, replacements = encoded
+    return Action(food_card,
+                  [PopGrow(*grow) for grow in pop_grows],
+                  [BodyGrow(*grow) for grow in body_grows],
+                  [BoardAddition(payment, list(traits)) for payment, traits in additions],
+                  [ReplaceTrait(*replace) for replace in replacements])
+
+
+# The kind of each Feeding class in an encoded feeding.
+FEEDING_KINDS = {AbstainFeeding: "abstain",
+                 HerbivoreFeeding: "herbivore",
+                 FatTissueFeeding: "fat-tissue",
+                 CarnivoreFeeding: "carnivore"}
+FEEDING_CLASSES = dict((kind, cls) for cls, kind in FEEDING_KINDS.items())
+
+
+def feeding_encoder(cls):
+    """
+    :param cls: One of the classes of FEEDING_KINDS.
+    :return: Function of a Feeding of the class returning its encode_feeding.
+    """
+    kind = FEEDING_KINDS[cls]
+    if not cls.__slots__:
+        return lambda feeding: (kind,)
+    fields = attrgetter(*cls.__slots__)
+    if len(cls.__slots__) == 1:
+        return lambda feeding: (kind, fields(feeding))
+    return lambda feeding: (kind,) + fields(feeding)
+
+
+# Maps each Feeding class to its feeding_encoder, so encoding a feeding does
+# not look up its fields by name.
+FEEDING_ENCODERS = dict((cls, feeding_encoder(cls)) for cls in FEEDING_KINDS)
+
+
+def encode_feeding(feeding):
+    """
+    :param feeding: A Feeding.
+    :return: Tuple of the feeding's kind followed by the fields it was created with.
+    """
+    return FEEDING_ENCODERS[type(feeding)](feeding)
+
+
+def decode_feeding(encoded):
+    """
+    :param encoded: A Tuple returned by encode_feeding.
+    :return: An equal Feeding.
+    """
+    return FEEDING_CLASSES[encoded[0]](*encoded[1:])
+
+
+class Journal(object):
+    """
+    Writes events to a journal file. Events are kept in memory and written a
+    block at a time, so recording an event only appends it to a List.
+
+    Attributes:
+        out: The file the journal is written to.
+        events: List of the events not written yet.
+        record: Function adding one event Tuple to the journal. This is the
+            append method of events, so it costs no more than appending.
+        batch_size: The number of recorded events after which the next call to
+            flush_if_full writes them.
+        compress: True to compress blocks with zlib, which makes them about
+            six times smaller and costs about twice as much time as writing them.
+        count: The number of events written to the file.
+        verbose: True to also record the events of VERBOSE_KINDS, the detail
+            of each feeding, which replaying a game does not need.
+    """
+    def __init__(self, out, batch_size=JOURNAL_BATCH_SIZE, compress=False, verbose=False):
+        """
+        :param out: A file opened for writing in binary mode. The journal's
+        header is written to it.
+        """
+        self.out = out
+        self.events = []
+        self.record = self.events.append
+        self.batch_size = batch_size
+        self.compress = compress
+        self.count = 0
+        self.verbose = verbose
+        out.write(MAGIC + FORMAT_HEADER.pack(*FORMAT))
+
+    @classmethod
+    def open(cls, path, batch_size=JOURNAL_BATCH_SIZE, compress=False, verbose=False):
+        """
+        :param path: The path of the journal file to create.
+        :return: A Journal writing to the file, which close closes.
+        """
+        return cls(open(path, "wb"), batch_size, compress, verbose)
+
+    def flush_if_full(self):
+        """
+        Writes the recorded events if there are at least batch_size of them.
+        """
+        if len(self.events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the recorded events to the file as one block.
+        """
+        if not self.events:
+            return
+        block = marshal.dumps(self.events)
+        if self.compress:
+            block = zlib.compress(block, 1)
+        self.out.write(BLOCK_HEADER.pack(len(block), self.compress) + block)
+        self.count += len(self.events)
+        del self.events[:]
+
+    def close(self):
+        """
+        Writes the remaining events and closes the file.
+        """
+        self.flush()
+        self.out.close()
+
+
+def read_journal(source):
+    """
+    Reads the events of a journal file one block at a time.
+    :param source: The path of a journal file, or a file opened for reading in
+    binary mode.
+    :return: A generator of the event Tuples, in the order they were recorded.
+    """
+    infile = open(source, "rb") if isinstance(source, basestring) else source
+    try:
+        if infile.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not an Evolution journal")
+        header = infile.read(FORMAT_HEADER.size)
+        if len(header) < FORMAT_HEADER.size:
+            raise ValueError("truncated journal header")
+        if FORMAT_HEADER.unpack(header) != FORMAT:
+            raise ValueError("journal written by Python %d with marshal version %d"
+                             % FORMAT_HEADER.unpack(header))
+        while True:
+            header = infile.read(BLOCK_HEADER.size)
+            if not header:
+                return
+            if len(header) < BLOCK_HEADER.size:
+                raise ValueError("truncated journal block header")
+            length, compressed = BLOCK_HEADER.unpack(header)
+            block = infile.read(length)
+            if len(block) < length:
+                raise ValueError("truncated journal block")
+            if compressed:
+                block = zlib.decompress(block)
+            for event in marshal.loads(block):
+                yield event
+    finally:
+        if infile is not source:
+            infile.close()
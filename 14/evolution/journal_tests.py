@@ -0,0 +1,149 @@
+import random
+import StringIO
+import unittest
+from dealer import Dealer
+from player import Player
+from traitcard import TraitCard
+from actions import *
+from feeding import *
+from journal import *
+from deck import DeckTemplate, DeckFactory, STANDARD_DECK
+
+
+def play(seed, journal=None):
+    """
+    Plays a seeded game of Silly players, recording it in the journal if given.
+    :return: The Dealer after the game.
+    """
+    random.seed(seed)
+    dealer = Dealer([Player() for _ in range(4)], seed)
+    if journal is not None:
+        dealer.keep_journal(journal)
+    dealer.run()
+    return dealer
+
+
+class TestJournal(unittest.TestCase):
+
+    def write(self, events, **options):
+        """
+        Writes the events to a journal in memory, flushing whenever it is full.
+        :return: The bytes of the journal file.
+        """
+        out = StringIO.StringIO()
+        journal = Journal(out, **options)
+        for event in events:
+            journal.record(event)
+            journal.flush_if_full()
+        journal.flush()
+        self.assertEqual(journal.count, len(events))
+        return out.getvalue()
+
+    def test_cards(self):
+        for trait in TraitCard.traits:
+            for points in range(-8, 9):
+                card = TraitCard(trait, points)
+                self.assertEqual(decode_card(encode_card(card)), card)
+        cards = [TraitCard("carnivore", -8), TraitCard("warning-call", 8)]
+        self.assertEqual(encode_cards(cards), tuple(map(encode_card, cards)))
+
+    def test_actions(self):
+        action = Action(0, [PopGrow(0, 1)], [BodyGrow(1, 2)], [BoardAddition(3, [4, 5])],
+                        [ReplaceTrait(0, 1, 6)])
+        self.assertEqual(decode_action(encode_action(action)), action)
+        empty = Action(2, [], [], [], [])
+        self.assertEqual(decode_action(encode_action(empty)), empty)
+
+    def test_feedings(self):
+        for feeding in [AbstainFeeding(), HerbivoreFeeding(1), FatTissueFeeding(0, 3),
+                        CarnivoreFeeding(2, 1, 0)]:
+            self.assertEqual(decode_feeding(encode_feeding(feeding)), feeding)
+
+    def test_round_trip(self):
+        events = [("round", 10, i) for i in range(7)] + [("end", ((1, 2, 3),))]
+        for compress in [False, True]:
+            data = self.write(events, batch_size=3, compress=compress)
+            self.assertEqual(list(read_journal(StringIO.StringIO(data))), events)
+        self.assertEqual(list(read_journal(StringIO.StringIO(self.write([])))), [])
+
+    def test_lazy(self):
+        events = [("skip", 1), ("skip", 2), ("skip", 3)]
+        data = self.write(events, batch_size=1)
+        reader = read_journal(StringIO.StringIO(data[:-1]))
+        self.assertEqual(next(reader), ("skip", 1))
+        self.assertEqual(next(reader), ("skip", 2))
+        self.assertRaises(ValueError, next, reader)
+        header_end = len(MAGIC) + FORMAT_HEADER.size + BLOCK_HEADER.size - 1
+        self.assertRaises(ValueError, list, read_journal(StringIO.StringIO(data[:header_end])))
+        self.assertRaises(ValueError, list, read_journal(StringIO.StringIO("not a journal")))
+
+    def test_format(self):
+        data = self.write([("skip", 1)])
+        self.assertEqual(data[len(MAGIC):len(MAGIC) + FORMAT_HEADER.size],
+                         FORMAT_HEADER.pack(*FORMAT))
+        other = MAGIC + FORMAT_HEADER.pack(FORMAT[0], FORMAT[1] + 1) + \
+            data[len(MAGIC) + FORMAT_HEADER.size:]
+        self.assertRaises(ValueError, list, read_journal(StringIO.StringIO(other)))
+
+    def test_game(self):
+        out = StringIO.StringIO()
+        journal = Journal(out)
+        dealer = play(11, journal)
+        self.assertEqual(journal.events, [])
+        events = list(read_journal(StringIO.StringIO(out.getvalue())))
+        self.assertEqual(journal.count, len(events))
+
+        kind, names, seed, deck = events[0]
+        self.assertEqual((kind, names, seed, deck), ("game", (1, 2, 3, 4), 11, None))
+        self.assertEqual(events[-1], ("end", tuple(map(tuple, dealer.get_scores()))))
+        kinds = set(event[0] for event in events)
+        self.assertTrue(set(["round", "deal", "start", "choose", "reveal", "reduce",
+                             "move_food"]) <= kinds)
+        self.assertFalse(VERBOSE_KINDS & kinds)
+        start = [event for event in events if event[0] == "start"][0]
+        self.assertEqual(start[1:4], (1, 0, 0))
+        self.assertEqual(start[5], ((1, 0, 0, 0, ()),))
+        dealt = sum(event[2] for event in events if event[0] == "deal")
+        self.assertEqual(dealt, len(dealer.deck_factory.new_deck()) - len(dealer.deck))
+        for event in events:
+            if event[0] == "choose":
+                decode_action(event[2])
+
+    def test_verbose(self):
+        verbose = Journal(StringIO.StringIO(), batch_size=10000, verbose=True)
+        quiet = Journal(StringIO.StringIO(), batch_size=10000)
+        for journal in [verbose, quiet]:
+            journal.flush = lambda: None
+            play(3, journal)
+        self.assertTrue(set(["deal", "reveal", "feeding", "feed", "reduce"]) <=
+                        set(event[0] for event in verbose.events))
+        self.assertEqual(quiet.events, [event for event in verbose.events
+                                        if event[0] not in VERBOSE_KINDS])
+
+    def test_deck(self):
+        journal = Journal(StringIO.StringIO())
+        dealer = Dealer([Player() for _ in range(4)], 7)
+        template = DeckTemplate(STANDARD_DECK.cards[::-1])
+        dealer.deck_factory = DeckFactory(7, template)
+        dealer.keep_journal(journal)
+        dealer.run()
+        deck = list(read_journal(StringIO.StringIO(journal.out.getvalue())))[0][3]
+        self.assertEqual(map(decode_card, deck), DeckFactory(7, template).new_deck().cards)
+
+    def test_flush_on_error(self):
+        journal = Journal(StringIO.StringIO())
+        dealer = Dealer([Player() for _ in range(4)], 1)
+        dealer.keep_journal(journal)
+        dealer.run_round = lambda: 1 / 0
+        self.assertRaises(ZeroDivisionError, dealer.run)
+        self.assertEqual(journal.events, [])
+        self.assertEqual(journal.count, 1)
+
+    def test_unchanged(self):
+        journaled = play(5, Journal(StringIO.StringIO()))
+        self.assertEqual(journaled.get_scores(), play(5).get_scores())
+        self.assertIsNone(journaled.clone().journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
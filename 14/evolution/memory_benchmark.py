@@ -0,0 +1,131 @@
+import json
+import random
+import sys
+import types
+from dealer import Dealer
+from player import Player
+from attack_index import AttackIndex
+from deck import STANDARD_DECK
+"""
+Measures the memory used by the game objects of finished games of Evolution.
+"""
+
+# Values which are interned or shared between games, so are not counted.
+ATOMS = (int, long, float, bool, str, unicode, types.NoneType)
+# The ids of the TraitCards of the standard deck, which every deck and hand
+# of a process shares, so are not counted either. A dealer's size counts the
+# deck's list of cards but not the cards themselves.
+SHARED_CARDS = frozenset(id(card) for card in STANDARD_DECK.cards)
+
+
+def deep_size(obj, seen=None, skip=(AttackIndex,)):
+    """
+    Sums the size in bytes of an object and everything it refers to through
+    its attributes, slots and container items. Each object is counted once,
+    and ATOMS and SHARED_CARDS are not counted.
+    :param obj: The object to measure.
+    :param seen: Set of the ids of objects already counted, updated in place.
+    :param skip: Tuple of types which are not counted, eg. per-game indexes
+    shared by every player of the game.
+    :return: The Integer number of bytes.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in SHARED_CARDS \
+                or isinstance(obj, ATOMS) or isinstance(obj, skip) \
+                or isinstance(obj, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+    return size
+
+
+def finished_games(num_games, num_players, seed=0):
+    """
+    Plays games of Silly players to the end.
+    :param num_games: The number of games to play.
+    :param num_players: The number of players in each game.
+    :param seed: The seed of the first game, game i uses seed + i.
+    :return: List of the Dealers of the finished games.
+    """
+    dealers = []
+    for i in range(num_games):
+        random.seed(seed + i)
+        dealer = Dealer([Player() for _ in range(num_players)], seed + i)
+        dealer.run()
+        dealers.append(dealer)
+    return dealers
+
+
+def measure(dealers):
+    """
+    Measures the mean number of bytes used by each species, player and dealer.
+    A player's size includes its species and hand, and a dealer's size
+    includes its players and deck.
+    :param dealers: List of Dealers to measure.
+    :return: Dictionary of "species", "player" and "dealer" to mean bytes.
+    """
+    totals = {"species": 0, "player": 0, "dealer": 0}
+    counts = {"species": 0, "player": 0, "dealer": 0}
+    for dealer in dealers:
+        totals["dealer"] += deep_size(dealer)
+        counts["dealer"] += 1
+        for player in dealer.players:
+            totals["player"] += deep_size(player)
+            counts["player"] += 1
+            for species in player.species:
+                # The board is counted with the player.
+                totals["species"] += deep_size(species, set([id(player.species)]))
+                counts["species"] += 1
+    return dict((kind, float(totals[kind]) / counts[kind] if counts[kind] else 0.0)
+                for kind in totals)
+
+
+def report(sizes, baseline=None):
+    """
+    Creates a printable table of the sizes, compared with a baseline if given.
+    :param sizes: Dictionary returned by measure.
+    :param baseline: Dictionary returned by measure for an earlier version.
+    :return: A String table of bytes per object.
+    """
+    results = ""
+    for kind in ["species", "player", "dealer"]:
+        if baseline and baseline.get(kind):
+            change = 100.0 * (sizes[kind] - baseline[kind]) / baseline[kind]
+            results += "bytes per %s: %.0f (before: %.0f, %+.1f%%)\n" % \
+                (kind, sizes[kind], baseline[kind], change)
+        else:
+            results += "bytes per %s: %.0f\n" % (kind, sizes[kind])
+    return results
+
+
+def main(num_games=50, num_players=5, baseline_file=None, save_file=None):
+    """
+    Measures finished games and prints the results.
+    :param baseline_file: Path of a JSON file saved by an earlier run to compare with.
+    :param save_file: Path to save the results to as JSON.
+    """
+    sizes = measure(finished_games(num_games, num_players))
+    baseline = None
+    if baseline_file:
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+    print(report(sizes, baseline))
+    if save_file:
+        with open(save_file, "w") as f:
+            json.dump(sizes, f)
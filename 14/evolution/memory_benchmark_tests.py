@@ -0,0 +1,50 @@
+import copy
+import pickle
+import sys
+import unittest
+from memory_benchmark import *
+from species import Species
+from traitcard import TraitCard
+from deck import STANDARD_DECK
+from player_state import PlayerState
+from actions import Action, PopGrow, BodyGrow, BoardAddition, ReplaceTrait
+from feeding import AbstainFeeding, HerbivoreFeeding, FatTissueFeeding, CarnivoreFeeding
+
+
+class TestMemoryBenchmark(unittest.TestCase):
+
+    def test_no_dicts(self):
+        objects = [Species(), TraitCard("horns"), PlayerState(None),
+                   Action(0, [], [], [], []), PopGrow(0, 1), BodyGrow(0, 1),
+                   BoardAddition(0), ReplaceTrait(0, 0, 1), AbstainFeeding(),
+                   HerbivoreFeeding(0), FatTissueFeeding(0, 1), CarnivoreFeeding(0, 0, 0)]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj))
+
+    def test_copies(self):
+        player = PlayerState(None, species=[Species(3, 1, 2, ["climbing"], 0)],
+                             hand=[TraitCard("horns", 2)])
+        for other in [copy.deepcopy(player), pickle.loads(pickle.dumps(player, 2))]:
+            self.assertEqual(other.species, player.species)
+            self.assertEqual(other.hand, player.hand)
+            self.assertIs(other.species[0].board, other.species)
+            self.assertEqual(other.species[0].trait_mask, player.species[0].trait_mask)
+
+    def test_deep_size(self):
+        species = Species(traits=["horns"])
+        self.assertEqual(deep_size(species, set([id(species.traits)])),
+                         sys.getsizeof(species))
+        self.assertGreater(deep_size(species), sys.getsizeof(species))
+        cards = list(STANDARD_DECK.cards[:3])
+        self.assertEqual(deep_size(cards), sys.getsizeof(cards))
+        self.assertGreater(deep_size([TraitCard("horns", 1)]), sys.getsizeof(cards[:1]))
+
+    def test_measure(self):
+        sizes = measure(finished_games(2, 3))
+        self.assertLess(sizes["species"], sizes["player"])
+        self.assertLess(sizes["player"], sizes["dealer"])
+        self.assertIn("-50.0%", report(sizes, dict((k, 2 * v) for k, v in sizes.items())))
+
+
+if __name__ == '__main__':
+    unittest.main()
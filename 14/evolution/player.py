@@ -1,6 +1,7 @@
 from actions import *
 from feeding import *
-from traitcard import TraitCard
+from traitcard import TraitCard, CARNIVORE, FAT_TISSUE
+from species import Species
 from helpers import *
 from globals import *
 
@@ -31,23 +32,20 @@ class Player(object):
         :return: An Action representing how the player is using their cards for
         the round.
         """
-        cards = []
-        for i, card in enumerate(self.player_state.hand):
-            cards.append({"card": card, "index": i})
-        cards.sort(lambda c0, c1: TraitCard.compare(c0['card'], c1['card']))
+        hand = self.player_state.hand
+        cards = sorted(range(len(hand)), key=lambda index: hand[index].sort_key())
 
-        food_card = cards[0]['index']
+        food_card = cards[0]
         action = Action(food_card, [], [], [], [])
-        action.species_additions.append(BoardAddition(cards[1]['index'],
-                                                      [cards[2]['index']]))
-        if len(self.player_state.hand) > 3:
-            action.pop_grows.append(PopGrow(len(self.player_state.species), cards[3]['index']))
-        if len(self.player_state.hand) > 4:
-            action.body_grows.append(BodyGrow(len(self.player_state.species), cards[4]['index']))
-        if len(self.player_state.hand) > 5:
+        action.species_additions.append(BoardAddition(cards[1], [cards[2]]))
+        if len(hand) > 3:
+            action.pop_grows.append(PopGrow(len(self.player_state.species), cards[3]))
+        if len(hand) > 4:
+            action.body_grows.append(BodyGrow(len(self.player_state.species), cards[4]))
+        if len(hand) > 5:
             action.trait_replacements.append(ReplaceTrait(len(self.player_state.species),
                                                           0,
-                                                          cards[5]['index']))
+                                                          cards[5]))
         return action
 
     def next_feeding(self, player, food_available, opponents):
@@ -58,23 +56,19 @@ class Player(object):
         :param opponents: the PlayerStates of other players in the game
         :return: feeding action for the next species to feed
         """
-        hungry_fatties = [species for species in player.species
-                          if "fat-tissue" in species.traits and
-                          species.fat_storage < species.body]
-        if hungry_fatties:
+        herbivore_set, carnivore_set, fatty_set = player.species.hungry()
+        if fatty_set:
+            hungry_fatties = player.species.in_order(fatty_set)
             feeding = Player.feed_fatty(hungry_fatties, food_available)
             return FatTissueFeeding(player.species.index(feeding[0]), feeding[1])
 
-        hungry_species = [species for species in player.species if species.can_eat()]
-        hungry_carnivores = [species for species in hungry_species
-                             if "carnivore" in species.traits]
-
-        hungry_herbivores = Player.find_hungry_herbs(hungry_species, hungry_carnivores)
-        if hungry_herbivores:
-            feeding = Player.feed_herbivores(hungry_herbivores)
+        largest_first = player.species.largest_first()
+        if herbivore_set:
+            feeding = next(species for species in largest_first if species in herbivore_set)
             return HerbivoreFeeding(player.species.index(feeding))
-        if hungry_carnivores:
-            feeding = Player.feed_carnivore(hungry_carnivores, player, opponents)
+        if carnivore_set:
+            feeding = Player.attack_largest([species for species in largest_first
+                                             if species in carnivore_set], opponents)
             if feeding:
                 return Player.species_to_index(feeding, player, opponents)
         return AbstainFeeding()
@@ -88,7 +82,8 @@ class Player(object):
         :param opponents: the PlayerStates of other players in the game
         """
         attacking_species_index = player.species.index(feeding[0])
-        defending_player_index = opponents.index(feeding[1])
+        defending_player_index = next(index for index, opponent in enumerate(opponents)
+                                      if opponent is feeding[1])
         defending_species_index = feeding[1].species.index(feeding[2])
         return CarnivoreFeeding(attacking_species_index,
                                 defending_player_index,
@@ -103,11 +98,8 @@ class Player(object):
         :param hungry_carnivores: list of hungry carnivores
         :return: list of hungry herbivores
         """
-        hungry_herbs = []
-        for species in hungry_species:
-            if species not in hungry_carnivores:
-                hungry_herbs.append(species)
-        return hungry_herbs
+        carnivore_ids = set(id(species) for species in hungry_carnivores)
+        return [species for species in hungry_species if id(species) not in carnivore_ids]
 
     @classmethod
     def feed_fatty(cls, fat_tissue_species, food_available):
@@ -130,7 +122,7 @@ class Player(object):
         :param hungry_herbivores: list of hungry herbivores
         :return: the Species to feed
         """
-        return cls.sort_lex(hungry_herbivores)[0]
+        return max(hungry_herbivores, key=Species.size_key)
 
     @classmethod
     def feed_carnivore(cls, hungry_carnivores, player, opponents):
@@ -142,13 +134,23 @@ class Player(object):
         :return: An array of [attacking_species, def_player, def_species] or
         False if not possible.
         """
-        sorted_carnivores = cls.sort_lex(hungry_carnivores)
+        return cls.attack_largest(cls.sort_lex(hungry_carnivores), opponents)
+
+    @classmethod
+    def attack_largest(cls, sorted_carnivores, opponents):
+        """
+        Feeds the first carnivore that can attack, on the largest species it can attack.
+        :param sorted_carnivores: list of hungry carnivores from largest to smallest
+        :param opponents: list of all other player's states
+        :return: An array of [attacking_species, def_player, def_species] or
+        False if not possible.
+        """
         for carnivore in sorted_carnivores:
             targets = carnivore_targets(carnivore, opponents)
             if targets:
-                sorted_targets = cls.sort_lex(targets)
-                target = sorted_targets[0]
-                target_player = next(player for player in opponents if target in player.species)
+                target = max(targets, key=Species.size_key)
+                target_player = next(player for player in opponents
+                                     if target.board is player.species)
                 return [carnivore, target_player, target]
 
         return False
@@ -160,13 +162,8 @@ class Player(object):
         :param list_of_species: a Player's species boards
         :return: list of largest Species
         """
-        sorted_species = cls.sort_lex(list_of_species)
-        largest = sorted_species[0]
-        largest_species = [species for species in sorted_species
-                           if species.population == largest.population and
-                           species.food == largest.food and
-                           species.body == largest.body]
-        return largest_species
+        largest = max(species.size_key() for species in list_of_species)
+        return [species for species in list_of_species if species.size_key() == largest]
 
     @classmethod
     def sort_lex(cls, list_of_species):
@@ -175,7 +172,7 @@ class Player(object):
         :param list_of_species: a list of Species
         :return: the largest Species
         """
-        return sorted(list_of_species, cmp=cls.is_larger, reverse=True)
+        return sorted(list_of_species, key=Species.size_key, reverse=True)
 
     @classmethod
     def is_larger(cls, species_1, species_2):
@@ -185,17 +182,7 @@ class Player(object):
         :param species_2: second species to compare
         :return: 1 if the first species is larger, -1 if the second is larger, 0 if they are equal
         """
-        if species_1.population > species_2.population:
-            return 1
-        elif species_1.population == species_2.population:
-            if species_1.food > species_2.food:
-                return 1
-            elif species_1.food == species_2.food:
-                if species_1.body > species_2.body:
-                    return 1
-                elif species_1.body == species_2.body:
-                    return 0
-        return -1
+        return cmp(species_1.size_key(), species_2.size_key())
 
     @classmethod
     def largest_fatty_need(cls, list_of_species):
@@ -213,7 +200,8 @@ class Player(object):
                            if species.population - species.food == max_need]
         largest_needers = cls.largest_tied_species(highest_needers)
         if len(largest_needers) > 1:
-            positions = [list_of_species.index(species) for species in largest_needers]
-            return largest_needers[positions.index(min(positions))]
+            positions = dict((id(species), index)
+                             for index, species in enumerate(list_of_species))
+            return min(largest_needers, key=lambda species: positions[id(species)])
         else:
             return largest_needers[0]
@@ -1,8 +1,493 @@
 from helpers import *
 from species import Species
+from traitcard import TRAIT_BITS, CARNIVORE, COOPERATION, FAT_TISSUE, FORAGING
 from actions import *
 from choice import Choice
+from action_plan import ActionPlan
 from globals import *
+from zobrist import zobrist_key, slot_mix, card_zobrist, hand_zobrist, board_zobrist
+
+
+class Board(list):
+    """
+    A player's List of Species ordered from left to right. Keeps each of its
+    species' board attribute pointing at it, and counts every change to the
+    list or to one of its species so that information computed from the board
+    can tell when it is out of date. Once they are first asked for, keeps the
+    sets of hungry species, the positions of the species and the Zobrist hash
+    up to date as species are added, removed, fed or changed, and caches the
+    size order of the board until it changes. Boards which are only looked at
+    in some phases of a game, or never, do not pay for them.
+
+    Attributes:
+        version: Integer incremented whenever the board or one of its species changes.
+        attack_index: The AttackIndex of the game this board is part of, or None.
+        undo_log: The UndoLog of the game this board is part of while it has an
+            open checkpoint, or None.
+        hungry_herbivores: Set of the Species without carnivore that can eat,
+            or None until hungry is called.
+        hungry_carnivores: Set of the Species with carnivore that can eat, or
+            None until hungry is called.
+        hungry_fatties: Set of the Species with fat-tissue whose fat storage is
+            less than their body size, or None until hungry is called.
+        hashed: The Zobrist hash of the board, kept up to date by XORing in the
+            change of each species as it changes and of each species appended,
+            or None until zobrist is called after species were removed or moved.
+        positions: Dictionary of the identity, ie. id(), of each Species of
+            the board to its index, so a species is found without comparing it
+            to the others, or None until position is called after species were
+            removed or moved. Species ids are not used as copies share them.
+        size_order: Tuple (version, List of Species) of the board's species
+            from largest to smallest when it was last sorted, or None if
+            species were added, removed or moved since.
+    """
+    __slots__ = ("version", "attack_index", "undo_log", "hungry_herbivores",
+                 "hungry_carnivores", "hungry_fatties", "hashed", "positions",
+                 "size_order")
+
+    # When True, every call to hungry checks the sets against a full recompute.
+    check_hunger = False
+
+    def __init__(self, species=None):
+        list.__init__(self, species or [])
+        self.version = 0
+        self.attack_index = None
+        self.undo_log = None
+        self.hungry_herbivores = None
+        self.hungry_carnivores = None
+        self.hungry_fatties = None
+        self.hashed = None
+        self.positions = None
+        self.size_order = None
+        self.adopt(self)
+
+    def __reduce__(self):
+        return (Board, (), {"version": self.version, "attack_index": self.attack_index},
+                iter(self))
+
+    def __setstate__(self, state):
+        self.version = state["version"]
+        self.attack_index = state["attack_index"]
+
+    def clone(self):
+        """
+        Copies this board and its species for a copy of the game. The copy
+        shares the attack index, keeps the hash and has no undo log. Its hungry
+        sets, positions and size order are recomputed when first needed.
+        :return: A new Board independent of this one.
+        """
+        board = Board.__new__(Board)
+        list.extend(board, [species.clone(board) for species in self])
+        board.version = 0
+        board.attack_index = self.attack_index
+        board.undo_log = None
+        board.hungry_herbivores = None
+        board.hungry_carnivores = None
+        board.hungry_fatties = None
+        board.hashed = self.hashed
+        board.positions = None
+        board.size_order = None
+        return board
+
+    def log_change(self):
+        """
+        Records this board in its undo log, if any, before it changes.
+        """
+        if self.undo_log is not None:
+            self.undo_log.record(self)
+
+    def snapshot(self):
+        """
+        :return: The state of this board for UndoLog.
+        """
+        return list(self)
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot.
+        :return: This board, whose hungry sets must be recomputed.
+        """
+        list.__setslice__(self, 0, len(self), snapshot)
+        return self
+
+    def changed(self):
+        """
+        Bumps the version of the board and tells its attack index, if any,
+        that the board changed.
+        """
+        self.version += 1
+        if self.attack_index is not None:
+            self.attack_index.touch(self)
+
+    def refresh(self):
+        """
+        Marks the board as changed and forgets its hungry sets, positions, size
+        order and hash, which are recomputed from every species when next needed.
+        """
+        self.changed()
+        self.forget()
+        self.hashed = None
+
+    def adopt(self, added, removed=(), appended=False):
+        """
+        Marks the board as changed, points the added species at this board and
+        updates the hungry sets, the positions and the hash, if they have been
+        computed. The hash is forgotten unless the species were appended.
+        The size order is forgotten, so it does not keep removed species alive.
+        :param added: List of Species added to this board.
+        :param removed: List of Species removed from this board.
+        :param appended: True if the added species were put on the end of the
+        board and no other species moved, so the positions only need the new ones.
+        """
+        self.changed()
+        self.size_order = None
+        if self.hungry_herbivores is not None:
+            for spec in removed:
+                self.hungry_herbivores.discard(spec)
+                self.hungry_carnivores.discard(spec)
+                self.hungry_fatties.discard(spec)
+        for spec in removed:
+            if spec.board is self:
+                spec.board = None
+        for spec in added:
+            spec.board = self
+            self.update_hunger(spec)
+        if not appended:
+            self.positions = None
+            self.hashed = None
+            return
+        for index in range(len(self) - len(added), len(self)):
+            if self.positions is not None:
+                self.positions[id(self[index])] = index
+            if self.hashed is not None:
+                spec = self[index]
+                object.__setattr__(spec, "hashed", spec.zobrist())
+                self.hashed ^= slot_mix(spec.hashed, index)
+
+    def forget(self):
+        """
+        Drops the hungry sets, positions and size order of the board, eg. once
+        a feeding phase is over. They are recomputed when next needed.
+        """
+        self.hungry_herbivores = None
+        self.hungry_carnivores = None
+        self.hungry_fatties = None
+        self.positions = None
+        self.size_order = None
+
+    def zobrist(self):
+        """
+        Hashes the species of the board and their order. Only looks at every
+        species the first time, or after species were removed or moved, and
+        keeps the hash up to date as species change or are appended after that.
+        :return: A 64 bit Integer.
+        """
+        if self.hashed is None:
+            value = 0
+            for index, spec in enumerate(self):
+                object.__setattr__(spec, "hashed", spec.zobrist())
+                value ^= slot_mix(spec.hashed, index)
+            self.hashed = value
+        return self.hashed
+
+    def update_zobrist(self, species):
+        """
+        XORs the change of a species of this board into the board's hash, if it
+        is kept.
+        :param species: A Species of this board that may have changed.
+        """
+        if self.hashed is None:
+            return
+        index = self.position(species)
+        if index is None:
+            self.hashed = None
+            return
+        old = species.hashed
+        new = species.zobrist()
+        object.__setattr__(species, "hashed", new)
+        self.hashed ^= slot_mix(old, index) ^ slot_mix(new, index)
+
+    def position(self, species):
+        """
+        Finds the index of a species of this board from its identity.
+        :param species: A Species.
+        :return: The index of the species, or None if it is not on this board.
+        """
+        positions = self.positions
+        if positions is None:
+            positions = self.positions = dict((id(spec), index)
+                                              for index, spec in enumerate(self))
+        index = positions.get(id(species))
+        if index is not None and list.__getitem__(self, index) is species:
+            return index
+        return None
+
+    def index(self, species, *args):
+        """
+        Finds the index of the species in constant time if it is on this board,
+        otherwise falls back to comparing it with every species.
+        """
+        index = self.position(species) if isinstance(species, Species) and not args else None
+        if index is None:
+            return list.index(self, species, *args)
+        return index
+
+    def __contains__(self, species):
+        if isinstance(species, Species) and self.position(species) is not None:
+            return True
+        return list.__contains__(self, species)
+
+    def verify_zobrist(self):
+        """
+        Checks the kept hash of the board against a recompute, ie. that every
+        change since it was hashed was XORed in.
+        :raise AssertionError: If the hash does not match its recompute.
+        """
+        if self.hashed is not None:
+            assert self.hashed == board_zobrist(self), "board hash out of date"
+
+    def update_hunger(self, species):
+        """
+        Updates which of the hungry sets the given species of this board is in,
+        if the sets have been computed.
+        :param species: A Species of this board that may have changed.
+        """
+        if self.hungry_herbivores is None:
+            return
+        mask = species.trait_mask
+        fatty = mask & FAT_TISSUE and species.fat_storage < species.body
+        # Same as species.can_eat()
+        if not (fatty or species.food < species.population):
+            self.hungry_herbivores.discard(species)
+            self.hungry_carnivores.discard(species)
+        elif mask & CARNIVORE:
+            self.hungry_herbivores.discard(species)
+            self.hungry_carnivores.add(species)
+        else:
+            self.hungry_carnivores.discard(species)
+            self.hungry_herbivores.add(species)
+        if fatty:
+            self.hungry_fatties.add(species)
+        else:
+            self.hungry_fatties.discard(species)
+
+    def hungry(self):
+        """
+        Finds the hungry species of this board, only looking at every species
+        the first time the sets are needed.
+        :return: A tuple (hungry_herbivores, hungry_carnivores, hungry_fatties)
+        of Sets of Species, which must not be modified.
+        """
+        if self.hungry_herbivores is None:
+            self.hungry_herbivores = set()
+            self.hungry_carnivores = set()
+            self.hungry_fatties = set()
+            for spec in self:
+                self.update_hunger(spec)
+        elif Board.check_hunger:
+            self.verify_hunger()
+        return self.hungry_herbivores, self.hungry_carnivores, self.hungry_fatties
+
+    def verify_hunger(self):
+        """
+        Checks the hungry sets, if they have been computed, against a
+        recompute from every species.
+        :raise AssertionError: If a set does not match its recompute.
+        """
+        if self.hungry_herbivores is None:
+            return
+        herbivores = set(spec for spec in self
+                         if spec.can_eat() and not spec.trait_mask & CARNIVORE)
+        carnivores = set(spec for spec in self
+                         if spec.can_eat() and spec.trait_mask & CARNIVORE)
+        fatties = set(spec for spec in self
+                      if spec.trait_mask & FAT_TISSUE and spec.fat_storage < spec.body)
+        assert self.hungry_herbivores == herbivores, "hungry herbivores out of date"
+        assert self.hungry_carnivores == carnivores, "hungry carnivores out of date"
+        assert self.hungry_fatties == fatties, "hungry fat-tissue species out of date"
+
+    def largest_first(self):
+        """
+        Sorts the species of this board by Species.size_key, largest first and
+        ties from left to right. The order is kept until the board or one of
+        its species changes.
+        :return: List of Species, which must not be modified.
+        """
+        view = self.size_order
+        if view is None or view[0] != self.version:
+            view = self.size_order = (self.version, sorted(self, key=Species.size_key,
+                                                           reverse=True))
+        return view[1]
+
+    def in_order(self, set_of_species):
+        """
+        :param set_of_species: Set of Species on this board.
+        :return: List of the given species ordered from left to right.
+        """
+        return [spec for spec in self if spec in set_of_species]
+
+    def append(self, species):
+        self.log_change()
+        list.append(self, species)
+        self.adopt([species], appended=True)
+
+    def extend(self, list_of_species):
+        self.log_change()
+        list_of_species = list(list_of_species)
+        list.extend(self, list_of_species)
+        self.adopt(list_of_species, appended=True)
+
+    def insert(self, index, species):
+        self.log_change()
+        list.insert(self, index, species)
+        self.adopt([species])
+
+    def remove(self, species):
+        self.log_change()
+        index = self.index(species)
+        species = self[index]
+        list.__delitem__(self, index)
+        self.adopt([], [species])
+
+    def pop(self, *args):
+        self.log_change()
+        species = list.pop(self, *args)
+        self.adopt([], [species])
+        return species
+
+    def sort(self, *args, **kwargs):
+        self.log_change()
+        list.sort(self, *args, **kwargs)
+        self.adopt([])
+
+    def reverse(self):
+        self.log_change()
+        list.reverse(self)
+        self.adopt([])
+
+    def __setitem__(self, index, species):
+        self.log_change()
+        removed = self[index]
+        list.__setitem__(self, index, species)
+        if isinstance(index, slice):
+            self.adopt(species, removed)
+        else:
+            self.adopt([species], [removed])
+
+    def __delitem__(self, index):
+        self.log_change()
+        removed = self[index]
+        list.__delitem__(self, index)
+        self.adopt([], removed if isinstance(index, slice) else [removed])
+
+    def __setslice__(self, i, j, list_of_species):
+        self.log_change()
+        list_of_species = list(list_of_species)
+        removed = self[i:j]
+        list.__setslice__(self, i, j, list_of_species)
+        self.adopt(list_of_species, removed)
+
+    def __delslice__(self, i, j):
+        self.log_change()
+        removed = self[i:j]
+        list.__delslice__(self, i, j)
+        self.adopt([], removed)
+
+    def __iadd__(self, list_of_species):
+        self.extend(list_of_species)
+        return self
+
+
+class Hand(list):
+    """
+    A player's List of TraitCards which keeps its Zobrist hash once it is asked
+    for. Dealt cards are XORed in, other changes make it be recomputed.
+
+    Attributes:
+        hashed: The 64 bit hash of the cards and their order, or None if the
+            hand changed since it was last hashed.
+    """
+    __slots__ = ("hashed",)
+
+    def __init__(self, cards=None):
+        list.__init__(self, cards or [])
+        self.hashed = None
+
+    def __reduce__(self):
+        return (Hand, (list(self),))
+
+    def clone(self):
+        """
+        :return: A new Hand of the same cards, which are shared, and hash.
+        """
+        hand = Hand.__new__(Hand)
+        list.extend(hand, self)
+        hand.hashed = self.hashed
+        return hand
+
+    def zobrist(self):
+        """
+        :return: The 64 bit hash of the cards and their order.
+        """
+        if self.hashed is None:
+            self.hashed = hand_zobrist(self)
+        return self.hashed
+
+    def rehash(self):
+        self.hashed = None
+
+    def append(self, card):
+        list.append(self, card)
+        if self.hashed is not None:
+            self.hashed ^= card_zobrist(len(self) - 1, card)
+
+    def extend(self, cards):
+        start = len(self)
+        list.extend(self, cards)
+        if self.hashed is not None:
+            for index in range(start, len(self)):
+                self.hashed ^= card_zobrist(index, self[index])
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def insert(self, index, card):
+        list.insert(self, index, card)
+        self.rehash()
+
+    def remove(self, card):
+        list.remove(self, card)
+        self.rehash()
+
+    def pop(self, *args):
+        card = list.pop(self, *args)
+        self.rehash()
+        return card
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.rehash()
+
+    def reverse(self):
+        list.reverse(self)
+        self.rehash()
+
+    def __setitem__(self, index, card):
+        list.__setitem__(self, index, card)
+        self.rehash()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.rehash()
+
+    def __setslice__(self, i, j, cards):
+        list.__setslice__(self, i, j, cards)
+        self.rehash()
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self.rehash()
 
 
 class PlayerState(object):
@@ -16,10 +501,21 @@ class PlayerState(object):
         interface: A Class the player delegates strategy decisions to.
         name: An Integer identifier for the player.
         food_bag: Integer representing the number of food tokens acquired.
-        hand: A List of `TraitCards` representing the cards the player can use.
-        species: A List of `Species` representing the species boards the player
+        hand: A Hand of `TraitCards` representing the cards the player can use.
+            Assigning a List of TraitCards replaces it with a new Hand.
+        species: A Board of `Species` representing the species boards the player
             has in front of them. Species are ordered from left to right.
+            Assigning a List of Species replaces it with a new Board.
+        public: The PlayerState last returned by public_state, or None.
+        used_cards: Set of the indices of the cards in hand used by the action
+            being applied, removed from the hand by remove_used_cards.
+        owner: The PlayerList of the game this player is in, or None. Its
+            version is bumped whenever species is assigned or restored, so views
+            of the players can tell when a board was replaced.
     """
+    __slots__ = ("interface", "name", "food_bag", "hand", "species", "public",
+                 "used_cards", "owner")
+
     def __init__(self, interface, name=None, food_bag=None, hand=None, species=None):
         if food_bag is None:
             food_bag = 0
@@ -32,8 +528,79 @@ class PlayerState(object):
         self.name = name
         self.food_bag = food_bag
         self.hand = hand
+        self.public = None
+        self.used_cards = set()
+        self.owner = None
+        # Set last, a player is only recorded in the undo log once it has a board.
         self.species = species
 
+    def __setattr__(self, name, value):
+        """
+        Sets the attribute, keeping the species in a Board and the hand in a
+        Hand. A Board which is already in use is shared rather than copied, as
+        in public_state. Assigning species bumps the version of the owner.
+        """
+        old_board = getattr(self, "species", None)
+        if old_board is not None and old_board.undo_log is not None:
+            old_board.undo_log.record(self)
+        if name == "species" and not isinstance(value, Board):
+            board = Board(value)
+            if old_board is not None:
+                board.attack_index = old_board.attack_index
+                board.undo_log = old_board.undo_log
+            value = board
+        elif name == "hand" and not isinstance(value, Hand):
+            value = Hand(value)
+        object.__setattr__(self, name, value)
+        if name == "species":
+            if old_board is not None and old_board.attack_index is not None:
+                old_board.attack_index.touch(old_board)
+            if self.owner is not None:
+                self.owner.changed()
+
+    def __getstate__(self):
+        """
+        The owner is left out, a copied player is put in a PlayerList by
+        copying the list.
+        """
+        return dict((name, getattr(self, name)) for name in PlayerState.__slots__
+                    if name != "owner")
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "owner", None)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def log_change(self):
+        """
+        Records this player in the undo log of its board, if any, before it changes.
+        """
+        if self.species.undo_log is not None:
+            self.species.undo_log.record(self)
+
+    def snapshot(self):
+        """
+        :return: The state of this player for UndoLog.
+        """
+        return (self.food_bag, self.hand, list(self.hand), self.species,
+                set(self.used_cards), self.public)
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot, bumping the version of the owner.
+        :return: None, a player has no hungry sets.
+        """
+        food_bag, hand, cards, species, used_cards, public = snapshot
+        hand[:] = cards
+        object.__setattr__(self, "food_bag", food_bag)
+        object.__setattr__(self, "hand", hand)
+        object.__setattr__(self, "species", species)
+        object.__setattr__(self, "used_cards", used_cards)
+        object.__setattr__(self, "public", public)
+        if self.owner is not None:
+            self.owner.changed()
+        return None
+
     def __str__(self):
         return "PlayerState(Food=%d, Hand=%s, Species=%s" % (self.food_bag, self.hand, self.species)
 
@@ -62,12 +629,11 @@ class PlayerState(object):
         :param board_additions: List of BoardAdditions to construct species from.
         """
         for addition in board_additions:
-            self.hand[addition.payment_index].used = True
+            self.use_card(addition.payment_index)
             traits = []
             for trait_idx in addition.traits:
-                new_trait = self.hand[trait_idx]
-                traits.append(new_trait.trait)
-                new_trait.used = True
+                traits.append(self.hand[trait_idx].trait)
+                self.use_card(trait_idx)
             self.species.append(Species(traits=traits))
 
     def replace_traits(self, trait_replacements):
@@ -79,7 +645,7 @@ class PlayerState(object):
             species = self.species[replace.species_index]
             new_trait = self.hand[replace.new_trait_index]
             species.replace_trait(replace.removed_trait_index, new_trait.trait)
-            new_trait.used = True
+            self.use_card(replace.new_trait_index)
 
     def increase_populations(self, pop_grows):
         """
@@ -90,7 +656,7 @@ class PlayerState(object):
         """
         for grow in pop_grows:
             self.species[grow.species_index].breed()
-            self.hand[grow.payment_index].used = True
+            self.use_card(grow.payment_index)
 
     def increase_body_sizes(self, body_grows):
         """
@@ -101,25 +667,82 @@ class PlayerState(object):
         """
         for grow in body_grows:
             self.species[grow.species_index].grow_body()
-            self.hand[grow.payment_index].used = True
+            self.use_card(grow.payment_index)
+
+    def use_card(self, card_index):
+        """
+        Marks the card at the given index of this player's hand as used.
+        :param card_index: Index of the card in the player's hand.
+        """
+        self.log_change()
+        self.used_cards.add(card_index)
+
+    def take_cards(self, cards):
+        """
+        Adds the given cards to the end of this player's hand.
+        :param cards: List of TraitCards.
+        """
+        self.log_change()
+        self.hand.extend(cards)
 
     def remove_used_cards(self):
         """
         Removes all cards from this player's hand that are marked used.
         """
-        self.hand = filter(lambda c: not c.used, self.hand)
+        self.hand = [card for index, card in enumerate(self.hand)
+                     if index not in self.used_cards]
+        self.used_cards = set()
+
+    def clone(self):
+        """
+        Copies this player's state for a copy of the game. The interface and the
+        trait cards are shared with the copy, species are copied.
+        :return: A new PlayerState independent of this one.
+        """
+        clone = PlayerState.__new__(PlayerState)
+        object.__setattr__(clone, "interface", self.interface)
+        object.__setattr__(clone, "name", self.name)
+        object.__setattr__(clone, "food_bag", self.food_bag)
+        object.__setattr__(clone, "hand", self.hand.clone())
+        object.__setattr__(clone, "species", self.species.clone())
+        object.__setattr__(clone, "public", None)
+        object.__setattr__(clone, "used_cards", set(self.used_cards))
+        object.__setattr__(clone, "owner", None)
+        return clone
+
+    def zobrist(self):
+        """
+        Hashes the state of this player from the hashes cached by its board and
+        hand, which only look at its species or cards if they changed.
+        :return: A 64 bit Integer.
+        """
+        return self.species.zobrist() ^ self.hand.zobrist() ^ \
+            zobrist_key("food_bag", self.food_bag)
+
+    def verify_zobrist(self):
+        """
+        Checks the hashes kept by this player's board and hand against a recompute.
+        :raise AssertionError: If a hash does not match its recompute.
+        """
+        self.species.verify_zobrist()
+        hashed = self.hand.hashed
+        assert hashed is None or hashed == hand_zobrist(self.hand), "hand hash out of date"
 
     def public_state(self):
         """
-        Creates a new player with private information set to defaults.
-        :return: A new PlayerState object with the same information as this
+        Creates a player with private information set to defaults. The player is
+        kept and reused until this player's species are replaced.
+        :return: A PlayerState object with the same information as this
         player state, but with private information set to defaults.
         """
-        return PlayerState(None,
-                           name=self.name,
-                           food_bag=None,
-                           hand=None,
-                           species=self.species)
+        public = self.public
+        if public is None or public.species is not self.species:
+            public = self.public = PlayerState(None,
+                                               name=self.name,
+                                               food_bag=None,
+                                               hand=None,
+                                               species=self.species)
+        return public
 
     def start(self, wh):
         """
@@ -156,109 +779,7 @@ class PlayerState(object):
         :param action: An Action to validate.
         :return: True if the given Action is valid to apply, else False.
         """
-        return all([action.has_unique_indices(),
-                    self.are_actions_in_range(action),
-                    self.validate_pop_grows(action),
-                    self.validate_body_grows(action),
-                    self.validate_board_additions(action),
-                    self.validate_trait_replacements(action)])
-
-    def validate_pop_grows(self, action):
-        """
-        Ensures all PopGrow in the Action are valid to apply to this player.
-        :param action: The Action to validate.
-        :return: True if the Action's pop_grows are valid to apply.
-        """
-        species_pops = {}
-        for pop_grow in action.pop_grows:
-            spec_idx = pop_grow.species_index
-            if spec_idx >= len(self.species) + len(action.species_additions):
-                return False
-
-            if spec_idx in species_pops:
-                species_pops[spec_idx] += 1
-            else:
-                species_pop = 1
-                if spec_idx < len(self.species):
-                    species_pop = self.species[spec_idx].population + 1
-                species_pops[spec_idx] = species_pop
-        for pop in species_pops:
-            if species_pops[pop] > MAX_POPULATION:
-                return False
-        return True
-
-    def validate_body_grows(self, action):
-        """
-        Ensures all BodyGrow in the action are valid to apply to this player.
-        :param action: The Action to validate.
-        :return: True if the Action's body_grows are valid to apply.
-        """
-        species_bodys = {}
-        for body_grow in action.body_grows:
-            spec_idx = body_grow.species_index
-            if spec_idx >= len(self.species) + len(action.species_additions):
-                return False
-            if spec_idx in species_bodys:
-                species_bodys[spec_idx] += 1
-            else:
-                species_body = 0
-                if spec_idx < len(self.species):
-                    species_body = self.species[spec_idx].body + 1
-                species_bodys[spec_idx] = species_body
-        for body in species_bodys:
-            if species_bodys[body] > MAX_BODY_SIZE:
-                return False
-
-        return True
-
-    def validate_board_additions(self, action):
-        """
-        Ensures all BoardAddition in the action are valid to apply to this player.
-        :param action: The Action to validate.
-        :return True if the Action's board_additions are valid to apply.
-        """
-        for board_addition in action.species_additions:
-            traits = map(lambda idx: self.hand[idx].trait, board_addition.traits)
-            if not is_unique_list(traits):
-                return False
-        return True
-
-    def validate_trait_replacements(self, action):
-        """
-        Ensures all ReplaceTrait in the action are valid to apply to this player.
-        :param action: The Action to validate.
-        :return True if the Action's trait_replacements are valid to apply.
-        """
-        for replacement in action.trait_replacements:
-            spec_idx = replacement.species_index
-            if spec_idx < len(self.species):
-                spec = self.species[spec_idx]
-            elif spec_idx < len(self.species) + len(action.species_additions):
-                board_addition = action.species_additions[spec_idx - len(self.species)]
-                spec_traits = map(lambda idx: self.hand[idx].trait, board_addition.traits)
-                spec = Species(traits=spec_traits)
-            else:
-                return False
-
-            if replacement.removed_trait_index >= len(spec.traits):
-                return False
-            new_trait = self.hand[replacement.new_trait_index].trait
-            traits = [trait for trait in spec.traits]
-            traits.pop(replacement.removed_trait_index)
-            if new_trait in traits:
-                return False
-
-        return True
-
-    def are_actions_in_range(self, actions):
-        """
-        Checks to make sure the cards in the given Action are in the players hand.
-        :param actions: the action to perform the check on.
-        """
-        for idx in actions.get_indices():
-            if idx >= len(self.hand):
-                return False
-        return True
+        return ActionPlan(self, action).valid()
 
     def trait_trigger(self, traitname, effect):
         """
@@ -266,8 +787,9 @@ class PlayerState(object):
         :param traitname: A String trait name.
         :param effect: Function which takes in a species and modifies it accordingly.
         """
+        bit = TRAIT_BITS[traitname]
         for species in self.species:
-            if traitname in species.traits:
+            if species.trait_mask & bit:
                 effect(species)
 
     def trigger_trait_feeding(self, traitname, wh):
@@ -276,8 +798,9 @@ class PlayerState(object):
         :param traitname: The trait to trigger the feeding.
         :param wh: The number of food tokens in the watering hole.
         """
+        bit = TRAIT_BITS[traitname]
         for species in self.species:
-            if traitname in species.traits:
+            if species.trait_mask & bit:
                 wh = self.feed(species, wh)
         return wh
 
@@ -318,34 +841,51 @@ class PlayerState(object):
         """
         Feeds the given species food tokens from the watering hole. Accounts for
         foraging food amounts as well as cooperation feeding.
+
+        Every token a cooperating species eats feeds its right neighbor once,
+        and the neighbor's own cooperation is carried out before the next
+        token, so chains are followed depth first. The chains are kept on a
+        stack of board positions rather than followed by recursion.
         :param species: The species to be fed.
         :param wh: The number of food tokens in the watering hole.
-        """
-        before_eating = species.food
-
-        wh = self.give_food(species, wh)
-        if "foraging" in species.traits:
-            wh = self.give_food(species, wh)
-
-        tokens_eaten = species.food - before_eating
-        for _ in range(tokens_eaten):
-            wh = self.cooperate(species, wh)
-
+        :return: The number of food tokens left in the watering hole.
+        """
+        board = self.species
+        last = len(board) - 1
+        eaten, wh = self.eat(species, wh)
+        position = board.position(species)
+        # [position, tokens] of each cooperating species with eaten tokens which
+        # have not fed its right neighbor yet.
+        pending = []
+        if eaten and position is not None and position < last and \
+                species.trait_mask & COOPERATION:
+            pending.append([position, eaten])
+        while pending and wh >= 1:
+            entry = pending[-1]
+            entry[1] -= 1
+            if entry[1] == 0:
+                pending.pop()
+            position = entry[0] + 1
+            neighbor = board[position]
+            eaten, wh = self.eat(neighbor, wh)
+            if eaten and position < last and neighbor.trait_mask & COOPERATION:
+                pending.append([position, eaten])
         return wh
 
-    def cooperate(self, species, wh):
+    def eat(self, species, wh):
         """
-        Triggers cooperation for the given species if it has the cooperation trait.
-        :param species: The species cooperating.
-        :param wh: The number of food tokens in the watering hole.
+        Gives the given species a food token from the watering hole, and a
+        second one if it has the foraging trait.
+        :param species: The Species to be fed.
+        :param wh: Number of food tokens in the watering hole.
+        :return: Tuple (number of tokens eaten, number of tokens left in the
+        watering hole).
         """
-        if wh >= 1:
-            species_index = self.species.index(species)
-            right_neighbor = (False if species_index == len(self.species) - 1
-                              else self.species[species_index + 1])
-            if "cooperation" in species.traits and right_neighbor:
-                wh = self.feed(right_neighbor, wh)
-        return wh
+        before_eating = species.food
+        wh = self.give_food(species, wh)
+        if species.trait_mask & FORAGING:
+            wh = self.give_food(species, wh)
+        return species.food - before_eating, wh
 
     def give_food(self, species, wh):
         """
@@ -386,16 +926,10 @@ class PlayerState(object):
         :param opponents: The PlayerStates of all other players in the game.
         :return: True if the player has at least one valid Feeding, otherwise false.
         """
-        hungries = [species for species in self.species if species.can_eat()]
-        non_feedable_carnivores = \
-            [carnivore for carnivore in hungries if
-                "carnivore" in carnivore.traits and
-                len(carnivore_targets(carnivore, opponents)) == 0]
-
-        non_feedable_carnivores = \
-            [carnivore for carnivore in non_feedable_carnivores
-             if "fat-tissue" not in carnivore.traits or
-             ("fat-tissue" in carnivore.traits and
-              carnivore.fat_storage == carnivore.body)]
-
-        return hungries > 0 and len(hungries) != len(non_feedable_carnivores)
+        hungry_herbivores, hungry_carnivores, _ = self.species.hungry()
+        if hungry_herbivores:
+            return True
+        return any(carnivore.trait_mask & FAT_TISSUE and
+                   carnivore.fat_storage != carnivore.body or
+                   len(carnivore_targets(carnivore, opponents)) != 0
+                   for carnivore in hungry_carnivores)
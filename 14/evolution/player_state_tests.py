@@ -1,14 +1,33 @@
 import copy
+import random
 import unittest
 import test_utils
 from species import Species
 from traitcard import TraitCard
-from player_state import PlayerState
+from player_state import PlayerState, Board
 from actions import *
 from player import Player
+from dealer import Dealer
 from globals import *
 
 
+def recursive_feed(board, species, wh):
+    """
+    Feeds a species the way PlayerState.feed used to, with one recursive call
+    per cooperation, to check the iterative engine against.
+    """
+    before_eating = species.food
+    for _ in range(2 if "foraging" in species.traits else 1):
+        if species.population - species.food >= 1 and wh >= 1:
+            species.food += 1
+            wh -= 1
+    for _ in range(species.food - before_eating):
+        index = map(id, board).index(id(species))
+        if wh >= 1 and "cooperation" in species.traits and index < len(board) - 1:
+            wh = recursive_feed(board, board[index + 1], wh)
+    return wh
+
+
 class TestPlayerState(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -200,58 +219,144 @@ class TestPlayerState(unittest.TestCase):
         self.player.species[2].traits = ["carnivore"]
         self.assertFalse(self.player.can_feed([]))
 
-    def test_are_actions_in_range_valid(self):
-        good_action_gp_gb = Action(2, [PopGrow(0, 1)], [BodyGrow(1, 0)], [], [])
-        good_action_board = Action(2, [], [], [BoardAddition(0, [1])], [])
-        good_action_ba_rt = Action(2, [], [], [BoardAddition(0, [])], [ReplaceTrait(0, 0, 1)])
-        self.assertTrue(self.player.are_actions_in_range(good_action_gp_gb))
-        self.assertTrue(self.player.are_actions_in_range(good_action_board))
-        self.assertTrue(self.player.are_actions_in_range(good_action_ba_rt))
-
-    def test_are_actions_in_range_invalid(self):
-        good_action_gp_gb = Action(3, [PopGrow(0, 1)], [BodyGrow(1, 0)], [], [])
-        good_action_board = Action(2, [], [], [BoardAddition(0, [3])], [])
-        good_action_ba_rt = Action(2, [], [], [BoardAddition(0, [])], [ReplaceTrait(0, 0, 3)])
-        self.assertFalse(self.player.are_actions_in_range(good_action_gp_gb))
-        self.assertFalse(self.player.are_actions_in_range(good_action_board))
-        self.assertFalse(self.player.are_actions_in_range(good_action_ba_rt))
-
-    def test_validate_pop_grows(self):
-        good_action = Action(3, [PopGrow(0, 1), PopGrow(0, 0)], [], [], [])
-        self.assertTrue(self.player.validate_pop_grows(good_action))
-        self.player.species[0].population = MAX_POPULATION
-        bad_action = Action(3, [PopGrow(0, 1)], [], [], [])
-        self.assertFalse(self.player.validate_pop_grows(bad_action))
-        self.player.species[0].population = MAX_POPULATION - 1
-        bad_action = Action(3, [PopGrow(0, 1), PopGrow(0, 0)], [], [], [])
-        self.assertFalse(self.player.validate_pop_grows(bad_action))
-
-    def test_validate_body_grows(self):
-        good_action = Action(3, [], [BodyGrow(0, 1), BodyGrow(0, 0)], [], [])
-        self.assertTrue(self.player.validate_body_grows(good_action))
-        self.player.species[0].body = MAX_BODY_SIZE
-        bad_action = Action(3, [], [BodyGrow(0, 1)], [], [])
-        self.assertFalse(self.player.validate_body_grows(bad_action))
-        self.player.species[0].body = MAX_BODY_SIZE - 1
-        bad_action = Action(3, [], [BodyGrow(0, 1), BodyGrow(0, 0)], [], [])
-        self.assertFalse(self.player.validate_body_grows(bad_action))
-
-    def test_validate_board_additions(self):
-        good_action = Action(3, [], [], [BoardAddition(0, [1])], [])
-        self.assertTrue(self.player.validate_board_additions(good_action))
-        self.player.hand.append(TraitCard("long-neck"))
-        bad_action = Action(3, [], [], [BoardAddition(0, [0, 3])], [])
-        self.assertFalse(self.player.validate_board_additions(bad_action))
-
-    def test_validate_trait_replacements(self):
-        good_action = Action(3, [], [], [], [ReplaceTrait(0, 0, 1)])
-        self.assertTrue(self.player.validate_trait_replacements(good_action))
-        bad_action = Action(3, [], [], [], [ReplaceTrait(0, 1, 1)])
-        self.assertFalse(self.player.validate_trait_replacements(bad_action))
-        self.player.species[0].traits.append("long-neck")
-        bad_action = Action(3, [], [], [], [ReplaceTrait(0, 0, 0)])
-        self.assertFalse(self.player.validate_trait_replacements(bad_action))
+    def test_hungry(self):
+        carnivore, burrower, fatty = self.player.species
+        self.assertEqual(self.player.species.hungry(), (set([fatty]), set(), set([fatty])))
+        fatty.fat_storage = 1
+        self.assertEqual(self.player.species.hungry(), (set([fatty]), set(), set()))
+        fatty.food = 1
+        carnivore.population = 4
+        self.assertEqual(self.player.species.hungry(), (set(), set([carnivore]), set()))
+        burrower.traits.append("carnivore")
+        burrower.population += 1
+        self.assertEqual(self.player.species.hungry()[1], set([carnivore, burrower]))
+        self.player.kill(burrower)
+        self.player.species.remove(carnivore)
+        self.assertEqual(self.player.species.hungry(), (set(), set(), set()))
+        self.assertIsNone(carnivore.board)
+        carnivore.food = 0
+        self.assertEqual(self.player.species.hungry(), (set(), set(), set()))
+        self.player.species = [carnivore, Species(2, 1, 0)]
+        self.assertEqual(len(self.player.species.hungry()[0]), 1)
+        self.assertEqual(self.player.species.hungry()[1], set([carnivore]))
+
+    def test_hungry_copies(self):
+        other = copy.deepcopy(self.player)
+        other.species.verify_hunger()
+        other.species[0].population = 5
+        other.species.verify_hunger()
+        self.player.species.verify_hunger()
+        self.assertEqual(self.player.species.hungry()[1], set())
+
+    def test_verify_hunger(self):
+        fatty = self.player.species[2]
+        self.player.species.hungry()
+        self.player.species.hungry_fatties.discard(fatty)
+        self.assertRaises(AssertionError, self.player.species.verify_hunger)
+        Board.check_hunger = True
+        try:
+            self.assertRaises(AssertionError, self.player.species.hungry)
+        finally:
+            Board.check_hunger = False
+
+    def test_hungry_games(self):
+        Board.check_hunger = True
+        try:
+            for seed in range(20):
+                random.seed(seed)
+                Dealer([Player() for _ in range(5)]).run()
+        finally:
+            Board.check_hunger = False
+
+    def test_positions(self):
+        board = self.player.species
+        twin = copy.deepcopy(board[0])
+        self.assertEqual(twin, board[0])
+        board.append(twin)
+        self.assertEqual(board.index(twin), 3)
+        self.assertEqual(board.index(board[0]), 0)
+        self.assertEqual(board.index(copy.deepcopy(twin)), 0)
+        self.assertIsNone(board.position(copy.deepcopy(twin)))
+        self.player.kill(board[1])
+        self.assertEqual(board.position(board[0]), 0)
+        self.assertEqual(board.positions, dict((id(spec), i) for i, spec in enumerate(board)))
+        self.assertEqual(board.index(twin), 2)
+        board.remove(twin)
+        self.assertIsNone(board.position(twin))
+        self.assertIn(twin, board)
+        board[0].id = Species.gen_id()
+        self.assertEqual(board.position(board[0]), 0)
+
+    def test_lazy_caches(self):
+        board = Board([Species(2, 0, 1), Species(1, 1, 1)])
+        self.assertIsNone(board.hungry_herbivores)
+        self.assertIsNone(board.positions)
+        self.assertEqual(board.hungry()[0], set([board[0]]))
+        self.assertEqual(board.position(board[1]), 1)
+        board.append(Species())
+        self.assertEqual(board.positions[id(board[2])], 2)
+        board.largest_first()
+        removed = board.pop(0)
+        self.assertIsNone(board.size_order)
+        self.assertIsNone(board.positions)
+        self.assertNotIn(removed, board.hungry()[0])
+        board.forget()
+        self.assertIsNone(board.hungry_herbivores)
+        board[0].food = 0
+        self.assertEqual(board.hungry()[0], set(board))
+
+    def test_feed_twins(self):
+        cooperator = Species(2, 0, 1, ["cooperation"])
+        neighbor = Species(2, 0, 1)
+        twin = copy.deepcopy(cooperator)
+        self.player.species = [cooperator, neighbor, twin]
+        board = self.player.species
+        self.assertEqual([board.position(spec) for spec in board], [0, 1, 2])
+        self.assertEqual(self.player.feed(cooperator, 10), 8)
+        self.assertEqual((cooperator.food, neighbor.food, twin.food), (1, 1, 0))
+
+    def test_largest_first(self):
+        board = self.player.species
+        species_0, species_1, species_2 = board
+        self.assertEqual(board.largest_first(), [species_0, species_1, species_2])
+        self.assertIs(board.largest_first(), board.largest_first())
+        species_2.food = 1
+        self.assertEqual(board.largest_first(), [species_0, species_1, species_2])
+        species_2.body = 2
+        self.assertEqual(board.largest_first(), [species_0, species_2, species_1])
+        board.insert(0, Species(2, 0, 0))
+        self.assertEqual(board.largest_first()[0], board[0])
+        board.reverse()
+        self.assertEqual(board.largest_first(), Player.sort_lex(board))
+
+    def test_feed_cooperation_chains(self):
+        rand = random.Random(1400)
+        for _ in range(300):
+            species = []
+            for _ in range(rand.randint(1, 8)):
+                population = rand.randint(1, MAX_POPULATION)
+                traits = [trait for trait in ["foraging", "cooperation"]
+                          if rand.random() < 0.7]
+                species.append(Species(population, rand.randint(0, population), 0, traits))
+            expected = copy.deepcopy(species)
+            wh = rand.randint(0, 30)
+            player = PlayerState(Player, species=species)
+            feeding = rand.randrange(len(species))
+            left = player.feed(species[feeding], wh)
+            self.assertEqual(left, recursive_feed(expected, expected[feeding], wh))
+            self.assertEqual([spec.food for spec in species],
+                             [spec.food for spec in expected])
 
+    def test_feed_long_chain(self):
+        species = [Species(MAX_POPULATION, 0, 0, ["foraging", "cooperation"])
+                   for _ in range(3000)]
+        player = PlayerState(Player, species=species)
+        # The first species eats 2 tokens, feeding the second twice, which
+        # eats 4 and fills up every species after it.
+        self.assertEqual(player.feed(species[0], 10 ** 6),
+                         10 ** 6 - 6 - 2998 * MAX_POPULATION)
+        self.assertEqual([spec.food for spec in species[:3]], [2, 4, MAX_POPULATION])
+        self.assertTrue(all(spec.food == MAX_POPULATION for spec in species[2:]))
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import copy
+import random
 import unittest
 import test_utils
 from actions import *
@@ -187,6 +188,20 @@ class TestPlayer(unittest.TestCase):
         self.assertEqual(Player.sort_lex(self.species_list), sorted_list)
         self.assertNotEqual(Player.sort_lex(self.species_list), self.species_list)
 
+    def test_sort_keys(self):
+        rand = random.Random(1800)
+        for _ in range(200):
+            species = [Species(rand.randint(1, 3), rand.randint(0, 1), rand.randint(0, 2))
+                       for _ in range(rand.randint(1, 6))]
+            self.assertEqual(Player.sort_lex(species),
+                             sorted(species, cmp=Player.is_larger, reverse=True))
+            self.assertEqual(Player.largest_tied_species(species),
+                             [spec for spec in Player.sort_lex(species)
+                              if Player.is_larger(spec, Player.sort_lex(species)[0]) == 0])
+        cards = TraitCard.gen_cards(9, "carnivore") + TraitCard.gen_cards(5, "ambush")
+        rand.shuffle(cards)
+        self.assertEqual(sorted(cards, key=TraitCard.sort_key), sorted(cards, TraitCard.compare))
+
     def test_largest_tied_species(self):
         tied_species = [self.species_2, self.species_1]
         self.assertEqual(Player.largest_tied_species(self.species_list), tied_species)
@@ -1,6 +1,6 @@
 import json
 from convert import Convert
-from helpers import timeout
+from helpers import timeout, socket_call
 from globals import *
 
 
@@ -28,14 +28,14 @@ class ProxyDealer(object):
         Waits for a message from the Dealer for CLIENT_WAIT_TIME seconds.
         """
         while True:
-            data = self.connection.recv(1024)
+            data = socket_call(self.connection, "recv", 1024)
             print("Got data: " + str(data))
             while data is not None:
                 (msg, data) = self.json_parser(data)
                 to_send = self.decode(msg)
                 print("Remaining msg in buffer: " + str(data))
                 if to_send is not None:
-                    self.connection.sendall(json.dumps(to_send))
+                    socket_call(self.connection, "sendall", json.dumps(to_send))
 
     def json_parser(self, buffer):
         """
@@ -1,5 +1,5 @@
 import json
-from helpers import timeout, TimeoutError
+from helpers import timeout, socket_call, TimeoutError
 from globals import *
 from convert import *
 
@@ -19,7 +19,7 @@ class ProxyPlayer(object):
         :return: JSON data received from the client.
         """
         while(True):
-            data = self.socket.recv(MAX_MSG_SIZE)
+            data = socket_call(self.socket, "recv", MAX_MSG_SIZE)
             if data is not None:
                 print("dealer got data: " + str(data))
                 return json.loads(data)
@@ -36,7 +36,7 @@ class ProxyPlayer(object):
         cards = map(lambda card: Convert.trait_card_to_json(card), player_state.hand)
         msg = [wh, player_state.food_bag, species, cards]
         print("seding message: " + str(msg))
-        self.socket.sendall(json.dumps(msg))
+        socket_call(self.socket, "sendall", json.dumps(msg))
 
     def choose(self, choice):
         """
@@ -49,7 +49,7 @@ class ProxyPlayer(object):
         before = map(lambda los: Convert.list_of_species_to_json(los), choice.before)
         after = map(lambda los: Convert.list_of_species_to_json(los), choice.after)
         msg = [before, after]
-        self.socket.sendall(json.dumps(msg))
+        socket_call(self.socket, "sendall", json.dumps(msg))
         try:
             data = self.get_response()
             return Convert.json_to_action(data)
@@ -70,7 +70,7 @@ class ProxyPlayer(object):
         cards = map(lambda card: Convert.trait_card_to_json(card), player.hand)
         msg = [player.food_bag, species, cards, food_available, opponents_species]
         print("Sending message:" + str(msg))
-        self.socket.sendall(json.dumps(msg))
+        socket_call(self.socket, "sendall", json.dumps(msg))
         try:
             data = self.get_response()
             return Convert.json_to_feeding(data)
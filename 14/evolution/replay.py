@@ -0,0 +1,283 @@
+import os
+import random
+import time
+from multiprocessing import Pool, cpu_count
+from dealer import Dealer
+from deck import DeckFactory, DeckTemplate
+from tournament import STRATEGIES
+from journal import Journal, read_journal, decode_card, decode_action, decode_feeding
+"""
+Replays games recorded in journals without any player interfaces, checking
+that each replay ends with the recorded scores.
+"""
+
+# The suffix of the journal files of a directory of recordings.
+JOURNAL_SUFFIX = ".journal"
+
+
+class ReplayDiverged(Exception):
+    pass
+
+
+class Recording(object):
+    """
+    Everything needed to play one recorded game again: its deck and the
+    response of each player to each call from the dealer.
+
+    Attributes:
+        names: Tuple of the names of the players, in seat order.
+        seed: The seed the deck was shuffled with, or None.
+        deck: Tuple of the encoded cards of the deck, top first, or None if it
+            is the standard deck shuffled by the seed.
+        actions: Dictionary of player name to List of its encoded Actions, in
+            the order they were chosen. None is a player that gave no Action.
+        feedings: Dictionary of player name to List of its encoded Feedings, in
+            the order they were chosen. None is a player that gave no Feeding.
+        scores: The recorded Dealer.get_scores() of the end of the game, as a
+            Tuple of (name, score) Tuples.
+    """
+    def __init__(self, names, seed, deck):
+        self.names = names
+        self.seed = seed
+        self.deck = deck
+        self.actions = dict((name, []) for name in names)
+        self.feedings = dict((name, []) for name in names)
+        self.scores = None
+
+
+def read_recordings(source):
+    """
+    Reads the games of a journal one at a time.
+    :param source: The path of a journal file, or a file opened for reading in
+    binary mode.
+    :return: A generator of the Recordings of the finished games in the journal.
+    """
+    recording = None
+    for event in read_journal(source):
+        kind = event[0]
+        if kind == "choose":
+            recording.actions[event[1]].append(event[2])
+        elif kind == "next_feeding":
+            recording.feedings[event[1]].append(event[2])
+        elif kind == "game":
+            recording = Recording(*event[1:])
+        elif kind == "end":
+            recording.scores = event[1]
+            yield recording
+            recording = None
+
+
+class ReplayDealer(Dealer):
+    """
+    A Dealer which deals the recorded deck and answers each call to a player
+    with its recorded response, so the recorded Actions and Feedings go
+    through the same validation, apply_actions and feed1 as in the recorded game.
+    Its deck factory makes the recorded deck, from its cards if they were
+    recorded and otherwise from the recorded seed.
+
+    Attributes:
+        recording: The Recording being replayed.
+        actions: Dictionary of player name to an iterator of its recorded Actions.
+        feedings: Dictionary of player name to an iterator of its recorded Feedings.
+    """
+    def __init__(self, recording):
+        """
+        :param recording: The Recording to replay.
+        :raise ValueError: If the recorded players were not named by their seat.
+        """
+        Dealer.__init__(self, [None] * len(recording.names), recording.seed)
+        if tuple(player.name for player in self.players) != tuple(recording.names):
+            raise ValueError("recorded players are not named by seat")
+        self.recording = recording
+        if recording.deck is not None:
+            self.deck_factory = DeckFactory(None, DeckTemplate(map(decode_card, recording.deck)))
+        self.actions = dict((name, iter(actions))
+                            for name, actions in recording.actions.items())
+        self.feedings = dict((name, iter(feedings))
+                             for name, feedings in recording.feedings.items())
+
+    def ask(self, player, method, *args):
+        """
+        Answers a call to a player with the player's next recorded response
+        instead of calling its interface.
+        :param player: The PlayerState.
+        :param method: The bound method of the player which would ask its interface.
+        :return: The recorded Action or Feeding, or None.
+        :raise ReplayDiverged: If the player has no more recorded responses,
+        ie. the replay diverged from the recorded game.
+        """
+        name = method.__name__
+        if name == "choose":
+            responses, decode = self.actions, decode_action
+        elif name == "next_feeding":
+            responses, decode = self.feedings, decode_feeding
+        else:
+            return None
+        encoded = next(responses[player.name], False)
+        if encoded is False:
+            raise ReplayDiverged("no more recorded %s for player %d" % (name, player.name))
+        return decode(encoded) if encoded else None
+
+    def check_finished(self):
+        """
+        Checks that every recorded response was asked for.
+        :raise ReplayDiverged: If a player has recorded responses left, ie. the
+        replay asked fewer questions than the recorded game.
+        """
+        for name, responses in [("choose", self.actions), ("next_feeding", self.feedings)]:
+            for player_name, remaining in sorted(responses.items()):
+                if next(remaining, False) is not False:
+                    raise ReplayDiverged("unused recorded %s for player %d"
+                                         % (name, player_name))
+
+
+def replay_game(recording):
+    """
+    Plays a recorded game again.
+    :param recording: A Recording.
+    :return: The Dealer.get_scores() of the replay as a Tuple of Tuples, which
+    equals recording.scores if the engine played the game as recorded, or None
+    if the replay asked a player for more or fewer responses than were
+    recorded. Any other error of the engine is raised.
+    """
+    dealer = ReplayDealer(recording)
+    try:
+        dealer.run()
+        dealer.check_finished()
+    except ReplayDiverged:
+        return None
+    return tuple(tuple(score) for score in dealer.get_scores())
+
+
+def replay_file(path):
+    """
+    Replays every game of a journal file. This is run inside the worker
+    processes so it must be a module level function.
+    :param path: The path of the journal file.
+    :return: A tuple (path, games, mismatches, seconds) where mismatches is the
+    List of the indices in the file of the games whose replay did not end
+    with the recorded scores, and seconds is the time spent replaying.
+    """
+    recordings = list(read_recordings(path))
+    mismatches = []
+    start = time.time()
+    for index, recording in enumerate(recordings):
+        if replay_game(recording) != recording.scores:
+            mismatches.append(index)
+    return (path, len(recordings), mismatches, time.time() - start)
+
+
+def journal_paths(directory):
+    """
+    :param directory: The path of a directory of recordings.
+    :return: The sorted List of the paths of its journal files.
+    """
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith(JOURNAL_SUFFIX)]
+
+
+def record_games(directory, num_games, num_players, num_files=None, strategy="silly",
+                 base_seed=0):
+    """
+    Plays seeded games and records them into journal files in the directory,
+    as play_game of a tournament would play them. Game i is played with the
+    seed base_seed + i and recorded in file i % num_files.
+    :param directory: The path of an existing directory.
+    :param num_games: The number of games to play.
+    :param num_players: The number of players of each game.
+    :param num_files: The number of journal files, defaults to the number of cores.
+    :param strategy: A String name from tournament.STRATEGIES for every seat.
+    :param base_seed: The seed of the first game.
+    :return: List of the paths of the journal files.
+    """
+    if num_files is None:
+        num_files = cpu_count()
+    paths = [os.path.join(directory, "games-%03d%s" % (index, JOURNAL_SUFFIX))
+             for index in range(num_files)]
+    journals = [Journal.open(path) for path in paths]
+    try:
+        for game_index in xrange(num_games):
+            seed = base_seed + game_index
+            random.seed(seed)
+            dealer = Dealer([STRATEGIES[strategy]() for _ in range(num_players)], seed)
+            journal = dealer.keep_journal(journals[game_index % num_files])
+            dealer.run()
+            journal.flush_if_full()
+    finally:
+        for journal in journals:
+            journal.close()
+    return paths
+
+
+class ReplayResults(object):
+    """
+    Aggregated results of replaying a directory of recordings.
+
+    Attributes:
+        games: The number of games replayed.
+        mismatches: List of (path, index) of the games whose replay did not end
+            with the recorded scores.
+        replay_seconds: The sum of the time each worker spent replaying, not
+            counting reading the journals.
+        elapsed: The number of seconds of wall time of the whole replay.
+    """
+    def __init__(self):
+        self.games = 0
+        self.mismatches = []
+        self.replay_seconds = 0.0
+        self.elapsed = 0.0
+
+    def add_file(self, path, games, mismatches, seconds):
+        """
+        Adds the results of one journal file, as returned by replay_file.
+        """
+        self.games += games
+        self.mismatches.extend((path, index) for index in mismatches)
+        self.replay_seconds += seconds
+
+    def games_per_second(self):
+        """
+        :return: The number of games replayed per second of wall time.
+        """
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """
+        Creates a printable summary of the replay.
+        :return: A String summary of the replay.
+        """
+        results = ""
+        for path, index in self.mismatches:
+            results += "mismatch: game %d of %s\n" % (index, path)
+        results += "%d games replayed, %d mismatches\n" % (self.games, len(self.mismatches))
+        results += "%d games in %.2fs (%.1f games/second), %.2fs replaying\n" % \
+            (self.games, self.elapsed, self.games_per_second(), self.replay_seconds)
+        return results
+
+
+def replay_directory(directory, processes=None):
+    """
+    Replays every game of every journal file in the directory over a pool of
+    worker processes, one file at a time per worker.
+    :param directory: The path of a directory of recordings.
+    :param processes: The number of worker processes, defaults to the number
+    of cores.
+    :return: The ReplayResults of all games.
+    """
+    results = ReplayResults()
+    paths = journal_paths(directory)
+    if processes is None:
+        processes = cpu_count()
+    pool = Pool(processes)
+    start = time.time()
+    try:
+        for path, games, mismatches, seconds in pool.imap_unordered(replay_file, paths):
+            results.add_file(path, games, mismatches, seconds)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    results.elapsed = time.time() - start
+    return results
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import unittest
+import random
+from io import BytesIO
+from replay import *
+from player import Player
+from deck import DeckTemplate, DeckFactory, STANDARD_DECK
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = record_games(self.directory, 12, 4, num_files=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_recordings(self):
+        self.assertEqual(journal_paths(self.directory), self.paths)
+        recordings = list(read_recordings(self.paths[0]))
+        self.assertEqual([recording.seed for recording in recordings], [0, 2, 4, 6, 8, 10])
+        for recording in recordings:
+            self.assertEqual(recording.names, (1, 2, 3, 4))
+            self.assertIsNone(recording.deck)
+            self.assertTrue(all(recording.actions.values()))
+            self.assertTrue(recording.scores)
+
+    def test_replay_file(self):
+        path, games, mismatches, seconds = replay_file(self.paths[1])
+        self.assertEqual((path, games, mismatches), (self.paths[1], 6, []))
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_replay_directory(self):
+        results = replay_directory(self.directory, 2)
+        self.assertEqual(results.games, 12)
+        self.assertEqual(results.mismatches, [])
+        self.assertIn("12 games replayed, 0 mismatches", results.summary())
+
+    def test_recorded_deck(self):
+        out = BytesIO()
+        journal = Journal(out)
+        random.seed(3)
+        dealer = Dealer([Player() for _ in range(4)], 3)
+        dealer.deck_factory = DeckFactory(3, DeckTemplate(STANDARD_DECK.cards[::-1]))
+        dealer.keep_journal(journal)
+        dealer.run()
+        recording = next(read_recordings(BytesIO(out.getvalue())))
+        self.assertEqual(len(recording.deck), 122)
+        self.assertEqual(replay_game(recording), recording.scores)
+
+    def test_diverged(self):
+        recording = next(read_recordings(self.paths[0]))
+        self.assertEqual(replay_game(recording), recording.scores)
+        recording.actions[1][0] = None
+        self.assertNotEqual(replay_game(recording), recording.scores)
+        recording.actions[2] = []
+        self.assertIsNone(replay_game(recording))
+        self.assertRaises(ReplayDiverged, ReplayDealer(recording).run)
+
+    def test_unused_responses(self):
+        recording = next(read_recordings(self.paths[0]))
+        recording.actions[3].append(recording.actions[3][-1])
+        dealer = ReplayDealer(recording)
+        dealer.run()
+        self.assertRaises(ReplayDiverged, dealer.check_finished)
+        self.assertIsNone(replay_game(recording))
+
+    def test_engine_error(self):
+        recording = next(read_recordings(self.paths[0]))
+        self.addCleanup(delattr, ReplayDealer, "move_food")
+        ReplayDealer.move_food = lambda dealer: int("x")
+        self.assertRaises(ValueError, replay_game, recording)
+
+
+if __name__ == '__main__':
+    unittest.main()
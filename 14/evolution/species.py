@@ -1,4 +1,245 @@
+from itertools import count
+import threading
+import instrumentation
 from globals import *
+from traitcard import *
+from zobrist import species_zobrist
+
+# The fields of a species which decide if it can attack or be attacked.
+ATTACK_FIELDS = frozenset(["population", "food", "body", "traits"])
+# The fields of a species which decide if it is hungry and make up its hash.
+STATE_FIELDS = frozenset(["population", "food", "body", "fat_storage"])
+
+# The IdAllocator of the game running in a thread, as GAME_IDS.allocator of
+# that thread, and the ids of species made in threads not running a game.
+GAME_IDS = threading.local()
+SHARED_IDS = count(1)
+
+
+class IdAllocator(object):
+    """
+    Hands out the ids of the species made during one game, so the ids of a
+    game do not depend on the other games run in the same process.
+
+    Attributes:
+        last: The last id handed out.
+    """
+    __slots__ = ("last",)
+
+    def __init__(self, last=0):
+        self.last = last
+
+    def next_id(self):
+        """
+        :return: A new id, larger than every id handed out or reserved before.
+        """
+        self.last += 1
+        return self.last
+
+    def reserve(self, ids):
+        """
+        Makes sure none of the given ids are handed out, eg. those of the species
+        a game starts with.
+        :param ids: Iterable of Integer ids.
+        """
+        self.last = max([self.last] + list(ids))
+
+    def clone(self):
+        """
+        :return: A new IdAllocator which continues from the same id.
+        """
+        return IdAllocator(self.last)
+
+
+def bind_ids(allocator):
+    """
+    Makes the allocator hand out the ids of the species made in this thread.
+    :param allocator: An IdAllocator, or None to use SHARED_IDS.
+    :return: The IdAllocator bound before, or None.
+    """
+    previous = getattr(GAME_IDS, "allocator", None)
+    GAME_IDS.allocator = allocator
+    return previous
+
+
+class TraitList(list):
+    """
+    A List of trait names that keeps the trait mask and attack features of
+    the species it belongs to up to date whenever it is changed in place.
+    """
+    __slots__ = ("species",)
+
+    def __init__(self, traits, species):
+        list.__init__(self, traits)
+        self.species = species
+
+    def __reduce__(self):
+        return (TraitList, (list(self), None), {"species": self.species})
+
+    def __setstate__(self, state):
+        self.species = state["species"]
+
+    def changing(self):
+        if self.species is not None and self.species.traits is self:
+            self.species.log_change()
+
+    def changed(self):
+        if self.species is not None and self.species.traits is self:
+            self.species.update_traits()
+
+    def append(self, trait):
+        self.changing()
+        list.append(self, trait)
+        self.changed()
+
+    def extend(self, traits):
+        self.changing()
+        list.extend(self, traits)
+        self.changed()
+
+    def insert(self, index, trait):
+        self.changing()
+        list.insert(self, index, trait)
+        self.changed()
+
+    def remove(self, trait):
+        self.changing()
+        list.remove(self, trait)
+        self.changed()
+
+    def pop(self, *args):
+        self.changing()
+        trait = list.pop(self, *args)
+        self.changed()
+        return trait
+
+    def sort(self, *args, **kwargs):
+        self.changing()
+        list.sort(self, *args, **kwargs)
+        self.changed()
+
+    def reverse(self):
+        self.changing()
+        list.reverse(self)
+        self.changed()
+
+    def __setitem__(self, index, trait):
+        self.changing()
+        list.__setitem__(self, index, trait)
+        self.changed()
+
+    def __delitem__(self, index):
+        self.changing()
+        list.__delitem__(self, index)
+        self.changed()
+
+    def __setslice__(self, i, j, traits):
+        self.changing()
+        list.__setslice__(self, i, j, traits)
+        self.changed()
+
+    def __delslice__(self, i, j):
+        self.changing()
+        list.__delslice__(self, i, j)
+        self.changed()
+
+    def __iadd__(self, traits):
+        self.changing()
+        list.__iadd__(self, traits)
+        self.changed()
+        return self
+
+    def __imul__(self, n):
+        self.changing()
+        list.__imul__(self, n)
+        self.changed()
+        return self
+
+
+class AttackCache(object):
+    """
+    A bounded memo table of Species.is_attackable results. The result of an
+    attack only depends on the traits and sizes of the attacker, the defender
+    and the defender's neighbors, which are all small values, so the same
+    attacks come up over and over during a game. It is shared by every game
+    of the process. Lookups read the table without a lock and count into the
+    counters of their own thread, so only storing a new result takes the lock.
+
+    Attributes:
+        enabled: True if lookups should use the table.
+        max_size: The number of results kept before the table is emptied.
+        table: Dictionary of attack key to the Boolean result of the attack.
+            Emptying it swaps in a new dictionary, so lock-free readers never
+            see a half-changed table.
+        counters: List of the [lookups, misses] counters of every thread that
+            used the table.
+        local: threading.local holding the counters of the current thread.
+        lock: Lock held while storing results or registering counters.
+    """
+    def __init__(self, max_size=ATTACK_CACHE_SIZE, enabled=True):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.table = {}
+        self.counters = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def thread_counters(self):
+        """
+        :return: The [lookups, misses] counters of the current thread, made
+            and registered on its first lookup.
+        """
+        counters = getattr(self.local, "counters", None)
+        if counters is None:
+            counters = [0, 0]
+            with self.lock:
+                self.counters.append(counters)
+            self.local.counters = counters
+        return counters
+
+    def clear(self):
+        """
+        Removes all results from the table and resets the counters.
+        """
+        with self.lock:
+            self.table = {}
+            for counters in self.counters:
+                counters[0] = counters[1] = 0
+
+    def stats(self):
+        """
+        :return: A dictionary of the table's size, hits, misses and hit rate.
+        """
+        with self.lock:
+            lookups = sum(counters[0] for counters in self.counters)
+            misses = sum(counters[1] for counters in self.counters)
+        size = len(self.table)
+        hits = lookups - misses
+        return {"size": size,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": float(hits) / lookups if lookups else 0.0}
+
+    def get(self, key):
+        """
+        Looks up the result of an attack.
+        :param key: The attack key.
+        :return: The Boolean result of the attack, or None if it is not stored.
+        """
+        self.thread_counters()[0] += 1
+        return self.table.get(key)
+
+    def store(self, key, result):
+        """
+        Stores a newly computed result, emptying the table first if it is full.
+        :param key: The attack key.
+        :param result: The Boolean result of the attack.
+        """
+        self.thread_counters()[1] += 1
+        with self.lock:
+            if len(self.table) >= self.max_size:
+                self.table = {}
+            self.table[key] = result
 
 
 class Species(object):
@@ -9,19 +250,33 @@ class Species(object):
         population: The population of the species
         food: the number of food tokens the species has
         body: the body size of the species
-        traits: a List of TraitCards the species has
+        traits: a List of the names of the traits the species has
+        trait_mask: the traits as an Integer mask of traitcard.TRAIT_BITS, kept
+            in sync with traits.
         fat_storage: the number of fat-food tokens the species has
-        id: a unique ID for the species
+        id: an ID of the species, unique among the species of its game
+        attack_features: the Tuple (trait mask, population, food, body) of the
+            species, which is all that decides attacks, or None until the
+            features method computes it after they change.
+        board: the player's Board this species is on, or None.
+        hashed: the Zobrist hash of the species as it is XORed into the hash
+            of its board, kept up to date while the board's hash is, or None.
     """
-    uuid = 0
+    __slots__ = ("board", "population", "food", "body", "traits", "trait_mask",
+                 "attack_features", "fat_storage", "id", "hashed")
+
+    attack_cache = AttackCache()
 
     @classmethod
     def gen_id(cls):
         """
-        Generates a unique id using an incremental counter.
+        Generates an id from the IdAllocator of the game running in this thread,
+        or from the counter shared by the process outside of a game.
         """
-        cls.uuid += 1
-        return cls.uuid
+        allocator = getattr(GAME_IDS, "allocator", None)
+        if allocator is None:
+            return next(SHARED_IDS)
+        return allocator.next_id()
 
     def __init__(self, population=None, food=None, body=None, traits=None, fat_storage=None):
         if population is None:
@@ -35,13 +290,140 @@ class Species(object):
         if fat_storage is None:
             fat_storage = 0
 
-        self.population = population
-        self.food = food
-        self.body = body
+        object.__setattr__(self, "board", None)
+        object.__setattr__(self, "hashed", None)
+        object.__setattr__(self, "population", population)
+        object.__setattr__(self, "food", food)
+        object.__setattr__(self, "body", body)
+        object.__setattr__(self, "fat_storage", fat_storage)
         self.traits = traits
-        self.fat_storage = fat_storage
         self.id = Species.gen_id()
 
+    def __setattr__(self, name, value):
+        """
+        Sets the attribute, keeping trait_mask up to date and the hungry sets,
+        hash and version of the species' board, and forgetting attack_features once
+        the fields they are made of change. The change is only recorded if the
+        board has an undo log.
+        """
+        board = self.board
+        if board is not None and board.undo_log is not None:
+            board.undo_log.record(self)
+        if name == "traits":
+            object.__setattr__(self, name, TraitList(value, self))
+            self.update_traits()
+            return
+        object.__setattr__(self, name, value)
+        if name in STATE_FIELDS:
+            if name in ATTACK_FIELDS:
+                object.__setattr__(self, "attack_features", None)
+            if board is not None:
+                board.changed()
+                board.update_hunger(self)
+                board.update_zobrist(self)
+
+    def log_change(self):
+        """
+        Records this species in the undo log of its board, if any, before it changes.
+        """
+        board = self.board
+        if board is not None and board.undo_log is not None:
+            board.undo_log.record(self)
+
+    def snapshot(self):
+        """
+        :return: The state of this species for UndoLog.
+        """
+        return (self.board, self.population, self.food, self.body, list(self.traits),
+                self.trait_mask, self.attack_features, self.fat_storage)
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot.
+        :return: The Board this species is on afterwards, whose hungry sets
+        must be recomputed.
+        """
+        board, population, food, body, traits, mask, features, fat_storage = snapshot
+        object.__setattr__(self, "board", board)
+        object.__setattr__(self, "population", population)
+        object.__setattr__(self, "food", food)
+        object.__setattr__(self, "body", body)
+        object.__setattr__(self, "traits", TraitList(traits, self))
+        object.__setattr__(self, "trait_mask", mask)
+        object.__setattr__(self, "attack_features", features)
+        object.__setattr__(self, "fat_storage", fat_storage)
+        return board
+
+    def clone(self, board=None):
+        """
+        Copies this species, keeping its id and hash.
+        :param board: The Board the copy is put on, which must add it to its
+        species, or None.
+        :return: A new Species independent of this one.
+        """
+        clone = Species.__new__(Species)
+        object.__setattr__(clone, "board", board)
+        object.__setattr__(clone, "hashed", self.hashed)
+        object.__setattr__(clone, "population", self.population)
+        object.__setattr__(clone, "food", self.food)
+        object.__setattr__(clone, "body", self.body)
+        object.__setattr__(clone, "traits", TraitList(self.traits, clone))
+        object.__setattr__(clone, "trait_mask", self.trait_mask)
+        object.__setattr__(clone, "attack_features", self.attack_features)
+        object.__setattr__(clone, "fat_storage", self.fat_storage)
+        object.__setattr__(clone, "id", self.id)
+        return clone
+
+    def __getstate__(self):
+        """
+        The board is left out, a copied species is put on a board by copying
+        the board.
+        """
+        return dict((name, getattr(self, name)) for name in Species.__slots__
+                    if name != "board")
+
+    def __setstate__(self, state):
+        """
+        Restores a copied or unpickled species. Feature ids are only meaningful
+        within one process so they are forgotten and recomputed when needed.
+        """
+        object.__setattr__(self, "board", None)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self.update_traits()
+
+    def update_traits(self):
+        """
+        Recomputes this species' trait_mask from its traits, forgets its
+        attack_features, marks its board as changed and updates the board's
+        hungry sets and hash.
+        """
+        object.__setattr__(self, "trait_mask", trait_mask(self.traits))
+        object.__setattr__(self, "attack_features", None)
+        if self.board is not None:
+            self.board.changed()
+            self.board.update_hunger(self)
+            self.board.update_zobrist(self)
+
+    def features(self):
+        """
+        :return: The attack_features of this species, computed if they changed
+        since they were last asked for.
+        """
+        features = self.attack_features
+        if features is None:
+            features = (self.trait_mask, self.population, self.food, self.body)
+            object.__setattr__(self, "attack_features", features)
+        return features
+
+    def zobrist(self):
+        """
+        :return: The 64 bit Zobrist hash of the population, food, body, fat
+        storage and traits of this species.
+        """
+        return species_zobrist(self.population, self.food, self.body, self.fat_storage,
+                               self.traits)
+
     def __str__(self):
         return "Species(pop=%d, food=%d, body=%d, traits=%s id=%d" \
                % (self.population, self.food, self.body, self.traits, self.id)
@@ -58,7 +440,7 @@ class Species(object):
     def is_attackable(self, attacker, left_neighbor=False, right_neighbor=False):
         """
         Determines if this species is attackable by the attacker species,
-        given its two neighbors
+        given its two neighbors. Results are memoized in Species.attack_cache.
         :param attacker: the Species attacking this species
         :param left_neighbor: the Species to the left of this species
                               (False if no left neighbor)
@@ -66,30 +448,54 @@ class Species(object):
                                (False if no left neighbor)
         :return: True if attackable, else false
         """
-        defender_traits = self.traits
-        attacker_traits = attacker.traits
-        left_traits = left_neighbor.traits if left_neighbor else []
-        right_traits = right_neighbor.traits if right_neighbor else []
-        attacker_body = attacker.body + (attacker.population if "pack-hunting" in attacker_traits
+        if instrumentation.ACTIVE is not None:
+            instrumentation.count("is_attackable")
+        cache = Species.attack_cache
+        if not cache.enabled:
+            return self.attack_rules(attacker, left_neighbor, right_neighbor)
+        key = (attacker.features(), self.features(),
+               left_neighbor.features() if left_neighbor else -1,
+               right_neighbor.features() if right_neighbor else -1)
+        result = cache.get(key)
+        if result is None:
+            result = self.attack_rules(attacker, left_neighbor, right_neighbor)
+            cache.store(key, result)
+        return result
+
+    def attack_rules(self, attacker, left_neighbor=False, right_neighbor=False):
+        """
+        Applies the rules of attacking to determine if this species is
+        attackable by the attacker species, given its two neighbors.
+        :param attacker: the Species attacking this species
+        :param left_neighbor: the Species to the left of this species
+                              (False if no left neighbor)
+        :param right_neighbor: the Species to the right of this species
+                               (False if no left neighbor)
+        :return: True if attackable, else false
+        """
+        defender_traits = self.trait_mask
+        attacker_traits = attacker.trait_mask
+        neighbor_traits = (left_neighbor.trait_mask if left_neighbor else 0) | \
+                          (right_neighbor.trait_mask if right_neighbor else 0)
+        attacker_body = attacker.body + (attacker.population if attacker_traits & PACK_HUNTING
                                          else 0)
 
-        return not any(["carnivore" not in attacker_traits,
-                        "burrowing" in defender_traits and self.food == self.population,
-                        "climbing" in defender_traits and "climbing" not in attacker_traits,
-                        "hard-shell" in defender_traits and
+        return not any([not attacker_traits & CARNIVORE,
+                        defender_traits & BURROWING and self.food == self.population,
+                        defender_traits & CLIMBING and not attacker_traits & CLIMBING,
+                        defender_traits & HARD_SHELL and
                         attacker_body - self.body < HARD_SHELL_DIFF,
-                        "herding" in defender_traits and attacker.population <= self.population,
-                        "symbiosis" in defender_traits and
+                        defender_traits & HERDING and attacker.population <= self.population,
+                        defender_traits & SYMBIOSIS and
                         right_neighbor and right_neighbor.body > self.body,
-                        (("warning-call" in right_traits) or ("warning-call" in left_traits)) and
-                        "ambush" not in attacker_traits])
+                        neighbor_traits & WARNING_CALL and not attacker_traits & AMBUSH])
 
     def can_eat(self):
         """
         Deternmines if a species can eat more food tokens.
         :return:  True if the species can eat, else false.
         """
-        if "fat-tissue" in self.traits:
+        if self.trait_mask & FAT_TISSUE:
             return self.fat_storage < self.body or self.food < self.population
         else:
             return self.food < self.population
@@ -123,6 +529,13 @@ class Species(object):
         self.population -= 1
         self.food = min(self.population, self.food)
 
+    def size_key(self):
+        """
+        :return: Tuple (population, food, body) which orders species by size,
+        lexicographically, for sorting with key=Species.size_key.
+        """
+        return (self.population, self.food, self.body)
+
     def is_extinct(self):
         """
         Checks if this species is extinct, ie. population = 0.
@@ -1,4 +1,7 @@
-from species import Species
+import copy
+import threading
+from species import Species, AttackCache, IdAllocator, bind_ids
+from traitcard import TraitCard, TRAIT_BITS, CARNIVORE, CLIMBING, HORNS
 import unittest
 
 
@@ -90,6 +93,85 @@ class TestSpecies(unittest.TestCase):
         self.assertTrue(self.defender.is_attackable(self.attacker,
                                                     left_neighbor=self.left_neighbor))
 
+    def test_attack_features(self):
+        self.assertEqual(self.species_1.features(), self.species_2.features())
+        self.assertNotEqual(self.species_1.features(), self.species_3.features())
+        self.species_2.traits.append("climbing")
+        self.assertNotEqual(self.species_1.features(), self.species_2.features())
+        self.species_1.traits = ["climbing"]
+        self.assertEqual(self.species_1.features(), self.species_2.features())
+        self.species_1.food -= 1
+        self.assertIsNone(self.species_1.attack_features)
+        self.assertNotEqual(self.species_1.features(), self.species_2.features())
+
+    def test_trait_mask(self):
+        self.assertEqual(self.defender.trait_mask, 0)
+        self.assertEqual(self.attacker.trait_mask, CARNIVORE)
+        self.attacker.traits.append("climbing")
+        self.assertEqual(self.attacker.trait_mask, CARNIVORE | CLIMBING)
+        self.attacker.replace_trait(0, "horns")
+        self.assertEqual(self.attacker.trait_mask, HORNS | CLIMBING)
+        self.attacker.traits.remove("climbing")
+        self.assertEqual(self.attacker.trait_mask, HORNS)
+        self.assertEqual(copy.deepcopy(self.attacker).trait_mask, HORNS)
+        self.attacker.traits = []
+        self.assertEqual(self.attacker.trait_mask, 0)
+
+    def test_trait_ids(self):
+        for trait in TraitCard.traits:
+            self.assertEqual(1 << TraitCard(trait).trait_id, TRAIT_BITS[trait])
+        self.assertEqual(len(set(TRAIT_BITS.values())), len(TraitCard.traits))
+
+    def test_attack_cache(self):
+        self.addCleanup(setattr, Species, "attack_cache", Species.attack_cache)
+        Species.attack_cache = AttackCache(max_size=2)
+        self.assertTrue(self.defender.is_attackable(self.attacker))
+        self.assertTrue(self.defender.is_attackable(self.attacker))
+        self.assertEqual(Species.attack_cache.stats()["hits"], 1)
+        self.assertEqual(Species.attack_cache.stats()["misses"], 1)
+
+        self.defender.traits.append("climbing")
+        self.assertFalse(self.defender.is_attackable(self.attacker))
+        self.assertEqual(Species.attack_cache.stats()["misses"], 2)
+        self.assertFalse(self.defender.is_attackable(self.attacker, self.left_neighbor))
+        self.assertEqual(Species.attack_cache.stats()["size"], 1)
+
+        Species.attack_cache.enabled = False
+        self.attacker.traits.append("climbing")
+        self.assertTrue(self.defender.is_attackable(self.attacker, self.left_neighbor))
+        self.assertEqual(Species.attack_cache.stats()["misses"], 3)
+
+    def test_attack_cache_threads(self):
+        self.addCleanup(setattr, Species, "attack_cache", Species.attack_cache)
+        Species.attack_cache = AttackCache(max_size=2)
+        neighbors = [False, self.left_neighbor, self.right_neighbor]
+
+        def run():
+            for index in range(3000):
+                self.defender.is_attackable(self.attacker, neighbors[index % 3])
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = Species.attack_cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 24000)
+        self.assertLessEqual(stats["size"], 2)
+
+    def test_id_allocator(self):
+        allocator = IdAllocator()
+        allocator.reserve([3, 1])
+        previous = bind_ids(allocator)
+        try:
+            self.assertEqual([Species().id, Species().id], [4, 5])
+            self.assertEqual(allocator.clone().next_id(), 6)
+            self.assertEqual(allocator.next_id(), 6)
+        finally:
+            self.assertIs(bind_ids(previous), allocator)
+        Species()
+        self.assertEqual(allocator.last, 6)
+
 
 if __name__ == '__main__':
     unittest.main()
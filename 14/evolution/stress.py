@@ -0,0 +1,76 @@
+import random
+from dealer import Dealer
+from player import Player
+from species import Species
+from traitcard import TraitCard
+from deck import DeckTemplate, DeckFactory, STANDARD_DECK, stream_seed
+from globals import MAX_BODY_SIZE, STRESS_MAX_PLAYERS, STRESS_MAX_SPECIES
+"""
+Games far larger than a real table, of hundreds of local Silly players with
+dozens of species each, for measuring how the engine scales.
+"""
+
+# The largest population of the species of stress games. Small populations
+# let the herbivores fill up within a round, so carnivores attack.
+STRESS_MAX_POPULATION = 3
+
+
+def stress_template(num_players, species_per_player, rounds):
+    """
+    Creates a deck template of copies of the standard deck with enough cards to
+    deal the given number of rounds.
+    :param num_players: The number of players in the game.
+    :param species_per_player: The number of species each player starts with.
+    :param rounds: The number of rounds to deal.
+    :return: A DeckTemplate.
+    """
+    # Each round deals 3 cards plus one per species, and boards can grow by
+    # one species a round.
+    needed = sum(num_players * (4 + species_per_player + round_index)
+                 for round_index in range(rounds))
+    copies = needed // len(STANDARD_DECK) + 1
+    return DeckTemplate(STANDARD_DECK.cards * copies)
+
+
+def random_species(rand):
+    """
+    :param rand: The random.Random to draw from.
+    :return: A new hungry Species of random population, body and up to 3 traits.
+    """
+    return Species(rand.randint(1, STRESS_MAX_POPULATION), 0, rand.randint(0, MAX_BODY_SIZE),
+                   rand.sample(TraitCard.traits, rand.randint(0, 3)))
+
+
+def stress_dealer(num_players, species_per_player, seed=0, rounds=3, watering_hole=None):
+    """
+    Creates a game of Silly players where every player starts with a board of
+    random species, and a shuffled deck of copies of the standard deck big
+    enough to play the given number of rounds. The boards and the deck only
+    depend on the arguments. Silly players reveal their lowest food card, so
+    the watering hole starts with enough food to fill every herbivore, after
+    which the carnivores attack.
+    :param num_players: The number of players, at most STRESS_MAX_PLAYERS.
+    :param species_per_player: The number of species on each board, at most
+    STRESS_MAX_SPECIES.
+    :param seed: The seed of the boards and the deck.
+    :param rounds: The number of rounds the deck has cards for.
+    :param watering_hole: The food tokens in the watering hole, defaults to
+    STRESS_MAX_POPULATION for each species.
+    :return: The Dealer of the game, with its deck created.
+    :raise ValueError: If there are too many players or species.
+    """
+    if not 0 < num_players <= STRESS_MAX_PLAYERS:
+        raise ValueError("stress games have 1 to %d players" % STRESS_MAX_PLAYERS)
+    if not 0 <= species_per_player <= STRESS_MAX_SPECIES:
+        raise ValueError("stress boards have 0 to %d species" % STRESS_MAX_SPECIES)
+    rand = random.Random(stream_seed(seed, "boards"))
+    dealer = Dealer([Player() for _ in range(num_players)], seed)
+    dealer.deck_factory = DeckFactory(seed, stress_template(num_players, species_per_player,
+                                                            rounds))
+    for player in dealer.players:
+        player.species.extend([random_species(rand) for _ in range(species_per_player)])
+    dealer.create_deck()
+    if watering_hole is None:
+        watering_hole = STRESS_MAX_POPULATION * num_players * species_per_player
+    dealer.watering_hole = watering_hole
+    return dealer
@@ -0,0 +1,53 @@
+import unittest
+import instrumentation
+from stress import *
+from dealer import Dealer
+from player_state import Board
+from decision_cache import encode_board
+from benchmarks import bench_scaling
+
+
+class TestStress(unittest.TestCase):
+
+    def test_limits(self):
+        self.assertRaises(ValueError, stress_dealer, STRESS_MAX_PLAYERS + 1, 1)
+        self.assertRaises(ValueError, stress_dealer, 0, 1)
+        self.assertRaises(ValueError, stress_dealer, 10, STRESS_MAX_SPECIES + 1)
+
+    def test_boards(self):
+        dealer = stress_dealer(40, 12, seed=3)
+        self.assertEqual([len(player.species) for player in dealer.players], [12] * 40)
+        self.assertEqual(dealer.watering_hole, STRESS_MAX_POPULATION * 40 * 12)
+        self.assertGreater(len(dealer.deck), 3 * dealer.min_deck_size())
+        boards = [encode_board(player.species) for player in dealer.players]
+        self.assertEqual([encode_board(player.species)
+                          for player in stress_dealer(40, 12, seed=3).players], boards)
+        self.assertNotEqual([encode_board(player.species)
+                             for player in stress_dealer(40, 12, seed=4).players], boards)
+
+    def test_checked_rounds(self):
+        dealer = stress_dealer(24, 10, rounds=2)
+        stats = dealer.instrument()
+        Dealer.check_zobrist = True
+        Board.check_hunger = True
+        previous = instrumentation.activate(stats)
+        try:
+            for _ in range(2):
+                self.assertTrue(dealer.has_next_round())
+                dealer.run_round()
+                dealer.zobrist()
+        finally:
+            instrumentation.deactivate(previous)
+            Dealer.check_zobrist = False
+            Board.check_hunger = False
+        self.assertGreater(stats.phases["feed1"][0], 24 * 10)
+        self.assertGreater(stats.counters["carnivore_targets"], 0)
+
+    def test_bench_scaling(self):
+        lines = bench_scaling(((4, 2), (8, 3))).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("8 players x 3 species: round"))
+
+
+if __name__ == '__main__':
+    unittest.main()
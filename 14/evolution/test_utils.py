@@ -1,8 +1,10 @@
+import random
 import unittest
 from dealer import *
 from species import Species
 from traitcard import TraitCard
 from player import Player
+from globals import *
 
 
 def setup():
@@ -111,3 +113,24 @@ def check_attribute(self, before, after, changes, attribute):
         self.assertEqual(getattr(after, attribute), changes[attribute])
     else:
         self.assertEqual(getattr(after, attribute), getattr(before, attribute))
+
+
+def random_dealer(rand):
+    """
+    Creates a Dealer at the start of its feeding with random species boards.
+    :param rand: The random.Random to draw from.
+    """
+    num_players = rand.randint(MIN_PLAYERS, MAX_PLAYERS)
+    dealer = Dealer([Player() for _ in range(num_players)])
+    for player in dealer.players:
+        for _ in range(rand.randint(0, 4)):
+            population = rand.randint(1, MAX_POPULATION)
+            body = rand.randint(0, MAX_BODY_SIZE)
+            traits = rand.sample(TraitCard.traits, rand.randint(0, 3))
+            fat_storage = rand.randint(0, body) if "fat-tissue" in traits else 0
+            player.species.append(Species(population, rand.randint(0, population),
+                                          body, traits, fat_storage))
+    dealer.deck = [TraitCard("carnivore", i % 9) for i in range(rand.randint(0, 6))]
+    dealer.watering_hole = rand.randint(0, 25)
+    dealer.current_player_index = rand.randint(0, num_players - 1)
+    return dealer
@@ -0,0 +1,148 @@
+import random
+import time
+from multiprocessing import Pool, cpu_count
+from dealer import Dealer
+from player import Player
+from decision_cache import DecisionCache, CachedPlayer
+"""
+Runs many independent games of Evolution in parallel and aggregates the results.
+"""
+
+# Shared by the cached Silly players of a worker process, so positions that
+# repeat across its games are only decided once.
+SILLY_CACHE = DecisionCache()
+
+# Maps a strategy name to a callable that creates a new player interface.
+STRATEGIES = {
+    "silly": Player,
+    "cached-silly": lambda: CachedPlayer(Player(), SILLY_CACHE)
+}
+
+
+def play_game(game):
+    """
+    Plays one complete game of Evolution with a deck shuffled by the game's seed.
+    This is run inside the worker processes so it must be a module level function.
+    :param game: A tuple (game_index, seed, strategy_names) where strategy_names
+    is a List of String names from STRATEGIES, one for each seat.
+    :return: A tuple (game_index, seed, scores) where scores are the final
+    Dealer.get_scores() of the game.
+    """
+    game_index, seed, strategy_names = game
+    random.seed(seed)
+    interfaces = [STRATEGIES[name]() for name in strategy_names]
+    dealer = Dealer(interfaces, seed)
+    dealer.run()
+    return (game_index, seed, dealer.get_scores())
+
+
+class TournamentResults(object):
+    """
+    Aggregated results of a tournament.
+
+    Attributes:
+        strategy_names: List of the strategy name playing in each seat.
+        games: The number of games that have finished.
+        wins: List of the number of games won by each seat. Tied winners each
+            get a win.
+        total_scores: List of the sum of the final scores of each seat.
+        finished: List of the number of games each seat was still in the game at
+            the end, ie. was not removed by the dealer.
+        elapsed: The number of seconds the tournament took to run.
+    """
+    def __init__(self, strategy_names):
+        num_seats = len(strategy_names)
+        self.strategy_names = strategy_names
+        self.games = 0
+        self.wins = [0] * num_seats
+        self.total_scores = [0] * num_seats
+        self.finished = [0] * num_seats
+        self.elapsed = 0.0
+
+    def add_game(self, scores):
+        """
+        Adds the result of one game to the tournament totals.
+        :param scores: The [[id, score], ...] list returned by Dealer.get_scores.
+        """
+        self.games += 1
+        if not scores:
+            return
+        best = max(score for _, score in scores)
+        for name, score in scores:
+            seat = name - 1
+            self.finished[seat] += 1
+            self.total_scores[seat] += score
+            if score == best:
+                self.wins[seat] += 1
+
+    def win_rate(self, seat):
+        """
+        :param seat: The index of the seat.
+        :return: The fraction of all games won by the given seat.
+        """
+        return float(self.wins[seat]) / self.games if self.games else 0.0
+
+    def mean_score(self, seat):
+        """
+        :param seat: The index of the seat.
+        :return: The mean score of the given seat over the games it finished.
+        """
+        if not self.finished[seat]:
+            return 0.0
+        return float(self.total_scores[seat]) / self.finished[seat]
+
+    def games_per_second(self):
+        """
+        :return: The number of games finished per second of wall time.
+        """
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """
+        Creates a printable table of the results for each seat.
+        :return: A String summary of the tournament.
+        """
+        results = ""
+        for seat, name in enumerate(self.strategy_names):
+            results += "seat: %d strategy: %s win rate: %.3f mean score: %.2f\n" % \
+                (seat + 1, name, self.win_rate(seat), self.mean_score(seat))
+        results += "%d games in %.2fs (%.1f games/second)\n" % \
+            (self.games, self.elapsed, self.games_per_second())
+        return results
+
+
+def run_tournament(num_games, strategy_names, processes=None, base_seed=0,
+                   on_game=None):
+    """
+    Plays num_games independent games over a pool of worker processes.
+    Game i is played with the seed base_seed + i so any game can be replayed
+    on its own, and shuffles its deck with its own random stream of that seed.
+    :param num_games: The number of games to play.
+    :param strategy_names: List of String names from STRATEGIES, one per seat.
+    :param processes: The number of worker processes, defaults to the number
+    of cores.
+    :param base_seed: The seed of the first game.
+    :param on_game: Function called with (game_index, seed, scores) as each
+    game finishes, in the order they finish.
+    :return: The TournamentResults of all games.
+    """
+    results = TournamentResults(strategy_names)
+    games = ((i, base_seed + i, strategy_names) for i in xrange(num_games))
+    if processes is None:
+        processes = cpu_count()
+    chunksize = max(1, num_games // (4 * processes))
+    pool = Pool(processes)
+    start = time.time()
+    try:
+        for game_index, seed, scores in pool.imap_unordered(play_game, games, chunksize):
+            results.add_game(scores)
+            if on_game:
+                on_game(game_index, seed, scores)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    results.elapsed = time.time() - start
+    return results
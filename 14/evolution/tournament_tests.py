@@ -0,0 +1,44 @@
+import unittest
+from tournament import *
+
+
+class TestTournament(unittest.TestCase):
+    def setUp(self):
+        self.results = TournamentResults(["silly", "silly", "silly"])
+
+    def test_add_game(self):
+        self.results.add_game([[1, 4], [2, 3], [3, 4]])
+        self.results.add_game([[1, 2], [3, 5]])
+        self.assertEqual(self.results.games, 2)
+        self.assertEqual(self.results.wins, [1, 0, 2])
+        self.assertEqual(self.results.total_scores, [6, 3, 9])
+        self.assertEqual(self.results.finished, [2, 1, 2])
+
+    def test_rates(self):
+        self.results.add_game([[1, 4], [2, 3], [3, 4]])
+        self.results.add_game([[1, 2], [3, 5]])
+        self.assertEqual(self.results.win_rate(0), 0.5)
+        self.assertEqual(self.results.mean_score(1), 3.0)
+        self.assertEqual(self.results.mean_score(2), 4.5)
+
+    def test_play_game(self):
+        (index, seed, scores) = play_game((3, 7, ["silly", "silly", "silly"]))
+        self.assertEqual((index, seed), (3, 7))
+        self.assertEqual(len(scores), 3)
+
+    def test_play_game_cached(self):
+        plain = play_game((0, 5, ["silly"] * 4))
+        self.assertEqual(play_game((0, 5, ["cached-silly"] * 4)), plain)
+
+    def test_run_tournament(self):
+        finished = []
+        results = run_tournament(6, ["silly"] * 4, processes=2,
+                                 on_game=lambda i, seed, scores: finished.append(i))
+        self.assertEqual(sorted(finished), range(6))
+        self.assertEqual(results.games, 6)
+        self.assertEqual(sum(results.finished), 24)
+        self.assertEqual(results.games_per_second() > 0, True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 class TraitCard(object):
     """
-    A Trait Card of the Evolution game
+    A Trait Card of the Evolution game. Cards are never changed once created, so
+    one card can be shared by copies of a game.
     """
 
+    __slots__ = ("trait", "food_points")
+
     traits = ["carnivore",
               "ambush",
               "burrowing",
@@ -20,17 +23,26 @@ class TraitCard(object):
               "symbiosis",
               "warning-call"]
 
+    @property
+    def trait_id(self):
+        """
+        The interned integer id of this card's trait.
+        """
+        return TRAIT_IDS[self.trait]
+
     def __init__(self, trait, food_points=0):
-        if any(trait == t for t in self.traits):
+        if trait in TRAIT_IDS:
             self.trait = trait
             self.food_points = food_points
-            self.used = False
         else:
             raise Exception("Given invalid trait: {0}".format(trait))
 
     def __str__(self):
         return "[%d, %s]" % (self.food_points, self.trait)
 
+    def __hash__(self):
+        return hash((self.trait, self.food_points))
+
     def __eq__(self, other):
         return all([isinstance(other, TraitCard),
                     self.trait == other.trait,
@@ -50,6 +62,13 @@ class TraitCard(object):
             cards.append(TraitCard(trait_name, -1 * (num + 1)))
         return cards
 
+    def sort_key(self):
+        """
+        :return: Tuple (trait, food points) which orders cards the same way as
+        TraitCard.compare, for sorting with key=TraitCard.sort_key.
+        """
+        return (self.trait, self.food_points)
+
     @classmethod
     def compare(cls, c1, c2):
         """
@@ -66,3 +85,37 @@ class TraitCard(object):
                 return -1
             else:
                 return 1
+
+
+# Interns each trait name as a small integer, and a single bit of a trait mask.
+TRAIT_IDS = dict((trait, i) for i, trait in enumerate(TraitCard.traits))
+TRAIT_BITS = dict((trait, 1 << i) for trait, i in TRAIT_IDS.items())
+
+CARNIVORE = TRAIT_BITS["carnivore"]
+AMBUSH = TRAIT_BITS["ambush"]
+BURROWING = TRAIT_BITS["burrowing"]
+CLIMBING = TRAIT_BITS["climbing"]
+COOPERATION = TRAIT_BITS["cooperation"]
+FAT_TISSUE = TRAIT_BITS["fat-tissue"]
+FERTILE = TRAIT_BITS["fertile"]
+FORAGING = TRAIT_BITS["foraging"]
+HARD_SHELL = TRAIT_BITS["hard-shell"]
+HERDING = TRAIT_BITS["herding"]
+HORNS = TRAIT_BITS["horns"]
+LONG_NECK = TRAIT_BITS["long-neck"]
+PACK_HUNTING = TRAIT_BITS["pack-hunting"]
+SCAVENGER = TRAIT_BITS["scavenger"]
+SYMBIOSIS = TRAIT_BITS["symbiosis"]
+WARNING_CALL = TRAIT_BITS["warning-call"]
+
+
+def trait_mask(traits):
+    """
+    Creates the trait mask of a list of trait names. Unknown names are ignored.
+    :param traits: List of String trait names.
+    :return: Integer with the TRAIT_BITS of each of the traits set.
+    """
+    mask = 0
+    for trait in traits:
+        mask |= TRAIT_BITS.get(trait, 0)
+    return mask
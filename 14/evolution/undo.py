@@ -0,0 +1,74 @@
+"""
+An undo log for rolling a game of Evolution back to a checkpoint.
+"""
+
+
+class UndoLog(object):
+    """
+    Records the state of each game object the first time it changes after a
+    checkpoint, so rolling back only has to restore the objects that changed.
+    Objects which can be recorded have a snapshot method returning their state,
+    and a restore method taking that state back, which returns the Board
+    whose hungry sets must be recomputed afterwards, or None.
+
+    Attributes:
+        entries: List of (object, snapshot) in the order they were recorded.
+        marks: List of (number of entries, recorded) for each open checkpoint,
+            where recorded is the Set of ids of the objects recorded before it.
+        recorded: Set of the ids of the objects recorded since the last checkpoint.
+    """
+    def __init__(self):
+        self.entries = []
+        self.marks = []
+        self.recorded = set()
+
+    def active(self):
+        """
+        :return: True if a checkpoint is open.
+        """
+        return len(self.marks) > 0
+
+    def checkpoint(self):
+        """
+        Opens a checkpoint. Checkpoints can be nested.
+        """
+        self.marks.append((len(self.entries), self.recorded))
+        self.recorded = set()
+
+    def record(self, obj):
+        """
+        Records the state of the object if it has not been recorded since the
+        last checkpoint. Must be called before the object changes.
+        :param obj: The game object about to change.
+        """
+        if self.marks and id(obj) not in self.recorded:
+            self.recorded.add(id(obj))
+            self.entries.append((obj, obj.snapshot()))
+
+    def rollback(self):
+        """
+        Restores every object recorded since the last checkpoint, in reverse
+        order, and closes the checkpoint.
+        """
+        start, recorded = self.marks.pop()
+        boards = {}
+        for obj, snapshot in reversed(self.entries[start:]):
+            board = obj.restore(snapshot)
+            if board is not None:
+                boards[id(board)] = board
+        del self.entries[start:]
+        self.recorded = recorded
+        for board in boards.values():
+            board.refresh()
+
+    def commit(self):
+        """
+        Closes the last checkpoint, keeping the changes made since. They are
+        still undone if an enclosing checkpoint is rolled back.
+        """
+        start, recorded = self.marks.pop()
+        if self.marks:
+            self.recorded |= recorded
+        else:
+            del self.entries[:]
+            self.recorded = set()
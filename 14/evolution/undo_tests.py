@@ -0,0 +1,136 @@
+import copy
+import random
+import unittest
+import test_utils
+from dealer import Dealer
+from player import Player
+from species import Species
+from traitcard import TraitCard
+from actions import *
+from benchmarks import mid_game_dealer
+from test_utils import random_dealer
+
+
+class TestUndo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        test_utils.setup()
+
+    def setUp(self):
+        self.dealer = Dealer([Player(), Player(), Player()])
+        self.dealer.watering_hole = 10
+        self.carnivore = Species(3, 0, 4, ["carnivore"])
+        self.herbivore = Species(2, 0, 1, ["fat-tissue"])
+        self.other = Species(4, 1, 2)
+        self.dealer.players[0].species = [self.carnivore]
+        self.dealer.players[1].species = [self.herbivore, self.other]
+        self.dealer.players[2].species = [Species(1, 0, 1)]
+        self.dealer.deck = [TraitCard("carnivore", i) for i in range(3)]
+
+    def check_rollback(self, dealer, before):
+        """
+        Checks that the rolled back dealer is equal to a copy taken at the
+        checkpoint and that its hungry sets are up to date.
+        """
+        self.dealer = dealer
+        self.check_dealer(before, dealer, {})
+        self.assertEqual(len(dealer.players), len(before.players))
+        self.assertEqual(dealer.skipped_players, before.skipped_players)
+        for player in dealer.players:
+            player.species.verify_hunger()
+            for species in player.species:
+                self.assertIs(species.board, player.species)
+
+    def test_feed1(self):
+        before = copy.deepcopy(self.dealer)
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        self.dealer.feed1()
+        self.assertNotEqual(self.dealer.watering_hole, before.watering_hole)
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, before)
+
+    def test_kill(self):
+        board = self.dealer.players[1].species
+        before = copy.deepcopy(self.dealer)
+        self.dealer.checkpoint()
+        self.dealer.kill(self.dealer.players[1], self.other)
+        self.dealer.kill(self.dealer.players[1], self.herbivore)
+        self.dealer.kill(self.dealer.players[1], self.herbivore)
+        self.assertEqual(len(board), 1)
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, before)
+        self.assertIs(self.dealer.players[1].species, board)
+        self.assertIs(board[0], self.herbivore)
+
+    def test_apply_actions(self):
+        self.dealer.players[0].hand = [TraitCard("horns", 3)]
+        self.dealer.players[2].hand = [TraitCard("foraging", -1)]
+        self.dealer.players[1].hand = [TraitCard("climbing"), TraitCard("horns"),
+                                       TraitCard("long-neck", 2), TraitCard("scavenger")]
+        before = copy.deepcopy(self.dealer)
+        self.dealer.checkpoint()
+        self.dealer.apply_actions([Action(0, [], [], [], []),
+                                   Action(0, [PopGrow(0, 1)], [],
+                                          [BoardAddition(2, [])],
+                                          [ReplaceTrait(0, 0, 3)]),
+                                   Action(0, [], [], [], [])])
+        self.assertEqual(len(self.dealer.players[1].species), 3)
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, before)
+
+    def test_nested(self):
+        before = copy.deepcopy(self.dealer)
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        middle = copy.deepcopy(self.dealer)
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        self.dealer.kill(self.dealer.players[1], self.herbivore)
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, middle)
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        self.dealer.commit()
+        self.assertTrue(self.dealer.undo_log.active())
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, before)
+        self.assertFalse(self.dealer.undo_log.active())
+        self.assertIsNone(self.dealer.players[0].species.undo_log)
+
+    def test_commit(self):
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        self.dealer.commit()
+        after = copy.deepcopy(self.dealer)
+        self.dealer.feed1()
+        self.assertEqual(self.dealer.undo_log.entries, [])
+        self.dealer.checkpoint()
+        self.dealer.rollback()
+        self.check_rollback(self.dealer, copy.deepcopy(self.dealer))
+        self.assertNotEqual(self.dealer.watering_hole, after.watering_hole)
+
+    def test_random_feedings(self):
+        rand = random.Random(1100)
+        for _ in range(100):
+            dealer = random_dealer(rand)
+            dealer.index_boards()
+            before = copy.deepcopy(dealer)
+            dealer.checkpoint()
+            dealer.feed_all()
+            dealer.rollback()
+            self.check_rollback(dealer, before)
+
+    def test_rounds(self):
+        for seed in range(5):
+            dealer = mid_game_dealer(5, seed=seed)
+            before = copy.deepcopy(dealer)
+            dealer.checkpoint()
+            while dealer.has_next_round():
+                dealer.run_round()
+            dealer.rollback()
+            self.check_rollback(dealer, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import hashlib
+import struct
+import threading
+"""
+Zobrist keys for hashing the state of an Evolution game.
+
+Every (field, value) pair of the state is given a fixed random 64 bit key, and
+the hash of a state is the XOR of the keys of its pairs. Keys are memoized, so
+hashing a board or hand is a few dictionary lookups per species or card, and
+boards and hands keep their hash up to date by XORing in each change.
+"""
+
+MASK = (1 << 64) - 1
+
+# Memo of the parts of a key to the key.
+ZOBRIST_KEYS = {}
+# Memos of the combined keys of the sizes and of the traits of a species.
+SIZE_KEYS = {}
+TRAIT_KEYS = {}
+# Memo of (position, card) to the key of the card at that position of a hand.
+CARD_KEYS = {}
+# The odd multipliers slot_mix uses for each position, and the lock making
+# sure threads add them in order.
+SLOT_MULTIPLIERS = []
+SLOT_LOCK = threading.Lock()
+
+
+def zobrist_key(*parts):
+    """
+    Finds the key of a (field, value) pair. Keys are derived from the parts,
+    so they are the same in every process.
+    :param parts: Strings and Integers naming the field and its value.
+    :return: A 64 bit Integer.
+    """
+    key = ZOBRIST_KEYS.get(parts)
+    if key is None:
+        digest = hashlib.md5(repr(parts)).digest()
+        key = ZOBRIST_KEYS.setdefault(parts, struct.unpack("<Q", digest[:8])[0])
+    return key
+
+
+def slot_mix(value, index):
+    """
+    Mixes the hash of an item with its position in a list. Unlike an XOR with
+    a key of the position, swapping two items changes the combined hash.
+    :param value: The 64 bit hash of the item.
+    :param index: The position of the item.
+    :return: A 64 bit Integer.
+    """
+    if index >= len(SLOT_MULTIPLIERS):
+        with SLOT_LOCK:
+            while index >= len(SLOT_MULTIPLIERS):
+                SLOT_MULTIPLIERS.append(zobrist_key("slot", len(SLOT_MULTIPLIERS)) | 1)
+    return (value * SLOT_MULTIPLIERS[index]) & MASK
+
+
+def species_zobrist(population, food, body, fat_storage, traits):
+    """
+    :param traits: List of the names of the species' traits, in order.
+    :return: The hash of the fields of a species.
+    """
+    sizes = (population, food, body, fat_storage)
+    value = SIZE_KEYS.get(sizes)
+    if value is None:
+        value = SIZE_KEYS.setdefault(sizes, zobrist_key("population", population) ^
+                                     zobrist_key("food", food) ^ zobrist_key("body", body) ^
+                                     zobrist_key("fat_storage", fat_storage))
+    traits = tuple(traits)
+    traits_value = TRAIT_KEYS.get(traits)
+    if traits_value is None:
+        traits_value = 0
+        for index, trait in enumerate(traits):
+            traits_value ^= zobrist_key("trait", index, trait)
+        TRAIT_KEYS[traits] = traits_value
+    return value ^ traits_value
+
+
+def card_zobrist(index, card):
+    """
+    :param index: The position of the card in a hand.
+    :param card: The TraitCard.
+    :return: The key of the card at that position. Cards are keyed by their
+    printed form, which is made of the food points and the trait.
+    """
+    key = CARD_KEYS.get((index, card))
+    if key is None:
+        key = CARD_KEYS.setdefault((index, card), zobrist_key("card", index, str(card)))
+    return key
+
+
+def hand_zobrist(cards):
+    """
+    :param cards: List of TraitCards in order.
+    :return: The hash of a hand of the given cards.
+    """
+    value = 0
+    for index, card in enumerate(cards):
+        value ^= card_zobrist(index, card)
+    return value
+
+
+def board_zobrist(list_of_species):
+    """
+    :param list_of_species: List of Species from left to right.
+    :return: The hash of a board of the given species.
+    """
+    slot_mix(0, len(list_of_species))
+    value = 0
+    for species, multiplier in zip(list_of_species, SLOT_MULTIPLIERS):
+        value ^= (species.zobrist() * multiplier) & MASK
+    return value
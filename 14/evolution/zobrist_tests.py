@@ -0,0 +1,123 @@
+import copy
+import random
+import unittest
+from dealer import Dealer
+from player import Player
+from species import Species
+from traitcard import TraitCard
+from benchmarks import mid_game_dealer
+from test_utils import random_dealer
+
+
+class TestZobrist(unittest.TestCase):
+
+    def setUp(self):
+        Dealer.check_zobrist = True
+        self.dealer = Dealer([Player(), Player(), Player()])
+        self.dealer.watering_hole = 10
+        self.species = Species(2, 1, 3, ["fat-tissue"])
+        self.other = Species(4, 0, 1, ["carnivore", "climbing"])
+        self.player = self.dealer.players[1]
+        self.player.species = [self.species, self.other]
+        self.player.hand = [TraitCard("horns", 2), TraitCard("carnivore", -5)]
+        self.dealer.deck = [TraitCard("burrowing", i) for i in range(3)]
+
+    def tearDown(self):
+        Dealer.check_zobrist = False
+
+    def assertReverts(self, change, undo):
+        """
+        Checks that the change alters the hash and that undoing it restores it.
+        """
+        before = self.dealer.zobrist()
+        change()
+        self.assertNotEqual(self.dealer.zobrist(), before)
+        undo()
+        self.assertEqual(self.dealer.zobrist(), before)
+
+    def test_species_changes(self):
+        self.assertReverts(self.species.breed, self.species.kill)
+        self.assertReverts(self.species.grow_body,
+                           lambda: setattr(self.species, "body", 3))
+        self.assertReverts(lambda: self.other.replace_trait(1, "ambush"),
+                           lambda: self.other.replace_trait(1, "climbing"))
+        self.assertReverts(lambda: setattr(self.species, "fat_storage", 2),
+                           lambda: setattr(self.species, "fat_storage", 0))
+
+    def test_feed_and_deal(self):
+        before = self.dealer.zobrist()
+        self.player.feed(self.species, 10)
+        self.assertNotEqual(self.dealer.zobrist(), before)
+        self.dealer.deal(2, self.player)
+        self.assertEqual(len(self.player.hand), 4)
+        self.assertEqual(self.dealer.zobrist(), copy.deepcopy(self.dealer).zobrist())
+
+    def test_game_fields(self):
+        self.assertReverts(lambda: setattr(self.dealer, "watering_hole", 3),
+                           lambda: setattr(self.dealer, "watering_hole", 10))
+        self.assertReverts(lambda: setattr(self.dealer, "current_player_index", 1),
+                           lambda: setattr(self.dealer, "current_player_index", 0))
+        self.assertReverts(lambda: self.player.hand.pop(),
+                           lambda: self.player.hand.append(TraitCard("carnivore", -5)))
+
+    def test_order(self):
+        self.assertReverts(self.player.species.reverse, self.player.species.reverse)
+        self.assertReverts(self.player.hand.reverse, self.player.hand.reverse)
+        players = list(self.dealer.players)
+        self.assertReverts(lambda: self.dealer.players.insert(0, self.dealer.players.pop(1)),
+                           lambda: setattr(self.dealer, "players", players))
+
+    def test_equal_states(self):
+        before = self.dealer.zobrist()
+        clone = self.dealer.clone()
+        self.assertEqual(clone.players[1].species.hashed, self.player.species.hashed)
+        self.assertEqual(clone.players[1].hand.hashed, self.player.hand.hashed)
+        self.assertEqual(clone.zobrist(), before)
+        clone.players[1].species[0].food = 2
+        self.assertNotEqual(clone.zobrist(), self.dealer.zobrist())
+        self.species.food = 2
+        self.assertEqual(clone.zobrist(), self.dealer.zobrist())
+
+    def test_in_place(self):
+        board = self.player.species
+        self.assertIsNone(board.hashed)
+        self.dealer.zobrist()
+        hashed = board.hashed
+        self.species.food = 2
+        self.assertNotEqual(board.hashed, hashed)
+        self.other.traits[1] = "ambush"
+        board.append(Species(1, 0, 2))
+        self.player.hand.append(TraitCard("ambush", 1))
+        self.assertIsNotNone(board.hashed)
+        self.assertIsNotNone(self.player.hand.hashed)
+        board.pop()
+        self.assertIsNone(board.hashed)
+        # A change which is not XORed into the board's hash is caught by the check.
+        self.dealer.zobrist()
+        object.__setattr__(self.species, "food", 1)
+        self.assertRaises(AssertionError, self.dealer.zobrist)
+
+    def test_rollback(self):
+        before = self.dealer.zobrist()
+        self.dealer.checkpoint()
+        self.dealer.feed1()
+        self.dealer.kill(self.player, self.other)
+        self.dealer.rollback()
+        self.assertEqual(self.dealer.zobrist(), before)
+
+    def test_random_feedings(self):
+        rand = random.Random(1200)
+        for _ in range(100):
+            dealer = random_dealer(rand)
+            while dealer.watering_hole > 0 and \
+                    len(dealer.players) != len(dealer.skipped_players):
+                dealer.feed1()
+                self.assertEqual(dealer.zobrist(), copy.deepcopy(dealer).zobrist())
+
+    def test_rounds(self):
+        dealer = mid_game_dealer(5, rounds=4)
+        self.assertEqual(dealer.zobrist(), copy.deepcopy(dealer).zobrist())
+
+
+if __name__ == '__main__':
+    unittest.main()